@@ -1,15 +1,35 @@
+import time
+
 import streamlit as st
-import pandas as pd
-import re
 from datetime import datetime
-import json
 
-# Importer Ollama
-try:
-    import ollama
-    OLLAMA_AVAILABLE = True
-except ImportError:
-    OLLAMA_AVAILABLE = False
+from src.service import (
+    FAILED,
+    LOADING,
+    ExtractionError,
+    LabService,
+    Unit,
+    available_formats,
+    parse_unit,
+    split_queries,
+)
+
+# Début de l'exécution du script (durée de chaque rerun mesurée dans les métriques)
+RERUN_START = time.perf_counter()
+
+# Modèle local et cache des extractions IA (persistant, LRU)
+OLLAMA_MODEL = "llama3.2"
+OLLAMA_TIMEOUT_SECONDS = 60
+OLLAMA_KEEP_ALIVE = "30m"  # durée de maintien du modèle en mémoire ("-1" : permanent)
+AI_CACHE_PATH = ".cache/llm_extraction.sqlite3"
+AI_CACHE_MAX_ENTRIES = 1000
+AI_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# Mesure des temps (conversion, IA, export...) avec p50/p95/p99, exportables en JSON ou Prometheus
+METRICS_ENABLED = True
+
+# Ollama installé ? (vérifié sans l'importer : le module n'est chargé qu'à la première requête IA)
+OLLAMA_AVAILABLE = LabService.ollama_available()
 
 # Configuration de la page
 st.set_page_config(
@@ -282,87 +302,54 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Charger la base scientifique
-@st.cache_data
-def load_scientific_data():
-    return pd.read_csv("data/scientific_data.csv")
+# Services (données, conversion, IA), créés une seule fois par processus et chargés à la demande
+@st.cache_resource
+def load_service():
+    service = LabService(
+        "data/scientific_data.csv",
+        model=OLLAMA_MODEL,
+        timeout=OLLAMA_TIMEOUT_SECONDS,
+        keep_alive=OLLAMA_KEEP_ALIVE,
+        cache_path=AI_CACHE_PATH,
+        cache_max_entries=AI_CACHE_MAX_ENTRIES,
+        cache_ttl_seconds=AI_CACHE_TTL_SECONDS,
+        metrics_enabled=METRICS_ENABLED
+    )
+    # Les modifications de data/scientific_data.csv sont rechargées sans redémarrage
+    service.watch_data()
+    return service
 
-# Initialiser l'historique dans la session
-if 'history' not in st.session_state:
-    st.session_state.history = []
+service = load_service()
 
-# Fonction de conversion entre unités
-def convert_units(value, from_unit, to_unit, molar_mass):
-    """Convertit une valeur entre différentes unités biochimiques"""
-    
-    # Étape 1 : Convertir vers mol/L (unité de base)
-    if from_unit in ["µmol/L", "umol/L"]:
-        mol_per_L = value * 1e-6
-    elif from_unit == "mmol/L":
-        mol_per_L = value * 1e-3
-    elif from_unit == "g/L":
-        mol_per_L = value / molar_mass
-    elif from_unit == "mg/dL":
-        g_per_L = value / 100
-        mol_per_L = g_per_L / molar_mass
-    else:
-        return None
-    
-    # Étape 2 : Convertir de mol/L vers l'unité cible
-    if to_unit in ["µmol/L", "umol/L"]:
-        return mol_per_L * 1e6
-    elif to_unit == "mmol/L":
-        return mol_per_L * 1e3
-    elif to_unit == "g/L":
-        return mol_per_L * molar_mass
-    elif to_unit == "mg/dL":
-        g_per_L = mol_per_L * molar_mass
-        return g_per_L * 100
-    else:
-        return None
+if service.data_error:
+    st.warning(f"⚠️ Données de référence non rechargées (version précédente conservée) : {service.data_error}")
 
-# Fonction pour extraire les infos avec l'IA
-def extract_with_ai(user_input, data):
-    """Utilise Ollama pour extraire analyte, valeur et unités depuis texte naturel"""
-    
-    analytes_list = ", ".join(data["analyte"].tolist())
-    units_list = "µmol/L, mmol/L, mg/dL, g/L"
-    
-    prompt = f"""Tu es un assistant de laboratoire médical. Analyse cette phrase et extrais les informations suivantes.
+# Page affichée de l'historique (l'historique lui-même est persistant, partagé entre les sessions)
+if 'history_page' not in st.session_state:
+    st.session_state.history_page = 0
 
-Phrase de l'utilisateur : "{user_input}"
+HISTORY_PAGE_SIZE = 10
+EXPORT_FORMAT_LABELS = {"csv": "CSV", "xlsx": "Excel", "parquet": "Parquet", "jsonl": "JSON Lines"}
 
-Analytes disponibles : {analytes_list}
-Unités disponibles : {units_list}
-
-Réponds UNIQUEMENT avec un JSON valide (sans markdown, sans backticks, sans texte supplémentaire) au format :
-{{
-  "analyte": "nom de l'analyte détecté (en minuscules, avec underscore si besoin)",
-  "value": nombre (float),
-  "unit_from": "unité d'origine",
-  "unit_to": "unité cible si mentionnée, sinon null"
-}}
-
-Si l'information n'est pas claire ou manquante, mets null pour ce champ."""
-    
+# Fonction pour extraire les infos avec l'IA
+def extract_with_ai(user_input):
+    """Utilise Ollama pour extraire analyte, valeur et unités depuis texte naturel"""
     try:
-        response = ollama.chat(
-            model='llama3.2',
-            messages=[{'role': 'user', 'content': prompt}]
-        )
-        
-        content = response['message']['content'].strip()
-        content = content.replace('```json', '').replace('```', '').strip()
-        result = json.loads(content)
-        
-        return result
-        
-    except Exception as e:
+        # Phrases bien formées résolues sans l'IA, puis cache, puis modèle
+        return service.extract(user_input)
+    except ExtractionError as e:
         st.error(f"Erreur IA : {str(e)}")
         return None
 
+# Fonction pour extraire une liste de résultats en un seul appel à l'IA
+def extract_block_with_ai(queries):
+    """Résout chaque ligne, en n'envoyant à Ollama qu'un seul prompt pour toutes les lignes non reconnues"""
+    return service.extract_block(queries, on_error=lambda e: st.error(f"Erreur IA : {str(e)}"))
+
 # Sélecteur de mode
 if OLLAMA_AVAILABLE:
+    # Le modèle se charge pendant que l'utilisateur saisit sa demande
+    service.model_manager
     mode = st.radio(
         "",
         ["🔢 Mode Standard", "🤖 Mode IA (langage naturel)"],
@@ -383,9 +370,6 @@ col_main, col_history = st.columns([2, 1])
 with col_main:
     
     try:
-        # Charger les données
-        data = load_scientific_data()
-        
         # MODE IA
         if mode == "🤖 Mode IA (langage naturel)" and OLLAMA_AVAILABLE:
             
@@ -398,7 +382,9 @@ with col_main:
                     💡 <strong>Exemples de phrases :</strong><br>
                     • "Convertis 200 de cholestérol en mmol"<br>
                     • "Creatinine 19243 µmol/L vers g/L"<br>
-                    • "Quelle est la masse molaire de l'urée ?"
+                    • "Quelle est la masse molaire de l'urée ?"<br>
+                    • Une liste de résultats, un par ligne ou séparés par des virgules :
+                    "gluc 5.4 mmol, crea 88 µmol, urée 7"
                 </p>
             </div>
             """, unsafe_allow_html=True)
@@ -409,17 +395,63 @@ with col_main:
                 placeholder="Ex: Convertis 200 de cholestérol de mg/dL vers mmol/L"
             )
             
+            default_unit_to = st.selectbox(
+                "🎯 Unité cible pour une liste de résultats (si non précisée)",
+                [None] + list(Unit),
+                format_func=lambda u: "Aucune" if u is None else u.label
+            )
+            
             if st.button("🤖 Analyser avec l'IA", type="primary", use_container_width=True):
-                if ai_input:
+                queries = split_queries(ai_input) if ai_input else []
+                if len(queries) > 1:
+                    # Liste de résultats : un seul prompt, une seule conversion vectorisée
+                    with st.spinner(f"🧠 L'IA analyse {len(queries)} résultats..."):
+                        items = service.convert_extractions(
+                            extract_block_with_ai(queries), default_unit_to
+                        )
+                    
+                    rows = []
+                    entries = []
+                    for query, item in zip(queries, items):
+                        if item is None:
+                            rows.append({"Saisie": query, "Analyte": "—", "Résultat": "❌ Non reconnu"})
+                            continue
+                        analyte_info = service.analyte_info(item["analyte"])
+                        analyte_label = item["analyte"].replace("_", " ").capitalize()
+                        rows.append({
+                            "Saisie": query,
+                            "Analyte": analyte_label,
+                            "Résultat": f"{item['value']} {item['unit_from'].label} → "
+                                        f"{item['result']:.4f} {item['unit_to'].label}"
+                        })
+                        entries.append({
+                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            "analyte": item["analyte"],
+                            "value_input": item["value"],
+                            "unit_from": item["unit_from"].label,
+                            "value_output": round(item["result"], 4),
+                            "unit_to": item["unit_to"].label,
+                            "molar_mass": float(analyte_info["molar_mass"]),
+                            "source": analyte_info["source"]
+                        })
+                    
+                    # Toutes les lignes sont enregistrées en une seule transaction
+                    service.history.append(entries)
+                    
+                    converted = sum(item is not None for item in items)
+                    st.markdown(f"**✅ {converted} / {len(queries)} résultat(s) converti(s)**")
+                    st.dataframe(rows, use_container_width=True, hide_index=True)
+                
+                elif ai_input:
                     with st.spinner("🧠 L'IA analyse votre demande..."):
-                        extracted = extract_with_ai(ai_input, data)
+                        extracted = extract_with_ai(ai_input)
                         
                         if extracted:
                             # Vérifier si c'est une question sur la masse molaire
                             if extracted.get('value') is None:
-                                analyte = extracted.get('analyte')
-                                if analyte and analyte in data['analyte'].values:
-                                    analyte_info = data[data['analyte'] == analyte].iloc[0]
+                                analyte_info = service.analyte_info(extracted.get('analyte') or "")
+                                if analyte_info:
+                                    analyte = analyte_info['analyte']
                                     st.markdown(f"""
                                     <div class="info-box">
                                         <p class="info-box-text">
@@ -432,49 +464,73 @@ with col_main:
                             
                             # Faire la conversion
                             elif extracted.get('analyte') and extracted.get('value') and extracted.get('unit_from'):
-                                analyte = extracted['analyte']
                                 value = extracted['value']
-                                from_unit = extracted['unit_from']
-                                to_unit = extracted.get('unit_to')
+                                from_unit = parse_unit(extracted['unit_from'])
+                                to_unit = parse_unit(extracted.get('unit_to'))
+                                analyte_info = service.analyte_info(extracted['analyte'])
                                 
-                                if analyte in data['analyte'].values:
-                                    analyte_info = data[data['analyte'] == analyte].iloc[0]
+                                if analyte_info:
+                                    analyte = analyte_info['analyte']
                                     molar_mass = float(analyte_info['molar_mass'])
                                     source = analyte_info['source']
                                     
-                                    if to_unit:
-                                        result = convert_units(value, from_unit, to_unit, molar_mass)
+                                    if from_unit is not None and to_unit is not None:
+                                        result = service.convert(value, analyte, from_unit, to_unit)
                                         
                                         if result is not None:
                                             st.markdown(f"""
                                             <div class="success-box">
                                                 <div class="success-title">✅ Résultat de la conversion</div>
-                                                <div class="success-result">{result:.4f} {to_unit}</div>
+                                                <div class="success-result">{result:.4f} {to_unit.label}</div>
                                                 <p style="color: #2E7D32; margin-top: 0.5rem;">
-                                                    {analyte.replace("_", " ").capitalize()} : {value} {from_unit} → {result:.4f} {to_unit}
+                                                    {analyte.replace("_", " ").capitalize()} : {value} {from_unit.label} → {result:.4f} {to_unit.label}
                                                 </p>
                                             </div>
                                             """, unsafe_allow_html=True)
                                             
                                             # Ajouter à l'historique
-                                            st.session_state.history.insert(0, {
+                                            service.history.append([{
                                                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                                "analyte": analyte.replace("_", " ").capitalize(),
+                                                "analyte": analyte,
                                                 "value_input": value,
-                                                "unit_from": from_unit,
+                                                "unit_from": from_unit.label,
                                                 "value_output": round(result, 4),
-                                                "unit_to": to_unit,
+                                                "unit_to": to_unit.label,
                                                 "molar_mass": molar_mass,
                                                 "source": source
-                                            })
-                                            
-                                            if len(st.session_state.history) > 50:
-                                                st.session_state.history = st.session_state.history[:50]
+                                            }])
+                                            st.session_state.history_page = 0
                                             
                                             st.rerun()
                 else:
                     st.warning("⚠️ Veuillez entrer une question")
             
+            cache_stats = service.cache.stats
+            parser_stats = service.parser.stats
+            st.caption(
+                f"⚡ Analyse directe sans IA : {parser_stats['fast_path_ratio']:.0%} des requêtes | "
+                f"🗄️ Cache IA : {cache_stats['hits']} hit(s) / {cache_stats['misses']} miss(es) "
+                f"— {cache_stats['entries']} entrée(s)"
+            )
+            
+            model_stats = service.model_manager.stats
+            if model_stats["state"] == LOADING:
+                st.caption(f"⏳ Chargement du modèle {OLLAMA_MODEL} en cours...")
+            elif model_stats["state"] == FAILED:
+                st.caption(f"⚠️ Préchargement du modèle impossible : {service.model_manager.error}")
+            else:
+                timings = [
+                    f"chargement {model_stats['last_load_seconds']:.1f} s"
+                    if model_stats["last_load_seconds"] is not None else None,
+                    f"1er token {model_stats['last_first_token_seconds']:.2f} s"
+                    if model_stats["last_first_token_seconds"] is not None else None,
+                ]
+                st.caption(
+                    f"🔥 Modèle {OLLAMA_MODEL} prêt | "
+                    + " | ".join(t for t in timings if t)
+                    + f" | {model_stats['cold_starts']} démarrage(s) à froid"
+                )
+            
             st.markdown('</div>', unsafe_allow_html=True)
         
         # MODE STANDARD
@@ -485,15 +541,15 @@ with col_main:
             # Sélection de l'analyte
             analyte = st.selectbox(
                 "🔬 Sélectionnez l'analyte",
-                options=data["analyte"].tolist(),
+                options=service.analytes(),
                 format_func=lambda x: x.replace("_", " ").capitalize()
             )
             
             # Récupérer les informations
-            analyte_info = data[data["analyte"] == analyte].iloc[0]
-            molar_mass = float(analyte_info["molar_mass"])
+            analyte_info = service.analyte_info(analyte)
+            molar_mass = analyte_info["molar_mass"]
             source = analyte_info["source"]
-            available_units = analyte_info["common_units"].split(";")
+            available_units = service.common_units(analyte)
             
             # Afficher la masse molaire
             st.markdown(f"""
@@ -517,28 +573,38 @@ with col_main:
                     format="%.4f",
                     label_visibility="collapsed"
                 )
-                from_unit = st.selectbox("🔄 Unité d'origine", available_units, key="from")
+                from_unit = st.selectbox(
+                    "🔄 Unité d'origine",
+                    available_units,
+                    format_func=lambda u: u.label,
+                    key="from"
+                )
             
             with col_input2:
                 st.markdown("**🎯 Conversion vers**")
                 st.write("")
                 st.write("")
-                to_unit = st.selectbox("🎯 Unité cible", available_units, key="to")
+                to_unit = st.selectbox(
+                    "🎯 Unité cible",
+                    available_units,
+                    format_func=lambda u: u.label,
+                    key="to"
+                )
             
             # Bouton de calcul
             if st.button("🔄 Convertir", type="primary", use_container_width=True):
                 if from_unit == to_unit:
                     st.warning("⚠️ Les unités d'origine et cible sont identiques")
                 else:
-                    result = convert_units(value_input, from_unit, to_unit, molar_mass)
+                    result = service.convert(value_input, analyte, from_unit, to_unit)
                     
                     if result is not None:
                         st.markdown(f"""
                         <div class="success-box">
                             <div class="success-title">✅ Résultat de la conversion</div>
-                            <div class="success-result">{result:.4f} {to_unit}</div>
+                            <div class="success-result">{result:.4f} {to_unit.label}</div>
                             <p style="color: #2E7D32; margin-top: 0.5rem;">
-                                {analyte.replace("_", " ").capitalize()} : {value_input} {from_unit} → {result:.4f} {to_unit}
+                                {analyte.replace("_", " ").capitalize()} : {value_input} {from_unit.label} → {result:.4f} {to_unit.label}
                             </p>
                         </div>
                         """, unsafe_allow_html=True)
@@ -547,7 +613,7 @@ with col_main:
                             st.markdown(f"""
                             **Analyte :** {analyte.replace("_", " ").capitalize()}  
                             **Masse molaire :** {molar_mass} g/mol  
-                            **Conversion :** {value_input} {from_unit} → {result:.4f} {to_unit}  
+                            **Conversion :** {value_input} {from_unit.label} → {result:.4f} {to_unit.label}  
                             **Source :** {source}  
                             **Date :** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
                             
@@ -555,19 +621,17 @@ with col_main:
                             """)
                         
                         # Ajouter à l'historique
-                        st.session_state.history.insert(0, {
+                        service.history.append([{
                             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "analyte": analyte.replace("_", " ").capitalize(),
+                            "analyte": analyte,
                             "value_input": value_input,
-                            "unit_from": from_unit,
+                            "unit_from": from_unit.label,
                             "value_output": round(result, 4),
-                            "unit_to": to_unit,
+                            "unit_to": to_unit.label,
                             "molar_mass": molar_mass,
                             "source": source
-                        })
-                        
-                        if len(st.session_state.history) > 50:
-                            st.session_state.history = st.session_state.history[:50]
+                        }])
+                        st.session_state.history_page = 0
                         
                         st.rerun()
                     else:
@@ -585,46 +649,110 @@ with col_history:
     st.markdown('<div class="custom-card">', unsafe_allow_html=True)
     st.markdown('<div class="card-header">📜 Historique des conversions</div>', unsafe_allow_html=True)
     
-    if len(st.session_state.history) > 0:
+    history = service.history
+    history_analytes = history.analytes()
+    
+    if history_analytes:
+        history_filter = st.selectbox(
+            "Filtrer par analyte",
+            [None] + history_analytes,
+            format_func=lambda a: "Tous les analytes" if a is None else a.replace("_", " ").capitalize(),
+            key="history_filter",
+            on_change=lambda: st.session_state.update(history_page=0)
+        )
+        total = history.count(history_filter)
+        page_count = max(1, -(-total // HISTORY_PAGE_SIZE))
+        page = min(st.session_state.history_page, page_count - 1)
+        
         col_btn1, col_btn2 = st.columns(2)
         
         with col_btn1:
-            if st.button("🗑️ Effacer", use_container_width=True):
-                st.session_state.history = []
-                st.rerun()
+            export_format = st.selectbox(
+                "Format d'export",
+                available_formats(),
+                format_func=EXPORT_FORMAT_LABELS.get,
+                key="export_format",
+                label_visibility="collapsed"
+            )
         
+        # Le fichier n'est généré qu'au clic, puis réutilisé tant que l'historique ne change pas
         with col_btn2:
-            df_history = pd.DataFrame(st.session_state.history)
-            csv = df_history.to_csv(index=False, encoding='utf-8-sig')
             st.download_button(
                 label="📥 Export",
-                data=csv,
-                file_name=f"historique_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
+                data=lambda: service.export_history(export_format, history_filter),
+                file_name=service.history_exporter.file_name(
+                    export_format, f"historique_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                ),
+                mime=service.history_exporter.mime_type(export_format),
                 use_container_width=True
             )
         
         st.markdown("<br>", unsafe_allow_html=True)
         
-        # Afficher les 10 dernières conversions
-        for idx, entry in enumerate(st.session_state.history[:10]):
+        # Afficher une page de conversions (les plus récentes d'abord)
+        for entry in history.page(page, HISTORY_PAGE_SIZE, history_filter):
             st.markdown(f"""
             <div class="history-item">
-                <div class="history-analyte">{entry['analyte']}</div>
+                <div class="history-analyte">{entry['analyte'].replace("_", " ").capitalize()}</div>
                 <div class="history-conversion">
                     {entry['value_input']} {entry['unit_from']} → <strong>{entry['value_output']} {entry['unit_to']}</strong>
                 </div>
-                <div class="history-time">🕐 {entry['timestamp'].split()[1]}</div>
+                <div class="history-time">🕐 {entry['timestamp']}</div>
             </div>
             """, unsafe_allow_html=True)
         
-        if len(st.session_state.history) > 10:
-            st.info(f"📊 +{len(st.session_state.history) - 10} conversion(s)")
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("◀", disabled=page == 0, use_container_width=True, key="history_prev"):
+                st.session_state.history_page = page - 1
+                st.rerun()
+        with col_page:
+            st.caption(f"Page {page + 1} / {page_count} — {total} conversion(s)")
+        with col_next:
+            if st.button("▶", disabled=page >= page_count - 1, use_container_width=True, key="history_next"):
+                st.session_state.history_page = page + 1
+                st.rerun()
     else:
         st.info("Aucune conversion effectuée pour le moment")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# Métriques de performance
+if METRICS_ENABLED:
+    with st.expander("📈 Performances"):
+        metrics_snapshot = service.metrics.snapshot()
+        if metrics_snapshot:
+            st.dataframe([
+                {
+                    "Opération": name,
+                    "Appels": stats["count"],
+                    "Erreurs": stats["errors"],
+                    "p50 (ms)": round(stats["p50"] * 1000, 2),
+                    "p95 (ms)": round(stats["p95"] * 1000, 2),
+                    "p99 (ms)": round(stats["p99"] * 1000, 2),
+                    "max (ms)": round(stats["max_seconds"] * 1000, 2),
+                }
+                for name, stats in metrics_snapshot.items()
+            ], use_container_width=True)
+        
+        col_json, col_prom = st.columns(2)
+        with col_json:
+            st.download_button(
+                "📥 JSON",
+                data=service.metrics.to_json,
+                file_name="metrics.json",
+                mime="application/json",
+                use_container_width=True
+            )
+        with col_prom:
+            st.download_button(
+                "📥 Prometheus",
+                data=service.metrics.to_prometheus,
+                file_name="metrics.prom",
+                mime="text/plain",
+                use_container_width=True
+            )
+
 # Footer
 st.markdown("<br>", unsafe_allow_html=True)
 st.markdown("""
@@ -636,3 +764,5 @@ st.markdown("""
     </p>
 </div>
 """, unsafe_allow_html=True)
+
+service.metrics.observe("rerun", time.perf_counter() - RERUN_START)
@@ -0,0 +1,84 @@
+"""
+Import-time benchmark for the Streamlit UI.
+
+Runs each import statement in a fresh interpreter with `python -X importtime`
+and reports the total import time together with the share of the heavy
+optional modules (pandas, ollama, numpy, pyarrow). The "before" statement
+reproduces the eager imports app.py used to do; "after" is what it does now.
+
+Usage:
+    python benchmarks/import_time.py [--repeat 5]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+
+STATEMENTS = {
+    "before": "import streamlit, pandas, ollama; import src.converter, src.data_loader",
+    "after": "import streamlit; import src.service",
+    "after + first lookup": (
+        "import streamlit; from src.service import LabService; "
+        "s = LabService(); s.analytes(); s.convert(100, 'creatinine', 'µmol/L', 'mg/dL')"
+    ),
+}
+
+HEAVY_MODULES = ("pandas", "ollama", "numpy", "pyarrow")
+
+# "import time:      self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(statement: str) -> Dict[str, float]:
+    """
+    Import a statement in a fresh interpreter and collect its import times.
+
+    Args:
+        statement: Python statement to run
+
+    Returns:
+        Dictionary with "total" and the cumulative time of each heavy module
+        that was imported, in milliseconds (a module imported by another
+        heavy module is also counted in its parent)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    times = {"total": 0.0}
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        times["total"] += int(self_us) / 1000
+        if name in HEAVY_MODULES:
+            times[name] = int(cumulative_us) / 1000
+    return times
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Runs per statement; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    print(f"{'statement':<22} {'total ms':>9}  heavy modules (ms)")
+    for label, statement in STATEMENTS.items():
+        runs = [measure(statement) for _ in range(args.repeat)]
+        best = min(runs, key=lambda times: times["total"])
+        heavy = ", ".join(
+            f"{name} {best[name]:.0f}" for name in HEAVY_MODULES if name in best
+        ) or "none"
+        print(f"{label:<22} {best['total']:>9.0f}  {heavy}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
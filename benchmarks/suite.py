@@ -0,0 +1,358 @@
+"""
+Performance benchmark suite with regression gates.
+
+Times the hot paths of the converter: scalar conversions, analyte
+lookups, loading large synthetic catalogues (from the file and from the
+compiled cache), vectorized batch conversion and history exports. Each
+case runs a fixed amount of work several times and keeps the fastest
+run. Results are written as JSON. The suite fails when convert_units is
+slower than the original string-based implementation, or, given a
+baseline file from an earlier run, when a case is slower than the
+baseline by more than the threshold.
+
+Usage:
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --baseline results.json --threshold 0.25
+    python benchmarks/suite.py --rows 100000000    # 10^8 rows, in chunks
+"""
+
+import argparse
+import csv
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.catalogue_cache import load_catalogue  # noqa: E402
+from src.converter import Converter, convert_units  # noqa: E402
+from src.data_loader import ScientificDataLoader  # noqa: E402
+from src.history_export import serialize  # noqa: E402
+from src.history_store import HistoryStore  # noqa: E402
+from src.units import Unit  # noqa: E402
+
+DATA_PATH = ROOT / "data" / "scientific_data.csv"
+
+# Rows converted per convert_batch call (bounds memory for 10^8 rows)
+BATCH_CHUNK = 1_000_000
+
+# Scalar cases that must stay faster than the original implementation
+# (Converter.convert also looks up the analyte, so it is only compared
+# against the baseline)
+ORIGINAL_CASES = {"convert_units": "convert_units.original"}
+
+def original_convert_units(value: float, from_unit: str, to_unit: str, molar_mass: float):
+    """
+    Convert through mol/L with string comparisons, as the original code did.
+
+    Args:
+        value: Value to convert
+        from_unit: Source unit
+        to_unit: Target unit
+        molar_mass: Molar mass in g/mol
+
+    Returns:
+        Converted value, or None if conversion is not possible
+    """
+    if value < 0 or molar_mass <= 0:
+        return None
+    mol_per_L = _original_to_mol_per_liter(value, from_unit, molar_mass)
+    if mol_per_L is None:
+        return None
+    return _original_from_mol_per_liter(mol_per_L, to_unit, molar_mass)
+
+
+def _original_to_mol_per_liter(value: float, unit: str, molar_mass: float):
+    """First step of original_convert_units."""
+    unit_lower = unit.lower().replace(" ", "")
+    if unit_lower in ["µmol/l", "umol/l"]:
+        return value * 1e-6
+    elif unit_lower == "mmol/l":
+        return value * 1e-3
+    elif unit_lower == "g/l":
+        return value / molar_mass
+    elif unit_lower == "mg/dl":
+        return value / 100 / molar_mass
+    else:
+        return None
+
+
+def _original_from_mol_per_liter(mol_per_L: float, unit: str, molar_mass: float):
+    """Second step of original_convert_units."""
+    unit_lower = unit.lower().replace(" ", "")
+    if unit_lower in ["µmol/l", "umol/l"]:
+        return mol_per_L * 1e6
+    elif unit_lower == "mmol/l":
+        return mol_per_L * 1e3
+    elif unit_lower == "g/l":
+        return mol_per_L * molar_mass
+    elif unit_lower == "mg/dl":
+        return mol_per_L * molar_mass * 100
+    else:
+        return None
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """
+    Run a function several times.
+
+    Args:
+        func: Work to time
+        repeat: Number of runs
+
+    Returns:
+        Fastest run in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def write_catalogue(path: Path, size: int) -> None:
+    """
+    Write a synthetic reference table.
+
+    Args:
+        path: CSV file to create
+        size: Number of analytes
+    """
+    rng = np.random.default_rng(0)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["analyte", "molar_mass", "unit", "source", "common_units", "aliases"])
+        for i, molar_mass in enumerate(rng.uniform(50, 1000, size)):
+            writer.writerow([
+                f"analyte_{i}", f"{molar_mass:.2f}", "g/mol", "synthetic",
+                "mmol/L;mg/dL;g/L", f"a{i};analyte {i}"
+            ])
+
+
+def history_entries(count: int) -> List[Dict]:
+    """
+    Build synthetic history entries.
+
+    Args:
+        count: Number of entries
+
+    Returns:
+        History entries with the HISTORY_COLUMNS keys
+    """
+    return [
+        {
+            "timestamp": f"2026-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}",
+            "analyte": "glucose",
+            "value_input": float(i % 500),
+            "unit_from": "mg/dL",
+            "value_output": (i % 500) / 18.016,
+            "unit_to": "mmol/L",
+            "molar_mass": 180.16,
+            "source": "PubChem NIH",
+        }
+        for i in range(count)
+    ]
+
+
+def run_suite(rows: int, catalogue_size: int, history_size: int, repeat: int) -> Dict[str, Dict]:
+    """
+    Run every benchmark case.
+
+    Args:
+        rows: Rows converted by the batch case
+        catalogue_size: Analytes in the synthetic catalogue
+        history_size: Entries in the exported history
+        repeat: Runs per case
+
+    Returns:
+        Dictionary mapping case name → {"seconds", "operations", "params"}
+    """
+    results = {}
+
+    def record(name: str, seconds: float, operations: int, **params) -> None:
+        results[name] = {"seconds": seconds, "operations": operations, "params": params}
+        print(f"{name:<28} {seconds * 1000:>10.2f} ms  {seconds / operations * 1e9:>10.1f} ns/op")
+
+    # Scalar conversions, and the original implementation they must beat
+    calls = 20_000
+    record("convert_units.original", best_time(
+        lambda: [original_convert_units(200.0, "mg/dL", "mmol/L", 386.65) for _ in range(calls)],
+        repeat
+    ), calls, calls=calls)
+    record("convert_units", best_time(
+        lambda: [convert_units(200.0, "mg/dL", "mmol/L", 386.65) for _ in range(calls)], repeat
+    ), calls, calls=calls)
+
+    converter = Converter.from_loader(ScientificDataLoader(str(DATA_PATH)))
+    from_unit, to_unit = Unit.MG_PER_DL, Unit.MMOL_PER_L
+    record("converter.convert", best_time(
+        lambda: [converter.convert(200.0, "cholesterol", from_unit, to_unit)
+                 for _ in range(calls)], repeat
+    ), calls, calls=calls)
+    record("converter.convert.strings", best_time(
+        lambda: [converter.convert(200.0, "cholesterol", "mg/dL", "mmol/L")
+                 for _ in range(calls)], repeat
+    ), calls, calls=calls)
+
+    # Lookups (canonical names, accented aliases and misses)
+    loader = ScientificDataLoader(str(DATA_PATH))
+    loader.load_index()
+    names = ["glucose", "Créatinine", "urée", "inconnu"] * (calls // 4)
+    record("get_analyte_info", best_time(
+        lambda: [loader.get_analyte_info(name) for name in names], repeat
+    ), len(names), calls=len(names))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Catalogue load: validated index plus compiled factor table
+        catalogue = Path(tmp) / "catalogue.csv"
+        write_catalogue(catalogue, catalogue_size)
+
+        def compile_catalogue():
+            big = ScientificDataLoader(str(catalogue))
+            big.load_index()
+            Converter.from_loader(big)
+
+        record("catalogue_load", best_time(compile_catalogue, repeat),
+               catalogue_size, analytes=catalogue_size)
+
+        # Same catalogue from the compiled cache (written by the first call)
+        load_catalogue(catalogue)
+        record("catalogue_load.cached", best_time(lambda: load_catalogue(catalogue), repeat),
+               catalogue_size, analytes=catalogue_size)
+
+        # Cached catalogue up to the first conversion, lookup and parse (lazy decoding)
+        def first_use():
+            big, converter, parser, _ = load_catalogue(catalogue)
+            converter.convert(1.0, "analyte_0", Unit.MMOL_PER_L, Unit.MG_PER_DL)
+            big.get_molar_mass("analyte 0")
+            parser.parse("analyte_0 5 mmol/L en mg/dL")
+
+        record("catalogue_load.first_use", best_time(first_use, repeat),
+               catalogue_size, analytes=catalogue_size)
+
+        # History export
+        store = HistoryStore(str(Path(tmp) / "history.sqlite3"))
+        store.append(history_entries(history_size))
+        for table_format in ("csv", "parquet", "jsonl"):
+            record(f"history_export.{table_format}", best_time(
+                lambda: serialize(store.entries(), table_format), repeat
+            ), history_size, entries=history_size)
+        store.close()
+
+    # Batch conversion, chunked so 10^8 rows fit in memory
+    rng = np.random.default_rng(0)
+    chunk = min(rows, BATCH_CHUNK)
+    values = rng.uniform(0, 500, chunk)
+    analytes = rng.integers(0, len(converter.analytes), chunk)
+    from_units = rng.integers(0, len(Unit), chunk)
+    to_units = rng.integers(0, len(Unit), chunk)
+
+    def convert_rows():
+        for start in range(0, rows, chunk):
+            size = min(chunk, rows - start)
+            converter.convert_batch(values[:size], analytes[:size], from_units[:size], to_units[:size])
+
+    record("convert_batch", best_time(convert_rows, repeat), rows, rows=rows)
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """
+    Find the cases that regressed against a baseline.
+
+    Cases missing from the baseline, or run with different parameters, are
+    not compared.
+
+    Args:
+        results: Current results (see run_suite)
+        baseline: Results of the baseline run
+        threshold: Allowed slowdown (0.25 = 25% slower)
+
+    Returns:
+        One message per regressed case
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None or reference.get("params") != result["params"]:
+            continue
+        ratio = result["seconds"] / reference["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {result['seconds'] * 1000:.2f} ms vs "
+                f"{reference['seconds'] * 1000:.2f} ms baseline (+{(ratio - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def slower_than_original(results: Dict[str, Dict]) -> List[str]:
+    """
+    Find the scalar cases that are not faster than the original code.
+
+    Args:
+        results: Current results (see run_suite)
+
+    Returns:
+        One message per case slower than its reference (see ORIGINAL_CASES)
+    """
+    regressions = []
+    for name, original in ORIGINAL_CASES.items():
+        if results[name]["seconds"] >= results[original]["seconds"]:
+            regressions.append(
+                f"{name}: {results[name]['seconds'] * 1000:.2f} ms vs "
+                f"{results[original]['seconds'] * 1000:.2f} ms for {original}"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000,
+                        help="Rows converted by the batch case (default: 10^6)")
+    parser.add_argument("--catalogue-size", type=int, default=10_000,
+                        help="Analytes in the synthetic catalogue")
+    parser.add_argument("--history-size", type=int, default=50_000,
+                        help="Entries in the exported history")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Runs per case; the fastest is kept")
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.rows, args.catalogue_size, args.history_size, args.repeat)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps({
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.platform(),
+            "results": results,
+        }, indent=2), encoding="utf-8")
+
+    regressions = slower_than_original(results)
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions += compare(results, baseline, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if regressions:
+        return 1
+    if args.baseline is not None:
+        print(f"No regression beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+"""
+REST API Module
+
+This module exposes the converter as a headless HTTP service for
+laboratory information systems. It is a plain ASGI application (no web
+framework needed) to be served by any ASGI server, e.g.:
+
+    uvicorn src.api:app --workers 4
+
+Each worker loads the reference table once at startup and reloads it when
+the data file changes. Alternatively, `python -m src.api --workers 4`
+compiles the table once in the parent process and publishes it in shared
+memory; workers then attach to it at startup instead of loading the
+file. Batch requests are converted in one vectorized pass, and can be
+answered as NDJSON, streamed in chunks, for large batches.
+
+Endpoints:
+    GET  /health          Status and reference data version
+    GET  /analytes        Reference data of every analyte
+    POST /convert         One conversion
+    POST /convert/batch   Many conversions (JSON or NDJSON in and out)
+    GET  /metrics         Latency metrics (Prometheus text format)
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.service import LabService
+
+# Largest accepted request body (bytes)
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# Results per NDJSON chunk sent to the client
+STREAM_CHUNK_ROWS = 10_000
+
+NDJSON = "application/x-ndjson"
+
+# Environment variable naming the shared reference table workers attach to
+SHARED_TABLE_ENV = "LABCONV_SHARED_TABLE"
+
+_CONVERSION_FIELDS = ("value", "analyte", "unit_from", "unit_to")
+
+
+class RequestError(Exception):
+    """Invalid request, answered with an HTTP error status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_items(body: bytes, content_type: str) -> List[Dict]:
+    """
+    Parse the conversions of a batch request.
+
+    Args:
+        body: Request body, either {"items": [...]} or one JSON object per
+            line (NDJSON)
+        content_type: Request content type
+
+    Returns:
+        One dictionary per conversion
+
+    Raises:
+        RequestError: If the body is not valid JSON or NDJSON
+    """
+    try:
+        if content_type.startswith(NDJSON):
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            payload = json.loads(body)
+            items = payload.get("items") if isinstance(payload, dict) else None
+    except ValueError as e:
+        raise RequestError(400, f"Invalid JSON: {e}")
+
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise RequestError(400, 'Expected {"items": [{...}, ...]} or one JSON object per line')
+    return items
+
+
+def batch_columns(items: List[Dict]) -> Tuple[np.ndarray, List[str], List[str], List[str]]:
+    """
+    Turn batch items into columns for Converter.convert_batch.
+
+    Invalid fields become values that convert to NaN (negative value,
+    empty analyte or unit), so one bad row does not fail the batch.
+
+    Args:
+        items: Conversions with value, analyte, unit_from and unit_to
+
+    Returns:
+        Values, analytes, source units and target units
+    """
+    values = np.fromiter(
+        (_number(item.get("value")) for item in items), dtype=np.float64, count=len(items)
+    )
+    analytes = [_text(item.get("analyte")) for item in items]
+    from_units = [_text(item.get("unit_from")) for item in items]
+    to_units = [_text(item.get("unit_to")) for item in items]
+    return values, analytes, from_units, to_units
+
+
+def _number(value) -> float:
+    """Read a finite JSON number, -1 (not convertible) for anything else."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return -1.0
+    value = float(value)
+    # json.loads accepts NaN and Infinity, which have no JSON representation
+    return value if math.isfinite(value) else -1.0
+
+
+def _text(value) -> str:
+    """Read a JSON string, "" (not convertible) for anything else."""
+    return value if isinstance(value, str) else ""
+
+
+def _json_number(value: float) -> str:
+    """Format a result for JSON, null where it is not finite."""
+    return repr(value) if math.isfinite(value) else "null"
+
+
+class ConversionAPI:
+    """ASGI application serving conversions from a LabService."""
+
+    def __init__(self, service: Optional[LabService] = None, watch_data: bool = True):
+        """
+        Create the application.
+
+        Args:
+            service: Service providing the reference data and converter
+                (a default LabService with metrics enabled if omitted)
+            watch_data: Whether to reload the reference data when its file
+                changes (from startup on; not when attached to a shared table)
+        """
+        self.service = service or LabService(metrics_enabled=True)
+        self.watch_data = watch_data
+        self._routes = {
+            ("GET", "/health"): self._health,
+            ("GET", "/analytes"): self._analytes,
+            ("POST", "/convert"): self._convert,
+            ("POST", "/convert/batch"): self._convert_batch,
+            ("GET", "/metrics"): self._metrics,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send) -> None:
+        """Load the reference data once per worker, before serving requests."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                shared_name = os.environ.get(SHARED_TABLE_ENV)
+                try:
+                    if shared_name:
+                        self.service.attach_reference(shared_name)
+                    else:
+                        self.service.reference
+                        if self.watch_data:
+                            self.service.watch_data()
+                except (FileNotFoundError, ValueError) as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send) -> None:
+        """Route a request and answer errors as JSON."""
+        path = scope["path"].rstrip("/") or "/"
+        handler = self._routes.get((scope["method"], path))
+        try:
+            if handler is None:
+                known = any(route_path == path for _, route_path in self._routes)
+                raise RequestError(405 if known else 404, f"No route for {scope['method']} {path}")
+            await handler(scope, receive, send)
+        except RequestError as e:
+            await _send_json(send, {"error": str(e)}, e.status)
+
+    async def _health(self, scope, receive, send) -> None:
+        reference = self.service.reference
+        await _send_json(send, {
+            "status": "ok",
+            "analytes": len(reference.converter),
+            "data_version": reference.version,
+            "data_error": self.service.data_error,
+        })
+
+    async def _analytes(self, scope, receive, send) -> None:
+        loader = self.service.loader
+        await _send_json(send, [
+            loader.get_analyte_info(analyte) for analyte in loader.get_all_analytes()
+        ])
+
+    async def _convert(self, scope, receive, send) -> None:
+        with self.service.metrics.timer("api_convert"):
+            try:
+                item = json.loads(await _read_body(receive))
+            except ValueError as e:
+                raise RequestError(400, f"Invalid JSON: {e}")
+            if not isinstance(item, dict) or any(field not in item for field in _CONVERSION_FIELDS):
+                raise RequestError(400, f"Expected an object with {', '.join(_CONVERSION_FIELDS)}")
+
+            converter = self.service.converter
+            analyte = _text(item["analyte"])
+            value = _number(item["value"])
+            result = converter.convert(
+                value, analyte, _text(item["unit_from"]), _text(item["unit_to"])
+            )
+            if result is None or not math.isfinite(result):
+                raise RequestError(
+                    422, "Conversion not possible (unknown analyte or unit, or negative or non-finite value)"
+                )
+
+            await _send_json(send, {
+                "analyte": converter.analyte_name(converter.analyte_index(analyte)),
+                "value": value,
+                "unit_from": item["unit_from"],
+                "unit_to": item["unit_to"],
+                "result": result,
+            })
+
+    async def _convert_batch(self, scope, receive, send) -> None:
+        with self.service.metrics.timer("api_convert_batch"):
+            headers = dict(scope["headers"])
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            stream = NDJSON in headers.get(b"accept", b"").decode("latin-1")
+
+            items = parse_items(await _read_body(receive), content_type)
+            # One snapshot for the whole batch, even if the data is reloaded meanwhile
+            converter = self.service.converter
+            results = converter.convert_batch(*batch_columns(items)).tolist()
+
+            if not stream:
+                await _send(send, 200, "application/json", (
+                    '{"results":[' + ",".join(map(_json_number, results)) + "]}"
+                ).encode("utf-8"))
+                return
+
+            await _start(send, 200, NDJSON)
+            for start in range(0, len(results), STREAM_CHUNK_ROWS):
+                chunk = results[start:start + STREAM_CHUNK_ROWS]
+                await send({
+                    "type": "http.response.body",
+                    "body": "".join(
+                        f'{{"result":{_json_number(result)}}}\n' for result in chunk
+                    ).encode("utf-8"),
+                    "more_body": True,
+                })
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _metrics(self, scope, receive, send) -> None:
+        await _send(
+            send, 200, "text/plain; version=0.0.4",
+            self.service.metrics.to_prometheus().encode("utf-8")
+        )
+
+
+async def _read_body(receive) -> bytes:
+    """
+    Read the whole request body.
+
+    Raises:
+        RequestError: If the body exceeds MAX_BODY_BYTES
+    """
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise RequestError(413, f"Request body larger than {MAX_BODY_BYTES} bytes")
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+async def _start(send, status: int, content_type: str) -> None:
+    """Send the response status and content type."""
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type.encode("latin-1"))],
+    })
+
+
+async def _send(send, status: int, content_type: str, body: bytes) -> None:
+    """Send a complete response."""
+    await _start(send, status, content_type)
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, payload, status: int = 200) -> None:
+    """Send a JSON response."""
+    await _send(
+        send, status, "application/json", json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    )
+
+
+# Module-level application for ASGI servers ("uvicorn src.api:app")
+app = ConversionAPI()
+
+
+def serve(host: str, port: int, workers: int, shared: bool = True) -> None:
+    """
+    Run the API with uvicorn, sharing one reference table between workers.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind
+        workers: Number of worker processes
+        shared: Whether workers attach to a table compiled once in this
+            process (otherwise each worker loads the data file)
+
+    Raises:
+        ImportError: If uvicorn is not installed
+    """
+    import uvicorn
+
+    table = LabService().publish_reference() if shared and workers > 1 else None
+    if table is not None:
+        os.environ[SHARED_TABLE_ENV] = table.name
+    try:
+        uvicorn.run("src.api:app", host=host, port=port, workers=workers)
+    finally:
+        if table is not None:
+            table.unlink()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv: Arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Exit status
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m src.api",
+        description="Serve conversions over HTTP for laboratory information systems."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--no-shared", action="store_true",
+                        help="Let each worker load the data file instead of sharing one table")
+    args = parser.parse_args(argv)
+
+    if importlib.util.find_spec("uvicorn") is None:
+        print("uvicorn is required to run the server: pip install uvicorn", file=sys.stderr)
+        return 1
+
+    serve(args.host, args.port, args.workers, shared=not args.no_shared)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Arrow I/O Module
+
+This module reads and writes tables as CSV, Parquet or Arrow IPC files.
+Parquet and Arrow IPC files are memory-mapped on read, so large reference
+catalogues and result sets are not re-parsed as text. pandas and pyarrow
+are only imported by the functions that need them.
+"""
+
+import csv
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# File extension → table format
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+
+def infer_format(path) -> str:
+    """
+    Infer the table format from a file extension.
+
+    Args:
+        path: File path
+
+    Returns:
+        "csv", "parquet" or "arrow" (CSV for unknown extensions)
+    """
+    return FORMATS.get(Path(path).suffix.lower(), "csv")
+
+
+def read_table(path, table_format: Optional[str] = None) -> "pd.DataFrame":
+    """
+    Read a table from disk.
+
+    Args:
+        path: File path
+        table_format: "csv", "parquet" or "arrow" (inferred if omitted)
+
+    Returns:
+        DataFrame with the table contents
+    """
+    table_format = table_format or infer_format(path)
+
+    if table_format == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, memory_map=True).to_pandas()
+
+    if table_format == "arrow":
+        import pyarrow as pa
+
+        with pa.memory_map(str(path), "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+
+    import pandas as pd
+
+    return pd.read_csv(path)
+
+
+def read_rows(path, table_format: Optional[str] = None) -> List[Dict]:
+    """
+    Read a small table as a list of rows, without pandas.
+
+    CSV values are returned as strings (empty cells as ""); Parquet and
+    Arrow IPC values keep their column types (missing values as None).
+
+    Args:
+        path: File path
+        table_format: "csv", "parquet" or "arrow" (inferred if omitted)
+
+    Returns:
+        One dictionary per row, keyed by column name
+    """
+    table_format = table_format or infer_format(path)
+
+    if table_format == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, memory_map=True).to_pylist()
+
+    if table_format == "arrow":
+        import pyarrow as pa
+
+        with pa.memory_map(str(path), "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pylist()
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def write_table(df: "pd.DataFrame", path, table_format: Optional[str] = None) -> None:
+    """
+    Write a table to disk.
+
+    Args:
+        df: DataFrame to write
+        path: File path
+        table_format: "csv", "parquet" or "arrow" (inferred if omitted)
+    """
+    table_format = table_format or infer_format(path)
+
+    if table_format == "csv":
+        df.to_csv(path, index=False, encoding="utf-8")
+        return
+
+    with open(path, "wb") as f:
+        _write_arrow_table(df, f, table_format)
+
+
+def _write_arrow_table(df: "pd.DataFrame", sink, table_format: str) -> None:
+    """
+    Write a DataFrame as Parquet or Arrow IPC to a file-like object.
+
+    Args:
+        df: DataFrame to write
+        sink: Binary file-like object
+        table_format: "parquet" or "arrow"
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    if table_format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink)
+    elif table_format == "arrow":
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unsupported table format: {table_format}")
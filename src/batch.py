@@ -0,0 +1,637 @@
+"""
+Batch Conversion Module
+
+This module converts whole instrument export files from the command line.
+Input CSV files are read in chunks, each chunk is converted in one
+vectorized pass and results are streamed to a CSV, Parquet or Arrow IPC
+file, so memory use is bounded by the chunk size rather than the file
+size.
+
+With several workers, the input is split into byte ranges aligned on line
+boundaries and each range is converted by its own process; the partial
+outputs are then concatenated in input order. Byte-range sharding assumes
+that quoted fields do not contain line breaks, which holds for instrument
+exports.
+
+Usage:
+    python -m src.batch input.csv output.parquet --chunksize 200000 --workers 8
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src import arrow_io
+from src.converter import Converter
+from src.data_loader import ScientificDataLoader
+from src.units import parse_unit
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Input column names, keyed by role
+DEFAULT_COLUMNS = {
+    "analyte": "analyte",
+    "value": "value",
+    "unit_from": "unit_from",
+    "unit_to": "unit_to",
+}
+
+OUTPUT_COLUMN = "value_output"
+
+OUTPUT_FORMATS = ("csv", "parquet", "arrow")
+
+
+@dataclass
+class BatchResult:
+    """Summary of a batch conversion run."""
+
+    rows: int
+    failed: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        Get the conversion throughput.
+
+        Returns:
+            Rows converted per second
+        """
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+
+def convert_chunk(
+    chunk: pd.DataFrame,
+    converter: Converter,
+    columns: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """
+    Convert one chunk of rows in a single vectorized pass.
+
+    Analyte and unit columns are factorized first, so each distinct
+    spelling is resolved once per chunk rather than once per row.
+
+    Args:
+        chunk: DataFrame with analyte, value, unit_from and unit_to columns
+        converter: Precompiled conversion table
+        columns: Optional mapping of role → column name (see DEFAULT_COLUMNS)
+
+    Returns:
+        The chunk with the value column parsed as float and an added
+        "value_output" column (NaN where conversion is not possible)
+    """
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+
+    analytes = _factorized_codes(chunk[columns["analyte"]], converter.analyte_index)
+    from_codes = _factorized_codes(chunk[columns["unit_from"]], _parse_unit_code)
+    to_codes = _factorized_codes(chunk[columns["unit_to"]], _parse_unit_code)
+    values = pd.to_numeric(chunk[columns["value"]], errors="coerce")
+
+    result = chunk.copy()
+    result[columns["value"]] = values
+    result[OUTPUT_COLUMN] = converter.convert_batch(
+        values.to_numpy(dtype=np.float64), analytes, from_codes, to_codes
+    )
+    return result
+
+
+def _parse_unit_code(unit: str) -> int:
+    """
+    Parse a unit spelling to an integer code, -1 if unknown.
+
+    Args:
+        unit: Unit string
+
+    Returns:
+        Unit code
+    """
+    code = parse_unit(unit)
+    return -1 if code is None else int(code)
+
+
+def _factorized_codes(column: pd.Series, encode) -> np.ndarray:
+    """
+    Encode a string column by resolving each distinct value once.
+
+    Args:
+        column: Column of strings (missing values allowed)
+        encode: Function mapping one distinct value to an integer code
+
+    Returns:
+        Integer code per row, -1 for missing or unknown values
+    """
+    labels, uniques = pd.factorize(column)
+    # Trailing -1 so that missing values (label -1) map to -1
+    lookup = np.array([encode(u) for u in uniques] + [-1], dtype=np.int64)
+    return lookup[labels]
+
+
+class _CsvSink:
+    """Streams DataFrame chunks to a CSV file."""
+
+    def __init__(self, path: Path, header: bool = True):
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._header = header
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        chunk.to_csv(self._file, header=self._header, index=False)
+        self._header = False
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetSink:
+    """Streams DataFrame chunks to a Parquet file, one row group per chunk."""
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._writer = None
+        self._schema = None
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            self._schema = _arrow_schema(chunk)
+            self._writer = pq.ParquetWriter(self._path, self._schema)
+        table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+class _ArrowSink:
+    """Streams DataFrame chunks to an Arrow IPC file, one batch per chunk."""
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._writer = None
+        self._schema = None
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        import pyarrow as pa
+
+        if self._writer is None:
+            self._schema = _arrow_schema(chunk)
+            self._writer = pa.ipc.new_file(str(self._path), self._schema)
+        table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _arrow_schema(chunk: pd.DataFrame):
+    """
+    Build a stable Arrow schema for converted chunks.
+
+    Text columns are typed as strings explicitly, so that a chunk (or a
+    shard) where a column happens to be empty gets the same schema as the
+    others instead of an inferred null type.
+
+    Args:
+        chunk: Converted chunk
+
+    Returns:
+        pyarrow.Schema
+    """
+    import pyarrow as pa
+
+    return pa.schema([
+        (name, pa.string() if dtype == object else pa.from_numpy_dtype(dtype))
+        for name, dtype in chunk.dtypes.items()
+    ])
+
+
+def _open_sink(path: Path, output_format: str, header: bool = True):
+    """
+    Open a streaming writer for the requested output format.
+
+    Args:
+        path: Output file path
+        output_format: "csv", "parquet" or "arrow"
+        header: Whether a CSV sink writes the header row
+
+    Returns:
+        Sink object with write() and close() methods
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if output_format == "csv":
+        return _CsvSink(path, header=header)
+    if output_format == "parquet":
+        return _ParquetSink(path)
+    if output_format == "arrow":
+        return _ArrowSink(path)
+    raise ValueError(
+        f"Unsupported output format: {output_format} "
+        f"(expected one of {', '.join(OUTPUT_FORMATS)})"
+    )
+
+
+def convert_file(
+    input_path: str,
+    output_path: str,
+    converter: Optional[Converter] = None,
+    data_path: str = "data/scientific_data.csv",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: Optional[Dict[str, str]] = None,
+    output_format: Optional[str] = None,
+    workers: int = 1
+) -> BatchResult:
+    """
+    Convert a CSV file chunk by chunk and stream results to disk.
+
+    All input columns are kept (read as text) and a "value_output" column
+    is appended. With workers > 1 the file is sharded across processes;
+    the output keeps the input row order.
+
+    Args:
+        input_path: Input CSV file
+        output_path: Output CSV, Parquet or Arrow IPC file
+        converter: Conversion table (built from data_path if omitted)
+        data_path: Scientific data CSV used to build the converter
+        chunksize: Number of rows converted per chunk
+        columns: Optional mapping of role → column name (see DEFAULT_COLUMNS)
+        output_format: "csv", "parquet" or "arrow" (inferred from output_path
+            if omitted)
+        workers: Number of worker processes
+
+    Returns:
+        BatchResult with row counts and timing
+
+    Raises:
+        FileNotFoundError: If the input file doesn't exist
+        ValueError: If a required column is missing
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path)
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    output_format = output_format or arrow_io.infer_format(output_path)
+
+    if workers > 1:
+        return _convert_file_parallel(
+            input_path, output_path, converter, data_path,
+            chunksize, columns, output_format, workers
+        )
+
+    if converter is None:
+        converter = Converter.from_loader(ScientificDataLoader(data_path))
+
+    start = time.perf_counter()
+    rows = 0
+    failed = 0
+    sink = _open_sink(output_path, output_format)
+
+    try:
+        reader = pd.read_csv(input_path, chunksize=chunksize, dtype=str)
+        for chunk in reader:
+            _check_columns(chunk, columns)
+            converted = convert_chunk(chunk, converter, columns)
+            sink.write(converted)
+            rows += len(converted)
+            failed += int(converted[OUTPUT_COLUMN].isna().sum())
+    finally:
+        sink.close()
+
+    return BatchResult(rows=rows, failed=failed, seconds=time.perf_counter() - start)
+
+
+def _shard_ranges(path: Path, shards: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Split a CSV file into byte ranges that start and end on line boundaries.
+
+    Args:
+        path: CSV file
+        shards: Desired number of ranges
+
+    Returns:
+        Tuple of (header line, list of (start, end) byte offsets). Fewer
+        ranges than requested are returned for small files.
+    """
+    size = path.stat().st_size
+
+    with open(path, "rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+        step = max((size - data_start) // shards, 1)
+
+        bounds = [data_start]
+        for i in range(1, shards):
+            f.seek(max(data_start + i * step, bounds[-1]))
+            if f.tell() < size:
+                # Finish the line the split point falls into
+                f.readline()
+            bounds.append(min(f.tell(), size))
+        bounds.append(size)
+
+    ranges = [(s, e) for s, e in zip(bounds, bounds[1:]) if e > s]
+    return header, ranges
+
+
+# Per-process conversion table, set by _init_worker
+_WORKER_CONVERTER: Optional[Converter] = None
+
+
+def _init_worker(converter: Optional[Converter], data_path: str) -> None:
+    """
+    Load the conversion table once in each worker process.
+
+    Args:
+        converter: Table shipped from the parent, or None to load data_path
+        data_path: Scientific data CSV
+    """
+    global _WORKER_CONVERTER
+    if converter is None:
+        converter = Converter.from_loader(ScientificDataLoader(data_path))
+    _WORKER_CONVERTER = converter
+
+
+def _convert_shard(
+    input_path: Path,
+    byte_range: Tuple[int, int],
+    header: bytes,
+    part_path: Path,
+    chunksize: int,
+    columns: Dict[str, str],
+    output_format: str,
+    write_header: bool
+) -> Tuple[int, int]:
+    """
+    Convert one byte range of the input file into a partial output file.
+
+    Args:
+        input_path: Input CSV file
+        byte_range: (start, end) offsets, aligned on line boundaries
+        header: CSV header line, prepended to every chunk
+        part_path: Partial output file
+        chunksize: Number of rows converted per chunk
+        columns: Mapping of role → column name
+        output_format: "csv", "parquet" or "arrow"
+        write_header: Whether a CSV part starts with the header row
+
+    Returns:
+        Tuple of (rows converted, rows that failed)
+    """
+    start, end = byte_range
+    rows = 0
+    failed = 0
+    sink = _open_sink(part_path, output_format, header=write_header)
+
+    try:
+        with open(input_path, "rb") as f:
+            block_size = chunksize * _average_line_length(f, start, end)
+            f.seek(start)
+            position = start
+            while position < end:
+                block = f.read(min(block_size, end - position))
+                if position + len(block) < end:
+                    # Complete the last line; the range end is a line boundary
+                    block += f.readline()
+                position += len(block)
+                chunk = pd.read_csv(io.BytesIO(header + block), dtype=str)
+                _check_columns(chunk, columns)
+                converted = convert_chunk(chunk, _WORKER_CONVERTER, columns)
+                sink.write(converted)
+                rows += len(converted)
+                failed += int(converted[OUTPUT_COLUMN].isna().sum())
+    finally:
+        sink.close()
+
+    return rows, failed
+
+
+def _average_line_length(f, start: int, end: int, sample: int = 64) -> int:
+    """
+    Estimate the line length of a byte range from its first lines.
+
+    Args:
+        f: Binary file object
+        start: Range start offset (line boundary)
+        end: Range end offset
+        sample: Number of lines to sample
+
+    Returns:
+        Average line length in bytes (at least 1)
+    """
+    f.seek(start)
+    lengths = []
+    while len(lengths) < sample and f.tell() < end:
+        lengths.append(len(f.readline()))
+    return max(sum(lengths) // max(len(lengths), 1), 1)
+
+
+def _convert_file_parallel(
+    input_path: Path,
+    output_path: Path,
+    converter: Optional[Converter],
+    data_path: str,
+    chunksize: int,
+    columns: Dict[str, str],
+    output_format: str,
+    workers: int
+) -> BatchResult:
+    """
+    Convert a CSV file across a process pool, one byte range per task.
+
+    The file is split into a few ranges per worker so that uneven shards
+    balance out. Partial outputs are concatenated in input order.
+
+    Args:
+        input_path: Input CSV file
+        output_path: Output CSV, Parquet or Arrow IPC file
+        converter: Conversion table shipped to workers (or None to let each
+            worker load data_path)
+        data_path: Scientific data CSV
+        chunksize: Number of rows converted per chunk
+        columns: Mapping of role → column name
+        output_format: "csv", "parquet" or "arrow"
+        workers: Number of worker processes
+
+    Returns:
+        BatchResult with row counts and timing
+    """
+    start = time.perf_counter()
+    header, ranges = _shard_ranges(input_path, workers * 4)
+    # Fail on an unsupported format before starting the pool
+    _open_sink(output_path, output_format).close()
+
+    with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp_dir:
+        parts = [Path(tmp_dir) / f"part-{i:05d}" for i in range(len(ranges))]
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(converter, data_path)
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _convert_shard, input_path, byte_range, header, part,
+                    chunksize, columns, output_format, i == 0
+                )
+                for i, (byte_range, part) in enumerate(zip(ranges, parts))
+            ]
+            counts = [future.result() for future in futures]
+
+        _concatenate_parts(parts, output_path, output_format)
+
+    return BatchResult(
+        rows=sum(rows for rows, _ in counts),
+        failed=sum(failed for _, failed in counts),
+        seconds=time.perf_counter() - start
+    )
+
+
+def _concatenate_parts(parts: List[Path], output_path: Path, output_format: str) -> None:
+    """
+    Concatenate partial outputs, in order, into the final output file.
+
+    Args:
+        parts: Partial output files in input order (missing files are skipped)
+        output_path: Final output file
+        output_format: "csv", "parquet" or "arrow"
+    """
+    parts = [part for part in parts if part.exists()]
+
+    if output_format == "csv":
+        with open(output_path, "wb") as out:
+            for part in parts:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for part in parts:
+            if output_format == "parquet":
+                part_file = pq.ParquetFile(part)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, part_file.schema_arrow)
+                for i in range(part_file.num_row_groups):
+                    writer.write_table(part_file.read_row_group(i))
+            else:
+                with pa.memory_map(str(part), "r") as source:
+                    reader = pa.ipc.open_file(source)
+                    if writer is None:
+                        writer = pa.ipc.new_file(str(output_path), reader.schema)
+                    for i in range(reader.num_record_batches):
+                        writer.write_batch(reader.get_batch(i))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _check_columns(chunk: pd.DataFrame, columns: Dict[str, str]) -> None:
+    """
+    Check that the input chunk has every required column.
+
+    Args:
+        chunk: Input chunk
+        columns: Mapping of role → column name
+
+    Raises:
+        ValueError: If required columns are missing
+    """
+    missing = [name for name in columns.values() if name not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command-line argument parser.
+
+    Returns:
+        Configured ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch",
+        description="Convert biochemical values in a CSV export, chunk by chunk."
+    )
+    parser.add_argument("input", help="Input CSV file")
+    parser.add_argument("output", help="Output file (.csv, .parquet or .arrow)")
+    parser.add_argument(
+        "--data", default="data/scientific_data.csv",
+        help="Scientific data CSV (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+        help="Rows per chunk (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes; 0 uses every CPU (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--format", choices=OUTPUT_FORMATS, dest="output_format",
+        help="Output format (default: inferred from the output extension)"
+    )
+    for role, default in DEFAULT_COLUMNS.items():
+        parser.add_argument(
+            f"--{role.replace('_', '-')}-column", default=default, dest=role,
+            help=f"Input column holding the {role.replace('_', ' ')} (default: %(default)s)"
+        )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    args = _build_parser().parse_args(argv)
+    columns = {role: getattr(args, role) for role in DEFAULT_COLUMNS}
+
+    try:
+        result = convert_file(
+            args.input,
+            args.output,
+            data_path=args.data,
+            chunksize=args.chunksize,
+            columns=columns,
+            output_format=args.output_format,
+            workers=args.workers or os.cpu_count() or 1
+        )
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(
+        f"Converted {result.rows} rows ({result.failed} failed) in "
+        f"{result.seconds:.2f} s — {result.rows_per_second:,.0f} rows/sec",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Batch Extraction Module
+
+This module handles blocks of results pasted in AI mode (e.g.,
+"gluc 5.4 mmol, crea 88 µmol, urée 7"). The block is split into one
+query per result; queries the rule-based parser resolves are kept as is
+and all the others are sent to the model in a single prompt. Every
+extraction is then checked against the analyte/unit vocabulary and the
+valid ones are converted together in one vectorized pass.
+"""
+
+import math
+import re
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.query_parser import mentions_result
+from src.units import Unit, parse_unit
+
+# Queries are separated by line breaks; within a line, by semicolons or by
+# commas that are not decimal separators (i.e., not followed by a digit)
+_LINE_BREAK = re.compile(r"[\r\n]+")
+_SEPARATOR = re.compile(r";|,(?!\d)")
+
+# Molar units written without "/L" (e.g., "mmol"), as the model often returns them
+_BARE_MOLAR = re.compile(r"^\s*[uµμm]mol\s*$", re.IGNORECASE)
+
+
+def split_queries(text: str) -> List[str]:
+    """
+    Split a pasted block into individual queries.
+
+    A line is only split on ";" and "," if at least two of its parts read
+    like results (a number and a unit), so that a question such as
+    "Pour l'urée, quelle est la masse molaire ?" stays in one piece.
+
+    Args:
+        text: Block of results (one per line, or separated by ";" or ",")
+
+    Returns:
+        Non-empty queries, in order
+    """
+    queries = []
+    for line in _LINE_BREAK.split(text):
+        parts = [part.strip() for part in _SEPARATOR.split(line) if part.strip()]
+        if len(parts) > 1 and sum(map(mentions_result, parts)) < 2:
+            parts = [line.strip()]
+        queries.extend(parts)
+    return queries
+
+
+def extract_queries(
+    queries: Sequence[str],
+    parser,
+    extract_batch: Callable[[List[str]], List[Optional[Dict]]]
+) -> List[Optional[Dict]]:
+    """
+    Extract every query, calling the model at most once.
+
+    Args:
+        queries: Individual queries (see split_queries)
+        parser: QueryParser used for the well-formed queries
+        extract_batch: Function sending the remaining queries to the model
+            in a single prompt and returning one extraction (or None) each
+
+    Returns:
+        One raw extraction (or None) per query, in order
+    """
+    results: List[Optional[Dict]] = [parser.parse(query) for query in queries]
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    if pending:
+        extracted = extract_batch([queries[i] for i in pending])
+        for i, result in zip(pending, extracted):
+            results[i] = result
+    return results
+
+
+def validate_extraction(
+    extraction: Optional[Dict],
+    converter,
+    default_unit_to: Optional[Unit] = None
+) -> Optional[Dict]:
+    """
+    Check an extraction against the analyte and unit vocabulary.
+
+    Args:
+        extraction: Raw extraction from the parser or the model
+        converter: Converter holding the analyte table
+        default_unit_to: Target unit used when the query does not name one
+
+    Returns:
+        Dictionary with the table index and canonical name of the analyte,
+        the value and the source/target units, or None if the extraction
+        cannot be converted
+    """
+    if not isinstance(extraction, dict):
+        return None
+
+    analyte = extraction.get("analyte")
+    index = converter.analyte_index(analyte) if isinstance(analyte, str) else -1
+    if index < 0:
+        return None
+
+    value = extraction.get("value")
+    if isinstance(value, str):
+        try:
+            value = float(value.replace(",", "."))
+        except ValueError:
+            return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if not math.isfinite(value) or value < 0:
+        return None
+
+    unit_from = _parse_unit(extraction.get("unit_from"))
+    unit_to = _parse_unit(extraction.get("unit_to")) or default_unit_to
+    if unit_from is None or unit_to is None:
+        return None
+
+    return {
+        "index": index,
+        "analyte": converter.analyte_name(index),
+        "value": float(value),
+        "unit_from": unit_from,
+        "unit_to": unit_to,
+    }
+
+
+def _parse_unit(unit) -> Optional[Unit]:
+    """
+    Parse a unit from an extraction, reading bare molar units as per litre.
+
+    Args:
+        unit: Unit spelling from the extraction
+
+    Returns:
+        Unit code, or None if not recognized
+    """
+    if isinstance(unit, str) and _BARE_MOLAR.match(unit):
+        unit = unit.strip() + "/l"
+    return parse_unit(unit)
+
+
+def convert_extractions(
+    extractions: Sequence[Optional[Dict]],
+    converter,
+    default_unit_to: Optional[Unit] = None
+) -> List[Optional[Dict]]:
+    """
+    Validate a list of extractions and convert the valid ones in one pass.
+
+    Args:
+        extractions: Raw extractions (see extract_queries)
+        converter: Converter holding the analyte table
+        default_unit_to: Target unit used when a query does not name one
+
+    Returns:
+        One entry per extraction, in order: the validated extraction with
+        its "result" added, or None if it could not be converted
+    """
+    validated = [
+        validate_extraction(extraction, converter, default_unit_to)
+        for extraction in extractions
+    ]
+    valid = [item for item in validated if item is not None]
+    if not valid:
+        return validated
+
+    results = converter.convert_batch(
+        [item["value"] for item in valid],
+        np.array([item["index"] for item in valid], dtype=np.intp),
+        np.array([item["unit_from"] for item in valid], dtype=np.intp),
+        np.array([item["unit_to"] for item in valid], dtype=np.intp)
+    )
+    for item, result in zip(valid, results.tolist()):
+        item["result"] = result
+
+    return [
+        item if item is not None and not math.isnan(item["result"]) else None
+        for item in validated
+    ]
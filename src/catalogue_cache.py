@@ -0,0 +1,330 @@
+"""
+Catalogue Cache Module
+
+This module stores the compiled reference catalogue (validated analyte
+rows, lookup indexes, parser vocabulary and conversion-factor table) in a
+binary file next to the data file, so later processes start without
+parsing and validating the table again. The file is memory-mapped
+read-only: the factor table is used in place, and each part of the
+catalogue is decoded only when its first lookup needs it, so opening the
+cache takes the same time whatever the size of the catalogue. The cache is
+keyed by the modification time, size and SHA-256 of the data file, and is
+rebuilt automatically when the data file changes or the cache is corrupt.
+
+The same layout is used for tables published in shared memory: 8-byte
+magic, 8-byte header length, JSON header (table shape, section positions),
+padding to 64 bytes, float64 factor table, then one JSON section per part
+of the catalogue.
+"""
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.converter import Converter
+from src.data_loader import ScientificDataLoader
+from src.query_parser import QueryParser
+
+MAGIC = b"LABCONV3"
+
+# Suffix appended to the data file name (scientific_data.csv.compiled)
+CACHE_SUFFIX = ".compiled"
+
+# Parts of the catalogue, each decoded on its own
+SECTIONS = ("rows", "loader_index", "analytes", "molar_masses", "converter_index", "vocabulary")
+
+_PREFIX = struct.Struct("<8sQ")
+_ALIGNMENT = 64
+
+
+def encode_table(
+    loader: ScientificDataLoader,
+    converter: Converter,
+    parser: Optional[QueryParser] = None,
+    **metadata
+) -> Tuple[bytes, np.ndarray, bytes]:
+    """
+    Serialize a compiled catalogue.
+
+    Args:
+        loader: Loader holding the analyte catalogue
+        converter: Converter built from the same loader
+        parser: Parser built from the same loader (built if omitted)
+        **metadata: Extra JSON-serializable header fields
+
+    Returns:
+        Prefix and header, factor table, and catalogue sections (see
+        table_size and write_table)
+    """
+    if parser is None:
+        parser = QueryParser.from_loader(loader)
+    rows = loader.compiled_rows()
+    parts = {
+        "rows": rows,
+        "loader_index": loader.compiled_index(),
+        "analytes": [row["analyte"] for row in rows],
+        "molar_masses": [row["molar_mass"] for row in rows],
+        "converter_index": converter.index,
+        "vocabulary": parser.compiled_vocabulary(),
+    }
+
+    sections = []
+    positions = {}
+    start = 0
+    for name in SECTIONS:
+        blob = json.dumps(parts[name]).encode("utf-8")
+        positions[name] = [start, len(blob)]
+        sections.append(blob)
+        start += len(blob)
+
+    factors = np.ascontiguousarray(converter.factors, dtype=np.float64)
+    header = json.dumps({
+        "shape": list(factors.shape),
+        "sections": positions,
+        **metadata,
+    }).encode("utf-8")
+    return _PREFIX.pack(MAGIC, len(header)) + header, factors, b"".join(sections)
+
+
+def table_size(head: bytes, factors: np.ndarray, sections: bytes) -> int:
+    """
+    Get the size of an encoded catalogue.
+
+    Args:
+        head: Prefix and header (see encode_table)
+        factors: Factor table
+        sections: Catalogue sections
+
+    Returns:
+        Size in bytes
+    """
+    return _align(len(head)) + factors.nbytes + len(sections)
+
+
+def write_table(buffer, head: bytes, factors: np.ndarray, sections: bytes) -> None:
+    """
+    Write an encoded catalogue into a writable buffer.
+
+    Args:
+        buffer: Buffer of at least table_size() bytes
+        head: Prefix and header (see encode_table)
+        factors: Factor table
+        sections: Catalogue sections
+    """
+    offset = _align(len(head))
+    buffer[:len(head)] = head
+    np.ndarray(factors.shape, dtype=np.float64, buffer=buffer, offset=offset)[...] = factors
+    end = offset + factors.nbytes
+    buffer[end:end + len(sections)] = sections
+
+
+def read_header(buffer) -> Optional[Dict]:
+    """
+    Read the header of an encoded catalogue.
+
+    Args:
+        buffer: Buffer holding an encoded catalogue
+
+    Returns:
+        Header fields, or None if the buffer does not hold a catalogue
+    """
+    if len(buffer) < _PREFIX.size:
+        return None
+    magic, header_size = _PREFIX.unpack_from(buffer)
+    if magic != MAGIC or _PREFIX.size + header_size > len(buffer):
+        return None
+    try:
+        header = json.loads(bytes(buffer[_PREFIX.size:_PREFIX.size + header_size]))
+    except ValueError:
+        return None
+    return header if isinstance(header, dict) else None
+
+
+def decode_table(
+    buffer,
+    header: Dict,
+    data_path: str = "data/scientific_data.csv"
+) -> Tuple[ScientificDataLoader, Converter, QueryParser]:
+    """
+    Wrap an encoded catalogue in a loader, a converter and a parser.
+
+    Only the layout is checked here; each section is decoded when the
+    component using it is first queried.
+
+    Args:
+        buffer: Buffer holding an encoded catalogue
+        header: Its header (see read_header)
+        data_path: Data file the catalogue was compiled from
+
+    Returns:
+        Loader, converter and parser; the converter reads the factor
+        table in place (read-only, no copy), and the loader and parser
+        read their sections from the buffer until they are decoded
+
+    Raises:
+        ValueError: If the buffer is truncated or the header inconsistent
+        TypeError, KeyError: If header fields are missing or malformed
+    """
+    header_size = _PREFIX.unpack_from(buffer)[1]
+    offset = _align(_PREFIX.size + header_size)
+    shape = tuple(header["shape"])
+    if not all(isinstance(n, int) and n >= 0 for n in shape):
+        raise ValueError(f"Invalid factor table shape {shape}")
+
+    base = offset + math.prod(shape) * np.dtype(np.float64).itemsize
+    positions = {name: header["sections"][name] for name in SECTIONS}
+    for start, length in positions.values():
+        if start < 0 or length < 0 or base + start + length > len(buffer):
+            raise ValueError("Catalogue section out of bounds")
+
+    # The table is built on its own memoryview: as long as any view of it
+    # is alive, the buffer cannot be closed (BufferError) under it
+    factors = np.frombuffer(memoryview(buffer)[offset:base], dtype=np.float64).reshape(shape)
+    factors.setflags(write=False)
+
+    def section(name: str):
+        start, length = positions[name]
+        return json.loads(bytes(buffer[base + start:base + start + length]))
+
+    loader = ScientificDataLoader.deferred(
+        lambda: (section("rows"), section("loader_index")), data_path
+    )
+    converter = Converter.deferred(
+        factors,
+        lambda: (section("analytes"), section("molar_masses"), section("converter_index"))
+    )
+    parser = QueryParser.deferred(lambda: section("vocabulary"))
+    return loader, converter, parser
+
+
+def cache_path_for(data_path) -> Path:
+    """
+    Get the cache file of a data file.
+
+    Args:
+        data_path: Scientific data file
+
+    Returns:
+        Path of the compiled cache next to it
+    """
+    return Path(str(data_path) + CACHE_SUFFIX)
+
+
+def load_catalogue(
+    data_path,
+    cache_path=None
+) -> Tuple[ScientificDataLoader, Converter, QueryParser, bool]:
+    """
+    Load the compiled catalogue, from the cache when it matches the data file.
+
+    The cache matches if the data file has the same size and either the
+    same modification time or the same SHA-256. Otherwise, or if the cache
+    is corrupt, the data file is compiled and the cache rewritten
+    (atomically; a read-only directory only disables caching).
+
+    Args:
+        data_path: Scientific data file (.csv, .parquet or .arrow)
+        cache_path: Cache file (see cache_path_for if omitted)
+
+    Returns:
+        Loader, converter, parser, and whether the cache was used
+
+    Raises:
+        FileNotFoundError: If the data file doesn't exist
+        ValueError: If the data file is invalid
+    """
+    data_path = Path(data_path)
+    cache_path = Path(cache_path) if cache_path is not None else cache_path_for(data_path)
+    if not data_path.exists():
+        raise FileNotFoundError(f"Scientific data file not found: {data_path}")
+    stat = data_path.stat()
+
+    cached = _read_cache(cache_path)
+    if cached is not None:
+        buffer, header = cached
+        source = header.get("source")
+        if isinstance(source, dict) and source.get("size") == stat.st_size and (
+            source.get("mtime_ns") == stat.st_mtime_ns
+            or source.get("sha256") == _sha256(data_path)
+        ):
+            try:
+                return (*decode_table(buffer, header, str(data_path)), True)
+            except (TypeError, ValueError, KeyError):
+                pass  # Corrupt cache: compiled again and overwritten below
+        buffer.close()
+
+    loader = ScientificDataLoader(str(data_path))
+    loader.load_index()
+    converter = Converter.from_loader(loader)
+    parser = QueryParser.from_loader(loader)
+
+    # Only cache what was read if the file did not change meanwhile
+    if data_path.stat().st_mtime_ns == stat.st_mtime_ns:
+        _write_cache(cache_path, loader, converter, parser, {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": _sha256(data_path),
+        })
+    return loader, converter, parser, False
+
+
+def _align(size: int) -> int:
+    """Round a size up to the factor table alignment."""
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def _sha256(path: Path) -> str:
+    """Hash a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path: Path) -> Optional[Tuple[mmap.mmap, Dict]]:
+    """
+    Memory-map a cache file.
+
+    Returns:
+        Read-only mapping and header, or None if the file is missing or
+        not a catalogue
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    header = read_header(buffer)
+    if header is None:
+        buffer.close()
+        return None
+    return buffer, header
+
+
+def _write_cache(
+    cache_path: Path,
+    loader: ScientificDataLoader,
+    converter: Converter,
+    parser: QueryParser,
+    source: Dict
+) -> None:
+    """Write a cache file atomically, ignoring file system errors."""
+    head, factors, sections = encode_table(loader, converter, parser, source=source)
+    data = bytearray(table_size(head, factors, sections))
+    write_table(data, head, factors, sections)
+
+    tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
@@ -5,13 +5,28 @@ This module provides functions for converting between different biochemical unit
 All conversions use mol/L as an intermediate unit for maximum accuracy.
 """
 
-from typing import Optional
+import math
+from functools import cached_property, lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.data_loader import normalize_analyte_name
+from src.units import Unit, parse_unit
+
+# Code used for unknown units in unit-code arrays
+_INVALID_UNIT = -1
+_VALID_CODES = frozenset(int(unit) for unit in Unit)
+
+# Unit string → unit code, for the scalar path (bounded like _parse_unit_string)
+_STRING_CODES: Dict[str, int] = {}
+_STRING_CODES_MAX = 256
 
 
 def convert_units(
     value: float,
-    from_unit: str,
-    to_unit: str,
+    from_unit: Union[str, Unit],
+    to_unit: Union[str, Unit],
     molar_mass: float
 ) -> Optional[float]:
     """
@@ -19,8 +34,8 @@ def convert_units(
     
     Args:
         value: The numerical value to convert
-        from_unit: Source unit (µmol/L, mmol/L, mg/dL, g/L)
-        to_unit: Target unit (µmol/L, mmol/L, mg/dL, g/L)
+        from_unit: Source unit code or spelling (µmol/L, mmol/L, mg/dL, g/L)
+        to_unit: Target unit code or spelling (µmol/L, mmol/L, mg/dL, g/L)
         molar_mass: Molar mass of the analyte in g/mol
         
     Returns:
@@ -36,21 +51,17 @@ def convert_units(
     if value < 0 or molar_mass <= 0:
         return None
     
-    # Step 1: Convert to mol/L (base unit)
-    mol_per_L = _to_mol_per_liter(value, from_unit, molar_mass)
+    factor = _factor_rows(molar_mass)[_unit_code(from_unit)][_unit_code(to_unit)]
     
-    if mol_per_L is None:
+    if math.isnan(factor):
         return None
     
-    # Step 2: Convert from mol/L to target unit
-    result = _from_mol_per_liter(mol_per_L, to_unit, molar_mass)
-    
-    return result
+    return value * factor
 
 
 def _to_mol_per_liter(
     value: float,
-    unit: str,
+    unit: Union[str, Unit],
     molar_mass: float
 ) -> Optional[float]:
     """
@@ -58,21 +69,21 @@ def _to_mol_per_liter(
     
     Args:
         value: Numerical value
-        unit: Source unit
+        unit: Source unit code or spelling
         molar_mass: Molar mass in g/mol
         
     Returns:
         Value in mol/L, or None if unit is invalid
     """
-    unit_lower = unit.lower().replace(" ", "")
+    code = parse_unit(unit)
     
-    if unit_lower in ["µmol/l", "umol/l"]:
+    if code is Unit.UMOL_PER_L:
         return value * 1e-6
-    elif unit_lower == "mmol/l":
+    elif code is Unit.MMOL_PER_L:
         return value * 1e-3
-    elif unit_lower == "g/l":
+    elif code is Unit.G_PER_L:
         return value / molar_mass
-    elif unit_lower == "mg/dl":
+    elif code is Unit.MG_PER_DL:
         # mg/dL → g/L → mol/L
         g_per_L = value / 100
         return g_per_L / molar_mass
@@ -82,7 +93,7 @@ def _to_mol_per_liter(
 
 def _from_mol_per_liter(
     mol_per_L: float,
-    unit: str,
+    unit: Union[str, Unit],
     molar_mass: float
 ) -> Optional[float]:
     """
@@ -90,21 +101,21 @@ def _from_mol_per_liter(
     
     Args:
         mol_per_L: Value in mol/L
-        unit: Target unit
+        unit: Target unit code or spelling
         molar_mass: Molar mass in g/mol
         
     Returns:
         Converted value, or None if unit is invalid
     """
-    unit_lower = unit.lower().replace(" ", "")
+    code = parse_unit(unit)
     
-    if unit_lower in ["µmol/l", "umol/l"]:
+    if code is Unit.UMOL_PER_L:
         return mol_per_L * 1e6
-    elif unit_lower == "mmol/l":
+    elif code is Unit.MMOL_PER_L:
         return mol_per_L * 1e3
-    elif unit_lower == "g/l":
+    elif code is Unit.G_PER_L:
         return mol_per_L * molar_mass
-    elif unit_lower == "mg/dl":
+    elif code is Unit.MG_PER_DL:
         # mol/L → g/L → mg/dL
         g_per_L = mol_per_L * molar_mass
         return g_per_L * 100
@@ -112,6 +123,67 @@ def _from_mol_per_liter(
         return None
 
 
+@lru_cache(maxsize=1024)
+def _factor_matrix(molar_mass: float) -> np.ndarray:
+    """
+    Build the unit × unit conversion-factor matrix for one molar mass.
+    
+    All supported conversions are linear, so converting a value is a single
+    multiplication by `matrix[from_code, to_code]`. Factors are obtained by
+    pushing 1.0 through mol/L, which keeps the scalar and vectorized paths
+    bit-identical. The matrix has an extra NaN row and column so that the
+    invalid unit code (-1) indexes straight into NaN.
+    
+    Args:
+        molar_mass: Molar mass in g/mol (must be > 0)
+        
+    Returns:
+        Read-only (n_units + 1) × (n_units + 1) array of factors
+    """
+    size = len(Unit)
+    matrix = np.full((size + 1, size + 1), np.nan)
+    
+    for i, from_unit in enumerate(Unit):
+        mol_per_L = _to_mol_per_liter(1.0, from_unit, molar_mass)
+        for j, to_unit in enumerate(Unit):
+            matrix[i, j] = 1.0 if i == j else _from_mol_per_liter(
+                mol_per_L, to_unit, molar_mass
+            )
+    
+    matrix.setflags(write=False)
+    return matrix
+
+
+@lru_cache(maxsize=1024)
+def _factor_rows(molar_mass: float) -> tuple:
+    """
+    Get the factor matrix of one molar mass as nested tuples of Python floats.
+    
+    Scalar conversions index these rather than the NumPy matrix, which
+    avoids creating a NumPy scalar on every call.
+    
+    Args:
+        molar_mass: Molar mass in g/mol (must be > 0)
+        
+    Returns:
+        Factors indexed as rows[from_code][to_code] (see _factor_matrix)
+    """
+    return _to_rows(_factor_matrix(molar_mass))
+
+
+def _to_rows(matrix: np.ndarray) -> tuple:
+    """
+    Copy a unit × unit factor matrix into nested tuples of Python floats.
+    
+    Args:
+        matrix: Factor matrix with a trailing NaN row and column
+        
+    Returns:
+        Factors indexed as rows[from_code][to_code]
+    """
+    return tuple(map(tuple, matrix.tolist()))
+
+
 def get_conversion_formula(from_unit: str, to_unit: str) -> str:
     """
     Get a human-readable description of the conversion formula.
@@ -136,5 +208,558 @@ def validate_units(unit: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    valid_units = ["µmol/l", "umol/l", "mmol/l", "mg/dl", "g/l"]
-    return unit.lower().replace(" ", "") in valid_units
+    return parse_unit(unit) is not None
+
+
+def convert_units_batch(
+    values,
+    from_unit,
+    to_unit,
+    molar_mass
+) -> np.ndarray:
+    """
+    Convert a whole column of biochemical values in one vectorized pass.
+    
+    Every argument may be a scalar or an array-like (NumPy array, pandas
+    Series, list); they are broadcast against each other. Units may be
+    given as strings or as integer unit codes.
+    
+    Args:
+        values: Numerical values to convert
+        from_unit: Source unit(s) (µmol/L, mmol/L, mg/dL, g/L)
+        to_unit: Target unit(s) (µmol/L, mmol/L, mg/dL, g/L)
+        molar_mass: Molar mass(es) of the analyte in g/mol
+        
+    Returns:
+        Array of converted values, with NaN wherever `convert_units`
+        would return None. Results are bit-identical to the scalar path.
+        
+    Examples:
+        >>> convert_units_batch([200, 100], "mg/dL", "mmol/L", 386.65)
+        array([5.17263675, 2.58631838])
+    """
+    values = np.asarray(values, dtype=np.float64)
+    molar_mass = np.asarray(molar_mass, dtype=np.float64)
+    from_codes = _unit_codes(from_unit)
+    to_codes = _unit_codes(to_unit)
+    
+    values, molar_mass, from_codes, to_codes = np.broadcast_arrays(
+        values, molar_mass, from_codes, to_codes
+    )
+    
+    # Same factors as _factor_matrix, computed for every row at once.
+    # Rows with a zero molar mass are discarded below, like in convert_units.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mol_per_L = _to_mol_per_liter_batch(
+            np.ones(values.shape), from_codes, molar_mass
+        )
+        factors = _from_mol_per_liter_batch(mol_per_L, to_codes, molar_mass)
+    
+    factors[(from_codes == to_codes) & (from_codes != _INVALID_UNIT)] = 1.0
+    invalid = (values < 0) | (molar_mass <= 0)
+    return np.where(invalid, np.nan, values * factors)
+
+
+def _unit_code(unit) -> int:
+    """
+    Map a single unit (code or spelling) to an integer unit code.
+    
+    Args:
+        unit: A Unit, an integer code or a unit string
+        
+    Returns:
+        Unit code, -1 where the unit is invalid
+    """
+    if unit.__class__ is Unit:
+        return unit._value_
+    if unit.__class__ is str:
+        code = _STRING_CODES.get(unit)
+        if code is None:
+            parsed = parse_unit(unit)
+            code = _INVALID_UNIT if parsed is None else int(parsed)
+            if len(_STRING_CODES) < _STRING_CODES_MAX:
+                _STRING_CODES[unit] = code
+        return code
+    
+    if isinstance(unit, (int, np.integer)) and not isinstance(unit, bool):
+        return int(unit) if unit in _VALID_CODES else _INVALID_UNIT
+    
+    code = parse_unit(unit)
+    return _INVALID_UNIT if code is None else int(code)
+
+
+def _unit_codes(units) -> Union[int, np.ndarray]:
+    """
+    Map unit strings (or already-encoded unit codes) to unit codes.
+    
+    Array inputs are parsed once per distinct spelling rather than
+    once per row.
+    
+    Args:
+        units: A unit, or an array-like of unit codes or strings
+        
+    Returns:
+        Unit code(s), -1 where the unit is invalid
+    """
+    if np.ndim(units) == 0:
+        return _unit_code(units.item() if isinstance(units, np.generic) else units)
+    
+    units = np.asarray(units)
+    if units.dtype.kind in "iu":
+        codes = units.astype(np.int64)
+        codes[(codes < 0) | (codes >= len(Unit))] = _INVALID_UNIT
+        return codes
+    
+    uniques, inverse = np.unique(units.astype(str), return_inverse=True)
+    lookup = np.array([_unit_code(u) for u in uniques], dtype=np.int64)
+    return lookup[inverse].reshape(units.shape)
+
+
+def _to_mol_per_liter_batch(
+    values: np.ndarray,
+    codes: np.ndarray,
+    molar_mass: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized counterpart of `_to_mol_per_liter`.
+    
+    Args:
+        values: Numerical values
+        codes: Source unit codes
+        molar_mass: Molar masses in g/mol
+        
+    Returns:
+        Values in mol/L, NaN where the unit is invalid
+    """
+    mol_per_L = np.full(values.shape, np.nan)
+    
+    mask = codes == Unit.UMOL_PER_L
+    mol_per_L[mask] = values[mask] * 1e-6
+    mask = codes == Unit.MMOL_PER_L
+    mol_per_L[mask] = values[mask] * 1e-3
+    mask = codes == Unit.G_PER_L
+    mol_per_L[mask] = values[mask] / molar_mass[mask]
+    mask = codes == Unit.MG_PER_DL
+    # mg/dL → g/L → mol/L
+    mol_per_L[mask] = (values[mask] / 100) / molar_mass[mask]
+    
+    return mol_per_L
+
+
+def _from_mol_per_liter_batch(
+    mol_per_L: np.ndarray,
+    codes: np.ndarray,
+    molar_mass: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized counterpart of `_from_mol_per_liter`.
+    
+    Args:
+        mol_per_L: Values in mol/L
+        codes: Target unit codes
+        molar_mass: Molar masses in g/mol
+        
+    Returns:
+        Converted values, NaN where the unit is invalid
+    """
+    result = np.full(mol_per_L.shape, np.nan)
+    
+    mask = codes == Unit.UMOL_PER_L
+    result[mask] = mol_per_L[mask] * 1e6
+    mask = codes == Unit.MMOL_PER_L
+    result[mask] = mol_per_L[mask] * 1e3
+    mask = codes == Unit.G_PER_L
+    result[mask] = mol_per_L[mask] * molar_mass[mask]
+    mask = codes == Unit.MG_PER_DL
+    # mol/L → g/L → mg/dL
+    result[mask] = (mol_per_L[mask] * molar_mass[mask]) * 100
+    
+    return result
+
+
+class Converter:
+    """
+    Precompiled conversion-factor table for a catalogue of analytes.
+    
+    The (analyte × from_unit × to_unit) table is built once, so a conversion
+    is a lookup followed by a single multiplication.
+    """
+    
+    def __init__(
+        self,
+        analytes: Sequence[str],
+        molar_masses: Sequence[float],
+        aliases: Optional[Dict[str, str]] = None
+    ):
+        """
+        Build the conversion-factor table.
+        
+        Args:
+            analytes: Analyte names (e.g., "creatinine")
+            molar_masses: Molar mass of each analyte in g/mol
+            aliases: Optional mapping of alias → analyte name
+            
+        Raises:
+            ValueError: If the two sequences differ in length or a molar
+                mass is not positive
+        """
+        if len(analytes) != len(molar_masses):
+            raise ValueError("analytes and molar_masses must have the same length")
+        
+        self._analytes: List[str] = [str(a) for a in analytes]
+        self._index: Dict[str, int] = {a: i for i, a in enumerate(self._analytes)}
+        for i, analyte in enumerate(self._analytes):
+            self._index.setdefault(normalize_analyte_name(analyte), i)
+        for alias, analyte in (aliases or {}).items():
+            if analyte in self._index:
+                self._index.setdefault(normalize_analyte_name(alias), self._index[analyte])
+        self._molar_masses = np.asarray(molar_masses, dtype=np.float64)
+        
+        if (self._molar_masses <= 0).any():
+            raise ValueError("Molar masses must be positive")
+        
+        # Extra trailing NaN slice so that index -1 (unknown analyte) is NaN
+        size = len(Unit) + 1
+        self._factors = np.full((len(self._analytes) + 1, size, size), np.nan)
+        for i, molar_mass in enumerate(self._molar_masses):
+            self._factors[i] = _factor_matrix(float(molar_mass))
+        self._factors.setflags(write=False)
+        # Table index → factors as Python floats, filled on first scalar use
+        self._rows: Dict[int, tuple] = {}
+    
+    @classmethod
+    def from_table(
+        cls,
+        analytes: Sequence[str],
+        molar_masses: Sequence[float],
+        factors: np.ndarray,
+        index: Dict[str, int]
+    ) -> "Converter":
+        """
+        Wrap an already compiled factor table without copying it (e.g., one
+        attached from shared memory).
+        
+        Args:
+            analytes: Analyte names, in table order
+            molar_masses: Molar mass of each analyte in g/mol
+            factors: Table built by another Converter (see factors)
+            index: Lookup table built by the same Converter (see index)
+            
+        Returns:
+            Converter instance using factors as is
+            
+        Raises:
+            ValueError: If the table shape does not match the analytes
+        """
+        size = len(Unit) + 1
+        if factors.shape != (len(analytes) + 1, size, size):
+            raise ValueError(f"Factor table shape {factors.shape} does not match the analytes")
+        
+        converter = cls.__new__(cls)
+        converter._analytes = list(analytes)
+        converter._index = index
+        converter._molar_masses = np.asarray(molar_masses, dtype=np.float64)
+        if factors.flags.writeable:
+            factors = factors.view()
+            factors.setflags(write=False)
+        converter._factors = factors
+        converter._rows = {}
+        return converter
+    
+    @classmethod
+    def deferred(
+        cls,
+        factors: np.ndarray,
+        decode: Callable[[], Tuple[Sequence[str], Sequence[float], Dict[str, int]]]
+    ) -> "Converter":
+        """
+        Wrap an already compiled factor table whose analytes and lookup
+        table are decoded on first use (e.g., from the catalogue cache), so
+        creating the converter costs nothing. Pickling the converter
+        decodes them.
+        
+        Args:
+            factors: Table built by another Converter (see factors)
+            decode: Returns the analytes, molar masses and index (see
+                from_table)
+            
+        Returns:
+            Converter instance using factors as is
+            
+        Raises:
+            ValueError: If the table does not have the unit × unit shape
+        """
+        size = len(Unit) + 1
+        if factors.ndim != 3 or factors.shape[1:] != (size, size) or len(factors) < 1:
+            raise ValueError(f"Factor table shape {factors.shape} is not a conversion table")
+        
+        converter = cls.__new__(cls)
+        if factors.flags.writeable:
+            factors = factors.view()
+            factors.setflags(write=False)
+        converter._factors = factors
+        converter._rows = {}
+        converter._decode = decode
+        return converter
+    
+    @cached_property
+    def _catalogue(self) -> Tuple[List[str], np.ndarray, Dict[str, int]]:
+        """
+        Decode the catalogue of a deferred converter (see deferred).
+        
+        Returns:
+            Analytes, molar masses and lookup table
+            
+        Raises:
+            ValueError: If the decoded analytes do not match the table
+        """
+        analytes, molar_masses, index = self._decode()
+        if len(analytes) + 1 != len(self._factors) or len(molar_masses) != len(analytes):
+            raise ValueError("Decoded analytes do not match the factor table")
+        return list(analytes), np.asarray(molar_masses, dtype=np.float64), index
+    
+    # The constructors set these three directly; deferred converters decode
+    # them on first access, then read them from the instance like the others
+    @cached_property
+    def _analytes(self) -> List[str]:
+        """Analyte names, in table order."""
+        return self._catalogue[0]
+    
+    @cached_property
+    def _molar_masses(self) -> np.ndarray:
+        """Molar mass of each analyte in g/mol."""
+        return self._catalogue[1]
+    
+    @cached_property
+    def _index(self) -> Dict[str, int]:
+        """Name, normalized name or alias → table index."""
+        return self._catalogue[2]
+    
+    def __getstate__(self) -> Dict:
+        """
+        Get the state to pickle (e.g., to send the converter to worker
+        processes), decoding the catalogue of a deferred converter first.
+        
+        Returns:
+            Instance attributes, without the decoding function
+        """
+        state = dict(vars(self))
+        state.pop("_decode", None)
+        state.pop("_catalogue", None)
+        state.update(_analytes=self._analytes, _molar_masses=self._molar_masses, _index=self._index)
+        return state
+    
+    def __setstate__(self, state: Dict) -> None:
+        """
+        Restore a pickled converter, keeping its factor table read-only.
+        
+        Args:
+            state: Instance attributes (see __getstate__)
+        """
+        vars(self).update(state)
+        self._factors.setflags(write=False)
+    
+    def __len__(self) -> int:
+        """Number of analytes in the table (without decoding anything)."""
+        return len(self._factors) - 1
+    
+    @classmethod
+    def from_dataframe(cls, data) -> "Converter":
+        """
+        Build a converter from a scientific data DataFrame.
+        
+        Args:
+            data: DataFrame with "analyte" and "molar_mass" columns
+            
+        Returns:
+            Converter instance
+        """
+        return cls(data["analyte"].tolist(), data["molar_mass"].tolist())
+    
+    @classmethod
+    def from_loader(cls, loader) -> "Converter":
+        """
+        Build a converter from a ScientificDataLoader.
+        
+        Args:
+            loader: ScientificDataLoader instance
+            
+        Returns:
+            Converter instance
+        """
+        analytes = loader.get_all_analytes()
+        return cls(
+            analytes,
+            [loader.get_molar_mass(analyte) for analyte in analytes],
+            aliases=loader.get_aliases()
+        )
+    
+    @property
+    def factors(self) -> np.ndarray:
+        """
+        Get the compiled (analyte × from_unit × to_unit) factor table.
+        
+        Returns:
+            Read-only array with a trailing NaN slice for unknown analytes
+        """
+        return self._factors
+    
+    @property
+    def index(self) -> Dict[str, int]:
+        """
+        Get the lookup table of the analytes.
+        
+        Returns:
+            Dictionary mapping name, normalized name or alias → table index
+            (shared, do not modify)
+        """
+        return self._index
+    
+    @property
+    def analytes(self) -> List[str]:
+        """
+        Get the analytes covered by the table.
+        
+        Returns:
+            List of analyte names
+        """
+        return list(self._analytes)
+    
+    def molar_mass(self, analyte: str) -> Optional[float]:
+        """
+        Get the molar mass used for an analyte.
+        
+        Args:
+            analyte: Name of the analyte
+            
+        Returns:
+            Molar mass in g/mol, or None if analyte not found
+        """
+        index = self.analyte_index(analyte)
+        return None if index < 0 else float(self._molar_masses[index])
+    
+    def analyte_index(self, analyte: str) -> int:
+        """
+        Get the table index of an analyte name or alias.
+        
+        Args:
+            analyte: Name or alias of the analyte
+            
+        Returns:
+            Table index, or -1 if analyte not found
+        """
+        index = self._index.get(analyte)
+        if index is None:
+            index = self._index.get(normalize_analyte_name(analyte), -1)
+        return index
+    
+    def analyte_name(self, index: int) -> str:
+        """
+        Get the canonical name of an analyte from its table index.
+        
+        Unlike `analytes`, the name list is not copied.
+        
+        Args:
+            index: Table index (see analyte_index)
+        
+        Returns:
+            Analyte name
+        """
+        return self._analytes[index]
+    
+    def factor(
+        self,
+        analyte: str,
+        from_unit: Union[str, Unit],
+        to_unit: Union[str, Unit]
+    ) -> Optional[float]:
+        """
+        Get the multiplicative factor between two units for an analyte.
+        
+        Args:
+            analyte: Name of the analyte
+            from_unit: Source unit code or spelling
+            to_unit: Target unit code or spelling
+            
+        Returns:
+            Conversion factor, or None if analyte or unit is invalid
+        """
+        index = self._index.get(analyte)
+        if index is None:
+            index = self._index.get(normalize_analyte_name(analyte), -1)
+        
+        rows = self._rows.get(index)
+        if rows is None:
+            rows = self._rows[index] = _to_rows(self._factors[index])
+        
+        factor = rows[_unit_code(from_unit)][_unit_code(to_unit)]
+        return None if math.isnan(factor) else factor
+    
+    def convert(
+        self,
+        value: float,
+        analyte: str,
+        from_unit: Union[str, Unit],
+        to_unit: Union[str, Unit]
+    ) -> Optional[float]:
+        """
+        Convert a value for a known analyte.
+        
+        Args:
+            value: The numerical value to convert
+            analyte: Name of the analyte
+            from_unit: Source unit code or spelling
+            to_unit: Target unit code or spelling
+            
+        Returns:
+            Converted value, or None if conversion is not possible
+        """
+        if value < 0:
+            return None
+        
+        factor = self.factor(analyte, from_unit, to_unit)
+        return None if factor is None else value * factor
+    
+    def convert_batch(self, values, analytes, from_units, to_units) -> np.ndarray:
+        """
+        Convert a whole column of values in one vectorized pass.
+        
+        Args:
+            values: Numerical values to convert
+            analytes: Analyte name(s) or table indices, scalar or array-like
+            from_units: Source unit(s), strings or unit codes
+            to_units: Target unit(s), strings or unit codes
+            
+        Returns:
+            Array of converted values, NaN where conversion is not possible
+        """
+        values = np.asarray(values, dtype=np.float64)
+        indices = self._analyte_indices(analytes)
+        from_codes = _unit_codes(from_units)
+        to_codes = _unit_codes(to_units)
+        
+        factors = self._factors[indices, from_codes, to_codes]
+        return np.where(values < 0, np.nan, values * factors)
+    
+    def _analyte_indices(self, analytes) -> Union[int, np.ndarray]:
+        """
+        Map analyte name(s) to table indices, -1 for unknown analytes.
+        
+        Args:
+            analytes: An analyte name, or an array-like of names or indices
+            
+        Returns:
+            Table index or array of indices
+        """
+        if isinstance(analytes, str):
+            return self.analyte_index(analytes)
+        
+        analytes = np.asarray(analytes)
+        if analytes.dtype.kind in "iu":
+            indices = analytes.astype(np.int64)
+            indices[(indices < 0) | (indices >= len(self))] = -1
+            return indices
+        
+        uniques, inverse = np.unique(analytes.astype(str), return_inverse=True)
+        lookup = np.array([self.analyte_index(a) for a in uniques], dtype=np.int64)
+        return lookup[inverse].reshape(analytes.shape)
@@ -1,12 +1,95 @@
 """
 Scientific Data Loader Module
 
-This module handles loading and validation of scientific data from CSV files.
+This module handles loading and validation of scientific data from CSV,
+Parquet or Arrow IPC files. Lookups only need the analyte index, which is
+built without pandas; the DataFrame is read when it is first requested.
 """
 
-import pandas as pd
+import math
+import re
+import unicodedata
+
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, List, Dict, Tuple
+
+from src.arrow_io import read_rows, read_table, write_table
+from src.units import Unit, parse_unit
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def normalize_analyte_name(name: str) -> str:
+    """
+    Normalize an analyte name or alias for index lookups.
+    
+    Accents are stripped, case is folded and runs of spaces, hyphens or
+    apostrophes become a single underscore ("Acide urique" → "acide_urique").
+    
+    Args:
+        name: Raw analyte name
+        
+    Returns:
+        Normalized name
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_name = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"[\s\-'’]+", "_", ascii_name.casefold().strip())
+
+
+@dataclass(frozen=True, slots=True)
+class _AnalyteRecord:
+    """Validated, pre-parsed row of the scientific data table."""
+    
+    analyte: str
+    molar_mass: float
+    source: str
+    common_units: Tuple[str, ...]
+    unit_codes: Tuple[Unit, ...]
+    
+    @classmethod
+    def compile(cls, row: Dict, number: int) -> "_AnalyteRecord":
+        """
+        Validate a table row and parse it once into a record.
+        
+        Args:
+            row: Table row as a dictionary
+            number: Row number (1-based, header excluded) for error messages
+            
+        Returns:
+            Analyte record
+            
+        Raises:
+            ValueError: If a value has the wrong type or is out of range,
+                or a unit is not recognized
+        """
+        analyte = row["analyte"]
+        if not isinstance(analyte, str) or not analyte.strip():
+            raise ValueError(f"Row {number}: analyte name is empty")
+        
+        try:
+            molar_mass = float(row["molar_mass"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Row {number} ({analyte}): molar_mass is not a number")
+        if not math.isfinite(molar_mass) or molar_mass <= 0:
+            raise ValueError(f"Row {number} ({analyte}): molar_mass must be positive")
+        
+        if row["unit"] != "g/mol":
+            raise ValueError(f"Row {number} ({analyte}): molar mass unit must be g/mol")
+        
+        source = row["source"]
+        if not isinstance(source, str) or not source.strip():
+            raise ValueError(f"Row {number} ({analyte}): source is empty")
+        
+        common_units = tuple(str(row["common_units"]).split(";"))
+        unit_codes = tuple(parse_unit(unit) for unit in common_units)
+        if None in unit_codes:
+            unknown = common_units[unit_codes.index(None)]
+            raise ValueError(f"Row {number} ({analyte}): unknown unit {unknown!r}")
+        
+        return cls(analyte, molar_mass, source, common_units, unit_codes)
 
 
 class ScientificDataLoader:
@@ -17,14 +100,134 @@ class ScientificDataLoader:
         Initialize the data loader.
         
         Args:
-            data_path: Path to the CSV file containing scientific data
+            data_path: Path to the file containing scientific data
+                (.csv, or .parquet / .arrow for memory-mapped loading)
         """
         self.data_path = Path(data_path)
-        self._data: Optional[pd.DataFrame] = None
+        self._data: Optional["pd.DataFrame"] = None
+        self._records: List[_AnalyteRecord] = []
+        self._index: Dict[str, _AnalyteRecord] = {}
+        self._indexed = False
+        self._decode: Optional[Callable[[], Tuple[List[Dict], Dict[str, int]]]] = None
         
-    def load_data(self) -> pd.DataFrame:
+    @classmethod
+    def from_compiled(
+        cls,
+        rows: List[Dict],
+        index: Dict[str, int],
+        data_path: str = "data/scientific_data.csv"
+    ) -> "ScientificDataLoader":
         """
-        Load scientific data from CSV file.
+        Build a loader from a catalogue compiled by another loader (e.g.,
+        published in shared memory), without reading or re-validating the
+        data file.
+        
+        Args:
+            rows: Analyte rows in table order (see compiled_rows)
+            index: Lookup key → row position (see compiled_index)
+            data_path: File the catalogue came from (used by load_data)
+            
+        Returns:
+            Loader with its index built
+        """
+        loader = cls(data_path)
+        loader._use_compiled(rows, index)
+        return loader
+    
+    @classmethod
+    def deferred(
+        cls,
+        decode: Callable[[], Tuple[List[Dict], Dict[str, int]]],
+        data_path: str = "data/scientific_data.csv"
+    ) -> "ScientificDataLoader":
+        """
+        Build a loader whose compiled catalogue is decoded on first use
+        (e.g., from the catalogue cache), so creating it costs nothing.
+        Pickling the loader decodes it.
+        
+        Args:
+            decode: Returns the rows and index (see from_compiled)
+            data_path: File the catalogue came from (used by load_data)
+            
+        Returns:
+            Loader that calls decode on first lookup
+        """
+        loader = cls(data_path)
+        loader._decode = decode
+        return loader
+    
+    def _use_compiled(self, rows: List[Dict], index: Dict[str, int]) -> None:
+        """
+        Adopt a compiled catalogue (see from_compiled).
+        
+        Args:
+            rows: Analyte rows in table order
+            index: Lookup key → row position
+        """
+        units = {unit.value: unit for unit in Unit}
+        records = [
+            _AnalyteRecord(
+                analyte=row["analyte"],
+                molar_mass=row["molar_mass"],
+                source=row["source"],
+                common_units=tuple(row["common_units"]),
+                unit_codes=tuple(units[code] for code in row["unit_codes"])
+            )
+            for row in rows
+        ]
+        self._index = {key: records[position] for key, position in index.items()}
+        self._records = records
+        self._indexed = True
+    
+    def __getstate__(self) -> Dict:
+        """
+        Get the state to pickle, decoding a deferred catalogue first (see
+        deferred).
+        
+        Returns:
+            Instance attributes, without the decoding function
+        """
+        if self._decode is not None:
+            self._ensure_index()
+        return {**vars(self), "_decode": None}
+    
+    def compiled_rows(self) -> List[Dict]:
+        """
+        Get the validated catalogue as plain rows (see from_compiled).
+        
+        Returns:
+            One dictionary per analyte with analyte, molar_mass, source,
+            common_units and unit_codes
+        """
+        self._ensure_index()
+        
+        return [
+            {
+                "analyte": record.analyte,
+                "molar_mass": record.molar_mass,
+                "source": record.source,
+                "common_units": list(record.common_units),
+                "unit_codes": [int(code) for code in record.unit_codes],
+            }
+            for record in self._records
+        ]
+    
+    def compiled_index(self) -> Dict[str, int]:
+        """
+        Get every lookup key with the position of its analyte (see
+        from_compiled).
+        
+        Returns:
+            Dictionary mapping name, normalized name or alias → row position
+        """
+        self._ensure_index()
+        
+        positions = {id(record): i for i, record in enumerate(self._records)}
+        return {key: positions[id(record)] for key, record in self._index.items()}
+    
+    def load_data(self) -> "pd.DataFrame":
+        """
+        Load scientific data from a CSV, Parquet or Arrow IPC file.
         
         Returns:
             DataFrame containing analyte data
@@ -33,60 +236,158 @@ class ScientificDataLoader:
             FileNotFoundError: If CSV file doesn't exist
             ValueError: If CSV format is invalid
         """
-        if not self.data_path.exists():
-            raise FileNotFoundError(
-                f"Scientific data file not found: {self.data_path}"
-            )
+        self._check_exists()
         
         try:
-            self._data = pd.read_csv(self.data_path)
-            self._validate_data()
+            data = read_table(self.data_path)
+            self._validate_columns(data.columns)
+            self._build_index(data.to_dict("records"), "aliases" in data.columns)
+            self._data = data
             return self._data
         except Exception as e:
             raise ValueError(f"Error loading scientific data: {str(e)}")
     
-    def _validate_data(self) -> None:
+    def load_index(self) -> None:
+        """
+        Build the analyte lookup index without loading a DataFrame.
+        
+        CSV files are parsed with the standard library, so lookups do not
+        import pandas.
+        
+        Raises:
+            FileNotFoundError: If the data file doesn't exist
+            ValueError: If the file format is invalid
+        """
+        self._check_exists()
+        
+        try:
+            rows = read_rows(self.data_path)
+            columns = rows[0].keys() if rows else []
+            self._validate_columns(columns)
+            self._build_index(rows, "aliases" in columns)
+        except Exception as e:
+            raise ValueError(f"Error loading scientific data: {str(e)}")
+    
+    def _check_exists(self) -> None:
+        """
+        Check that the data file exists.
+        
+        Raises:
+            FileNotFoundError: If the data file doesn't exist
+        """
+        if not self.data_path.exists():
+            raise FileNotFoundError(
+                f"Scientific data file not found: {self.data_path}"
+            )
+    
+    def _ensure_index(self) -> None:
+        """Build (or decode) the lookup index on first use."""
+        if not self._indexed:
+            if self._decode is not None:
+                self._use_compiled(*self._decode())
+            else:
+                self.load_index()
+    
+    def _validate_columns(self, columns: Iterable[str]) -> None:
         """
         Validate that loaded data has required columns.
         
+        Args:
+            columns: Column names of the loaded table
+            
         Raises:
             ValueError: If required columns are missing
         """
         required_columns = ["analyte", "molar_mass", "unit", "source", "common_units"]
         
-        if self._data is None:
-            raise ValueError("No data loaded")
-        
-        missing_columns = set(required_columns) - set(self._data.columns)
+        missing_columns = set(required_columns) - set(columns)
         if missing_columns:
             raise ValueError(
                 f"Missing required columns: {', '.join(missing_columns)}"
             )
     
+    def _build_index(self, rows: Iterable[Dict], has_aliases: bool) -> None:
+        """
+        Build the analyte lookup index from the table rows.
+        
+        Each row is validated and parsed once into a record. The index maps
+        the analyte name, its normalized form and every alias listed in the
+        optional "aliases" column (semicolon-separated) to that record.
+        Canonical names always take precedence over aliases.
+        
+        Args:
+            rows: Table rows as dictionaries
+            has_aliases: Whether the table has an "aliases" column
+            
+        Raises:
+            ValueError: If a row is invalid or an analyte is listed twice
+        """
+        records = []
+        aliases = []
+        names: Dict[str, str] = {}
+        index: Dict[str, _AnalyteRecord] = {}
+        
+        for number, row in enumerate(rows, start=1):
+            record = _AnalyteRecord.compile(row, number)
+            # "Glucose" and "glucose" would share one normalized lookup key
+            key = normalize_analyte_name(record.analyte)
+            if key in names:
+                raise ValueError(
+                    f"Row {number}: duplicate analyte {record.analyte!r} "
+                    f"(same as {names[key]!r})"
+                )
+            names[key] = record.analyte
+            records.append(record)
+            index[record.analyte] = record
+            index.setdefault(key, record)
+            row_aliases = row["aliases"] if has_aliases else None
+            if isinstance(row_aliases, str) and row_aliases:
+                aliases.extend((alias, record) for alias in row_aliases.split(";"))
+        
+        for alias, record in aliases:
+            index.setdefault(normalize_analyte_name(alias), record)
+        
+        self._records = records
+        self._index = index
+        self._indexed = True
+    
+    def _lookup(self, analyte: str) -> Optional[_AnalyteRecord]:
+        """
+        Find the record for an analyte name or alias in constant time.
+        
+        Args:
+            analyte: Name or alias of the analyte
+            
+        Returns:
+            Analyte record, or None if not found
+        """
+        self._ensure_index()
+        
+        record = self._index.get(analyte)
+        if record is None:
+            record = self._index.get(normalize_analyte_name(analyte))
+        return record
+    
     def get_analyte_info(self, analyte: str) -> Optional[Dict]:
         """
         Get information about a specific analyte.
         
         Args:
-            analyte: Name of the analyte (e.g., "creatinine")
+            analyte: Name or alias of the analyte (e.g., "creatinine", "urée")
             
         Returns:
             Dictionary with analyte information, or None if not found
         """
-        if self._data is None:
-            self.load_data()
+        record = self._lookup(analyte)
         
-        result = self._data[self._data["analyte"] == analyte.lower()]
-        
-        if result.empty:
+        if record is None:
             return None
         
-        row = result.iloc[0]
         return {
-            "analyte": row["analyte"],
-            "molar_mass": float(row["molar_mass"]),
-            "source": row["source"],
-            "common_units": row["common_units"].split(";")
+            "analyte": record.analyte,
+            "molar_mass": record.molar_mass,
+            "source": record.source,
+            "common_units": list(record.common_units)
         }
     
     def get_all_analytes(self) -> List[str]:
@@ -96,10 +397,20 @@ class ScientificDataLoader:
         Returns:
             List of analyte names
         """
-        if self._data is None:
-            self.load_data()
+        self._ensure_index()
         
-        return self._data["analyte"].tolist()
+        return [record.analyte for record in self._records]
+    
+    def get_aliases(self) -> Dict[str, str]:
+        """
+        Get every lookup key of the index with its analyte name.
+        
+        Returns:
+            Dictionary mapping alias (or normalized name) → analyte name
+        """
+        self._ensure_index()
+        
+        return {key: record.analyte for key, record in self._index.items()}
     
     def get_molar_mass(self, analyte: str) -> Optional[float]:
         """
@@ -111,8 +422,8 @@ class ScientificDataLoader:
         Returns:
             Molar mass in g/mol, or None if analyte not found
         """
-        info = self.get_analyte_info(analyte)
-        return info["molar_mass"] if info else None
+        record = self._lookup(analyte)
+        return record.molar_mass if record else None
     
     def get_common_units(self, analyte: str) -> Optional[List[str]]:
         """
@@ -124,11 +435,34 @@ class ScientificDataLoader:
         Returns:
             List of common units, or None if analyte not found
         """
-        info = self.get_analyte_info(analyte)
-        return info["common_units"] if info else None
+        record = self._lookup(analyte)
+        return list(record.common_units) if record else None
+    
+    def get_common_unit_codes(self, analyte: str) -> Optional[List[Unit]]:
+        """
+        Get common units for a specific analyte as canonical unit codes.
+        
+        Args:
+            analyte: Name of the analyte
+            
+        Returns:
+            List of unit codes, or None if analyte not found
+        """
+        record = self._lookup(analyte)
+        return list(record.unit_codes) if record else None
+    
+    def export_data(self, path: str) -> None:
+        """
+        Write the scientific data to another file, e.g. to convert the CSV
+        reference table to Parquet or Arrow IPC.
+        
+        Args:
+            path: Output path (.csv, .parquet or .arrow)
+        """
+        write_table(self.data, path)
     
     @property
-    def data(self) -> pd.DataFrame:
+    def data(self) -> "pd.DataFrame":
         """
         Get the loaded data.
         
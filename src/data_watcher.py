@@ -0,0 +1,108 @@
+"""
+Data Watcher Module
+
+This module watches the scientific data file and calls back when it
+changes, so reference data can be reloaded without restarting the
+application. Bursts of file-system events (editors often truncate, write
+and rename in quick succession) are collapsed into one callback, run on a
+background thread once the file has been quiet for a short delay. The
+optional watchdog package is only imported when watching starts.
+"""
+
+import importlib.util
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+# Quiet period before a change is reported (seconds)
+DEFAULT_DEBOUNCE_SECONDS = 0.5
+
+
+class DataWatcher:
+    """Reports changes to one file, debounced, on a background thread."""
+
+    def __init__(
+        self,
+        path: str,
+        on_change: Callable[[], None],
+        debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS
+    ):
+        """
+        Configure the watcher; nothing is watched until start().
+
+        Args:
+            path: File to watch
+            on_change: Called (without arguments) after the file changed
+            debounce_seconds: Quiet period before on_change is called
+        """
+        self.path = Path(path).resolve()
+        self.on_change = on_change
+        self.debounce_seconds = debounce_seconds
+        self._observer = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        """
+        Check whether the watchdog package is installed, without importing it.
+
+        Returns:
+            True if files can be watched
+        """
+        return importlib.util.find_spec("watchdog") is not None
+
+    @property
+    def running(self) -> bool:
+        """Whether the file is being watched."""
+        return self._observer is not None
+
+    def start(self) -> None:
+        """
+        Start watching the file's directory (once).
+
+        Raises:
+            ImportError: If watchdog is not installed
+        """
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type in ("opened", "closed_no_write"):
+                    return
+                paths = (event.src_path, getattr(event, "dest_path", ""))
+                if any(path and Path(path).resolve() == watcher.path for path in paths):
+                    watcher.notify()
+
+        with self._lock:
+            if self._observer is not None:
+                return
+            observer = Observer()
+            observer.daemon = True
+            observer.schedule(Handler(), str(self.path.parent), recursive=False)
+            observer.start()
+            self._observer = observer
+
+    def notify(self) -> None:
+        """Report a change once no other change follows within the debounce delay."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_seconds, self.on_change)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def stop(self) -> None:
+        """Stop watching and cancel any pending callback."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            observer, self._observer = self._observer, None
+
+        if observer is not None:
+            observer.stop()
+            observer.join()
@@ -0,0 +1,229 @@
+"""
+Extraction Cache Module
+
+This module provides a persistent, size-bounded LRU cache for the results
+of natural-language extraction with the local LLM. Entries are stored in
+SQLite and keyed by the normalized user input, the model name and a hash
+of the analyte list given to the model.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+DEFAULT_CACHE_PATH = ".cache/llm_extraction.sqlite3"
+
+
+def normalize_input(user_input: str) -> str:
+    """
+    Normalize a user phrase so that trivially different spellings share
+    a cache entry (case, Unicode form and whitespace are ignored).
+
+    Args:
+        user_input: Raw user phrase
+
+    Returns:
+        Normalized phrase
+    """
+    return " ".join(unicodedata.normalize("NFKC", user_input).casefold().split())
+
+
+def make_key(user_input: str, model: str, analytes: Iterable[str]) -> str:
+    """
+    Build the cache key for an extraction request.
+
+    Args:
+        user_input: Raw user phrase
+        model: Model name (e.g., "llama3.2")
+        analytes: Analyte names listed in the prompt
+
+    Returns:
+        Hex digest identifying the request
+    """
+    analytes_hash = hashlib.sha256("\n".join(analytes).encode("utf-8")).hexdigest()
+    payload = "\0".join([normalize_input(user_input), model, analytes_hash])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """SQLite-backed LRU cache of parsed extraction results."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = 1000,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite database file (":memory:" for a process-local cache)
+            max_entries: Maximum number of entries kept; least recently used
+                entries are evicted first
+            ttl_seconds: Entry lifetime in seconds, or None for no expiry
+            clock: Time source (seconds), injectable for tests
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up an entry and mark it as recently used.
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            Cached result, or None on a miss or an expired entry
+        """
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self._expired(row[1], now):
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, value: Dict) -> None:
+        """
+        Store an entry, evicting the least recently used ones if needed.
+
+        Args:
+            key: Cache key (see make_key)
+            value: JSON-serializable extraction result
+        """
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def get_or_compute(
+        self,
+        user_input: str,
+        model: str,
+        analytes: Iterable[str],
+        compute: Callable[[], Optional[Dict]]
+    ) -> Optional[Dict]:
+        """
+        Return the cached extraction for a request, computing it on a miss.
+
+        Failed extractions (None) are not cached.
+
+        Args:
+            user_input: Raw user phrase
+            model: Model name
+            analytes: Analyte names listed in the prompt
+            compute: Function calling the model and returning the parsed JSON
+
+        Returns:
+            Extraction result, or None if the computation failed
+        """
+        key = make_key(user_input, model, analytes)
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            if result is not None:
+                self.put(key, result)
+        return result
+
+    def purge_expired(self) -> int:
+        """
+        Delete every expired entry.
+
+        Returns:
+            Number of deleted entries
+        """
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE created < ?",
+                (self._clock() - self.ttl_seconds,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        """Delete every entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the hit/miss counters of this process.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
@@ -0,0 +1,175 @@
+"""
+History Export Module
+
+This module serializes the conversion history for download as CSV,
+Excel, Parquet or JSON Lines. Files are only generated when a download
+is requested, and the last files produced are reused until new entries
+are added to the history, so rendering the page does not depend on the
+size of the history. Excel export requires the optional openpyxl package.
+"""
+
+import csv
+import importlib.util
+import io
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+from src.history_store import HISTORY_COLUMNS, HistoryStore
+
+# Export format → (file extension, MIME type)
+EXPORT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "jsonl": ("jsonl", "application/x-ndjson"),
+}
+
+
+def available_formats() -> List[str]:
+    """
+    Get the export formats supported by the installed packages.
+
+    Returns:
+        Format names, in EXPORT_FORMATS order
+    """
+    return [
+        table_format for table_format in EXPORT_FORMATS
+        if table_format != "xlsx" or importlib.util.find_spec("openpyxl") is not None
+    ]
+
+
+def serialize(
+    entries: Sequence[Dict],
+    table_format: str,
+    columns: Sequence[str] = HISTORY_COLUMNS
+) -> bytes:
+    """
+    Serialize history entries.
+
+    Args:
+        entries: History entries
+        table_format: "csv", "xlsx", "parquet" or "jsonl"
+        columns: Columns to write, in order
+
+    Returns:
+        Serialized file contents
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if table_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows([entry.get(column) for column in columns] for entry in entries)
+        return buffer.getvalue().encode("utf-8-sig")
+
+    if table_format == "jsonl":
+        return "".join(
+            json.dumps({column: entry.get(column) for column in columns}, ensure_ascii=False) + "\n"
+            for entry in entries
+        ).encode("utf-8")
+
+    if table_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({
+            column: [entry.get(column) for entry in entries] for column in columns
+        })
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer)
+        return buffer.getvalue()
+
+    if table_format == "xlsx":
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("historique")
+        sheet.append(list(columns))
+        for entry in entries:
+            sheet.append([entry.get(column) for column in columns])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        return buffer.getvalue()
+
+    raise ValueError(f"Unsupported export format: {table_format}")
+
+
+class HistoryExporter:
+    """Builds history exports on demand and reuses them until the history changes."""
+
+    def __init__(self, store: HistoryStore, max_files: int = 8):
+        """
+        Attach the exporter to a history store.
+
+        Args:
+            store: History store to export
+            max_files: Number of generated files kept (one per format and
+                analyte filter)
+        """
+        self.store = store
+        self.max_files = max_files
+        self._files: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def export(self, table_format: str, analyte: Optional[str] = None) -> bytes:
+        """
+        Get the history as a file, generating it only if needed.
+
+        Args:
+            table_format: "csv", "xlsx", "parquet" or "jsonl"
+            analyte: Only export entries for this analyte
+
+        Returns:
+            Serialized file contents
+
+        Raises:
+            ValueError: If the format is not supported
+        """
+        if table_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {table_format}")
+
+        key = (table_format, analyte)
+        version = self.store.version
+        with self._lock:
+            cached = self._files.get(key)
+            if cached is not None and cached[0] == version:
+                self._files.move_to_end(key)
+                return cached[1]
+
+            data = serialize(self.store.entries(analyte), table_format)
+            self._files[key] = (version, data)
+            self._files.move_to_end(key)
+            while len(self._files) > self.max_files:
+                self._files.popitem(last=False)
+            return data
+
+    @staticmethod
+    def file_name(table_format: str, stem: str = "historique") -> str:
+        """
+        Build the download file name for a format.
+
+        Args:
+            table_format: Export format
+            stem: File name without extension
+
+        Returns:
+            File name with the format extension
+        """
+        return f"{stem}.{EXPORT_FORMATS[table_format][0]}"
+
+    @staticmethod
+    def mime_type(table_format: str) -> str:
+        """
+        Get the MIME type of a format.
+
+        Args:
+            table_format: Export format
+
+        Returns:
+            MIME type for the download
+        """
+        return EXPORT_FORMATS[table_format][1]
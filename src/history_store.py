@@ -0,0 +1,315 @@
+"""
+History Store Module
+
+This module keeps a persistent, session-independent log of conversions
+for traceability (ISO 15189). Entries are stored in SQLite in WAL mode, so
+pages can be read while other sessions write, and are never evicted.
+Queries are served by indexes on timestamp and analyte. The most recent
+entries are also kept in a fixed-size ring buffer, and the number of
+entries per analyte in a dictionary, so the default history view and its
+analyte filter are rendered without touching the database.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_HISTORY_PATH = "data/history.sqlite3"
+
+# Columns of a history entry, in export order
+HISTORY_COLUMNS = (
+    "timestamp",
+    "analyte",
+    "value_input",
+    "unit_from",
+    "value_output",
+    "unit_to",
+    "molar_mass",
+    "source",
+)
+
+# Number of recent entries kept in memory by default
+DEFAULT_RECENT_CAPACITY = 100
+
+
+class RecentHistory:
+    """
+    Fixed-capacity ring buffer of the most recent history entries.
+
+    Entries are stored column by column in preallocated lists; appending
+    overwrites the oldest slot in O(1) and reads walk the buffer from the
+    newest slot without copying it.
+    """
+
+    __slots__ = ("capacity", "_columns", "_start", "_size")
+
+    def __init__(self, capacity: int = DEFAULT_RECENT_CAPACITY):
+        """
+        Allocate the buffer.
+
+        Args:
+            capacity: Maximum number of entries kept
+
+        Raises:
+            ValueError: If capacity is not positive
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+
+        self.capacity = capacity
+        self._columns = {name: [None] * capacity for name in ("id",) + HISTORY_COLUMNS}
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.newest()
+
+    def append(self, entry: Dict) -> None:
+        """
+        Add an entry, evicting the oldest one when the buffer is full.
+
+        Args:
+            entry: History entry ("id" plus the HISTORY_COLUMNS keys)
+        """
+        slot = (self._start + self._size) % self.capacity
+        for name, column in self._columns.items():
+            column[slot] = entry.get(name)
+
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def newest(self, offset: int = 0, limit: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Iterate over the entries, most recent first.
+
+        Args:
+            offset: Number of recent entries to skip
+            limit: Maximum number of entries, or None for all
+
+        Yields:
+            History entries ("id" plus the HISTORY_COLUMNS keys)
+        """
+        stop = self._size if limit is None else min(self._size, offset + limit)
+        newest = self._start + self._size - 1
+        for k in range(offset, stop):
+            slot = (newest - k) % self.capacity
+            yield {name: column[slot] for name, column in self._columns.items()}
+
+
+class HistoryStore:
+    """SQLite-backed log of conversions with paginated queries."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_HISTORY_PATH,
+        recent_capacity: int = DEFAULT_RECENT_CAPACITY
+    ):
+        """
+        Open (or create) the history database.
+
+        The store is meant to be the only writer of its file: entries
+        written by another process are not seen by the in-memory buffer
+        until the store is reopened.
+
+        Args:
+            path: SQLite database file (":memory:" for a process-local store)
+            recent_capacity: Number of recent entries kept in memory
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversions ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " timestamp TEXT NOT NULL,"
+            " analyte TEXT NOT NULL,"
+            " value_input REAL NOT NULL,"
+            " unit_from TEXT NOT NULL,"
+            " value_output REAL NOT NULL,"
+            " unit_to TEXT NOT NULL,"
+            " molar_mass REAL,"
+            " source TEXT)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS conversions_timestamp ON conversions (timestamp)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS conversions_analyte"
+            " ON conversions (analyte, timestamp)"
+        )
+        self._conn.commit()
+
+        self.recent = self._load_recent(recent_capacity)
+        self._counts: Dict[str, int] = dict(self._conn.execute(
+            "SELECT analyte, COUNT(*) FROM conversions GROUP BY analyte"
+        ).fetchall())
+        self._total = sum(self._counts.values())
+
+    def append(self, entries: Iterable[Dict]) -> int:
+        """
+        Store conversions in a single transaction.
+
+        Args:
+            entries: History entries with the HISTORY_COLUMNS keys
+
+        Returns:
+            Number of stored entries
+        """
+        rows = [tuple(entry.get(column) for column in HISTORY_COLUMNS) for entry in entries]
+        if not rows:
+            return 0
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO conversions ({', '.join(HISTORY_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in HISTORY_COLUMNS)})",
+                    rows
+                )
+                last_id = self._conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+            self._total += len(rows)
+            analyte_index = HISTORY_COLUMNS.index("analyte")
+            for row in rows:
+                self._counts[row[analyte_index]] = self._counts.get(row[analyte_index], 0) + 1
+            newest = next(self.recent.newest(0, 1), None)
+            timestamps = ([newest["timestamp"]] if newest else []) + [row[0] for row in rows]
+            if any(later < earlier for earlier, later in zip(timestamps, timestamps[1:])):
+                # Back-dated entries: rebuild the buffer in timestamp order
+                self.recent = self._load_recent(self.recent.capacity)
+                return len(rows)
+
+            # Rows inserted in one transaction get consecutive ids
+            first_id = last_id - len(rows) + 1
+            for offset, row in enumerate(rows):
+                self.recent.append({"id": first_id + offset, **dict(zip(HISTORY_COLUMNS, row))})
+        return len(rows)
+
+    def page(
+        self,
+        page: int = 0,
+        page_size: int = 10,
+        analyte: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Get one page of entries, most recent first.
+
+        Unfiltered pages within the recent entries are served from memory.
+
+        Args:
+            page: Page number, starting at 0
+            page_size: Entries per page
+            analyte: Only return entries for this analyte
+
+        Returns:
+            List of entries (HISTORY_COLUMNS plus "id")
+        """
+        offset = page * page_size
+        where, params = self._filter(analyte)
+        with self._lock:
+            if analyte is None and (
+                offset + page_size <= len(self.recent) or len(self.recent) == self._total
+            ):
+                return list(self.recent.newest(offset, page_size))
+
+            rows = self._conn.execute(
+                f"SELECT id, {', '.join(HISTORY_COLUMNS)} FROM conversions{where}"
+                " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                (*params, page_size, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    @property
+    def version(self) -> int:
+        """
+        Get a number that changes whenever entries are added.
+
+        Returns:
+            Version of the history (the log is append-only, so this is the
+            number of entries)
+        """
+        with self._lock:
+            return self._total
+
+    def count(self, analyte: Optional[str] = None) -> int:
+        """
+        Count stored entries.
+
+        Args:
+            analyte: Only count entries for this analyte
+
+        Returns:
+            Number of entries
+        """
+        with self._lock:
+            return self._total if analyte is None else self._counts.get(analyte, 0)
+
+    def analytes(self) -> List[str]:
+        """
+        Get the analytes that appear in the history.
+
+        Returns:
+            Sorted list of analyte names
+        """
+        with self._lock:
+            return sorted(self._counts)
+
+    def entries(self, analyte: Optional[str] = None) -> List[Dict]:
+        """
+        Get every entry, oldest first (e.g., for exports).
+
+        Args:
+            analyte: Only return entries for this analyte
+
+        Returns:
+            List of entries with the HISTORY_COLUMNS keys
+        """
+        where, params = self._filter(analyte)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(HISTORY_COLUMNS)} FROM conversions{where}"
+                " ORDER BY timestamp, id",
+                params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def _load_recent(self, capacity: int) -> RecentHistory:
+        """
+        Fill a ring buffer with the most recent entries of the database.
+
+        Args:
+            capacity: Number of entries kept
+
+        Returns:
+            RecentHistory holding up to capacity entries
+        """
+        recent = RecentHistory(capacity)
+        rows = self._conn.execute(
+            f"SELECT id, {', '.join(HISTORY_COLUMNS)} FROM conversions"
+            " ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (capacity,)
+        ).fetchall()
+        for row in reversed(rows):
+            recent.append(dict(row))
+        return recent
+
+    @staticmethod
+    def _filter(analyte: Optional[str]):
+        if analyte is None:
+            return "", ()
+        return " WHERE analyte = ?", (analyte,)
@@ -0,0 +1,712 @@
+"""
+LLM Client Module
+
+This module wraps the local Ollama server for natural-language extraction.
+Requests run on a dedicated asyncio event loop in a background thread, so
+the HTTP connection pool of `ollama.AsyncClient` is reused across calls,
+each request has its own timeout (cancelling it on expiry) and several
+extractions can be issued concurrently from synchronous code such as the
+Streamlit script.
+
+Answers are constrained with a JSON schema built from the analyte list
+and the unit codes (Ollama's `format`), so they are always parseable and
+the prompt itself can stay short. Single extractions are streamed: the
+answer is parsed as it arrives and generation is stopped as soon as
+every extraction field is complete, so verbose models do not make the
+user wait for text that is never used.
+
+Every request reports its timings (model load, prompt evaluation,
+generation and time to first token) as a ModelTimings record, so that
+cold starts can be tracked (see src.model_manager).
+"""
+
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Union
+
+from src.units import Unit
+
+DEFAULT_MODEL = "llama3.2"
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Fields of a single extraction; streaming stops once all of them are parsed
+EXTRACTION_FIELDS = ("analyte", "value", "unit_from", "unit_to")
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class ExtractionError(Exception):
+    """Raised when the model cannot produce a usable extraction."""
+
+
+@dataclass(frozen=True)
+class ModelTimings:
+    """Timings of one model request, in seconds (None when not reported)."""
+
+    request: str
+    total_seconds: float
+    first_token_seconds: Optional[float] = None
+    load_seconds: Optional[float] = None
+    prompt_eval_seconds: Optional[float] = None
+    eval_seconds: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    eval_tokens: Optional[int] = None
+
+    @classmethod
+    def from_response(
+        cls,
+        request: str,
+        response: Mapping,
+        total_seconds: float,
+        first_token_seconds: Optional[float] = None
+    ) -> "ModelTimings":
+        """
+        Read the timings reported in the metadata of a final Ollama response.
+
+        Args:
+            request: Kind of request ("preload", "chat" or "stream")
+            response: Final response (done=True) with Ollama's *_duration
+                (nanoseconds) and *_count fields
+            total_seconds: Wall-clock duration measured by the client
+            first_token_seconds: Time to the first streamed piece, if streamed
+
+        Returns:
+            ModelTimings instance
+        """
+        def seconds(key):
+            nanoseconds = response.get(key)
+            return nanoseconds / 1e9 if nanoseconds is not None else None
+
+        return cls(
+            request=request,
+            total_seconds=total_seconds,
+            first_token_seconds=first_token_seconds,
+            load_seconds=seconds("load_duration"),
+            prompt_eval_seconds=seconds("prompt_eval_duration"),
+            eval_seconds=seconds("eval_duration"),
+            prompt_tokens=response.get("prompt_eval_count"),
+            eval_tokens=response.get("eval_count"),
+        )
+
+
+class IncrementalJSONParser:
+    """
+    Parser for a flat JSON object that arrives in pieces.
+
+    Members are made available as soon as their value is complete; the
+    text before the opening brace (e.g., a Markdown fence) is ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.fields: Dict = {}
+        self.closed = False
+        self._pos: Optional[int] = None
+
+    def feed(self, chunk: str) -> Dict:
+        """
+        Add a piece of the answer and parse the members it completes.
+
+        Args:
+            chunk: Next piece of the streamed answer
+
+        Returns:
+            Members parsed so far
+        """
+        self.text += chunk
+        if not self.closed:
+            self._advance()
+        return self.fields
+
+    def has(self, keys: Sequence[str]) -> bool:
+        """
+        Check whether the given members have all been parsed.
+
+        Args:
+            keys: Member names
+
+        Returns:
+            True if every member is complete
+        """
+        return all(key in self.fields for key in keys)
+
+    def _advance(self) -> None:
+        """Parse every member that is complete in the buffered text."""
+        text = self.text
+        if self._pos is None:
+            start = text.find("{")
+            if start < 0:
+                return
+            self._pos = start + 1
+
+        while True:
+            pos = self._skip_whitespace(self._pos)
+            if pos >= len(text):
+                return
+            if text[pos] == ",":
+                self._pos = pos + 1
+                continue
+            if text[pos] == "}":
+                self.closed = True
+                self._pos = pos + 1
+                return
+            if text[pos] != '"':
+                # Not a flat object: leave it to the final json.loads
+                return
+
+            try:
+                key, pos = _DECODER.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                return
+            pos = self._skip_whitespace(pos)
+            if pos >= len(text) or text[pos] != ":":
+                return
+            pos = self._skip_whitespace(pos + 1)
+            try:
+                value, end = _DECODER.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                return
+            if isinstance(value, (int, float)) and (
+                end == len(text) or text[end] not in _WHITESPACE + ",}"
+            ):
+                # More digits, a fraction or an exponent may follow
+                return
+
+            self.fields[key] = value
+            self._pos = end
+
+    def _skip_whitespace(self, pos: int) -> int:
+        while pos < len(self.text) and self.text[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+
+def build_schema(analytes: Sequence[str]) -> Dict:
+    """
+    Build the JSON schema of a single extraction.
+
+    The schema is passed as Ollama's `format`, so that the model can only
+    emit a parseable object whose analyte and units are in the vocabulary.
+    Properties follow EXTRACTION_FIELDS, the order they are generated in.
+
+    Args:
+        analytes: Analyte names the model may choose from
+
+    Returns:
+        JSON schema of the extraction object
+    """
+    units = [unit.label for unit in Unit] + [None]
+    return {
+        "type": "object",
+        "properties": {
+            "analyte": {"enum": list(analytes) + [None]},
+            "value": {"type": ["number", "null"]},
+            "unit_from": {"enum": units},
+            "unit_to": {"enum": units},
+        },
+        "required": list(EXTRACTION_FIELDS),
+    }
+
+
+def build_batch_schema(analytes: Sequence[str], count: int) -> Dict:
+    """
+    Build the JSON schema of a batch extraction.
+
+    Args:
+        analytes: Analyte names the model may choose from
+        count: Number of phrases in the prompt
+
+    Returns:
+        JSON schema of an object holding one extraction per phrase
+    """
+    item = build_schema(analytes)
+    item["properties"] = {"line": {"type": "integer"}, **item["properties"]}
+    item["required"] = ["line"] + item["required"]
+    return {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": item,
+                "minItems": count,
+                "maxItems": count,
+            },
+        },
+        "required": ["results"],
+    }
+
+
+def build_prompt(user_input: str) -> str:
+    """
+    Build the extraction prompt for one user phrase.
+
+    The vocabulary and output format are carried by the schema (see
+    build_schema), which keeps the prompt short.
+
+    Args:
+        user_input: User phrase in natural language
+
+    Returns:
+        Prompt text
+    """
+    return (
+        "Extrais de cette demande de laboratoire l'analyte, la valeur, l'unité "
+        "d'origine et l'unité cible (null si absent) : "
+        f'"{user_input}"'
+    )
+
+
+def build_batch_prompt(lines: Sequence[str]) -> str:
+    """
+    Build a single extraction prompt for several user phrases.
+
+    Args:
+        lines: User phrases, one result each
+
+    Returns:
+        Prompt text asking for one result per numbered phrase
+    """
+    numbered = "\n".join(f"{i}. {line}" for i, line in enumerate(lines, start=1))
+    return (
+        "Pour chaque ligne, extrais l'analyte, la valeur, l'unité d'origine et "
+        "l'unité cible (null si absent), dans l'ordre, avec le numéro de ligne :\n"
+        f"{numbered}"
+    )
+
+
+def parse_response(content: str) -> Dict:
+    """
+    Parse the JSON object returned by the model.
+
+    Args:
+        content: Raw message content (may be wrapped in Markdown fences)
+
+    Returns:
+        Parsed extraction
+
+    Raises:
+        ExtractionError: If the content is not a JSON object
+    """
+    content = content.strip().replace("```json", "").replace("```", "").strip()
+    try:
+        result = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ExtractionError(f"Invalid JSON from model: {e}") from e
+    if not isinstance(result, dict):
+        raise ExtractionError("Model response is not a JSON object")
+    return result
+
+
+def parse_batch_response(content: str, count: int) -> List[Optional[Dict]]:
+    """
+    Parse the JSON array returned for a batch prompt.
+
+    Objects are matched to phrases by their "line" number when present,
+    otherwise by position. Phrases without a usable object get None.
+
+    Args:
+        content: Raw message content (may be wrapped in Markdown fences)
+        count: Number of phrases in the prompt
+
+    Returns:
+        One extraction (or None) per phrase, in order
+
+    Raises:
+        ExtractionError: If the content is not a JSON array
+    """
+    content = content.strip().replace("```json", "").replace("```", "").strip()
+    try:
+        items = json.loads(content)
+    except json.JSONDecodeError as e:
+        raise ExtractionError(f"Invalid JSON from model: {e}") from e
+    if isinstance(items, dict):
+        # Some models wrap the array in an object
+        items = next((v for v in items.values() if isinstance(v, list)), [items])
+    if not isinstance(items, list):
+        raise ExtractionError("Model response is not a JSON array")
+
+    results: List[Optional[Dict]] = [None] * count
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        line = item.get("line")
+        index = line - 1 if isinstance(line, int) and 1 <= line <= count else position
+        if index < count and results[index] is None:
+            results[index] = item
+    return results
+
+
+class ExtractionClient:
+    """Asynchronous Ollama client with connection reuse and timeouts."""
+
+    def __init__(
+        self,
+        model: str = DEFAULT_MODEL,
+        host: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        keep_alive: Optional[Union[float, str]] = None,
+        on_timings: Optional[Callable[[ModelTimings], None]] = None
+    ):
+        """
+        Start the client's event loop.
+
+        Args:
+            model: Ollama model name
+            host: Ollama server URL (defaults to OLLAMA_HOST or localhost)
+            timeout: Per-request timeout in seconds
+            max_concurrency: Maximum number of requests in flight at once
+            keep_alive: How long the server keeps the model loaded after a
+                request (seconds, or a duration such as "30m"; negative keeps
+                it loaded); None uses the server default
+            on_timings: Called with the ModelTimings of every request
+        """
+        self.model = model
+        self.host = host
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.keep_alive = keep_alive
+        self.on_timings = on_timings
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="ollama-client", daemon=True
+        )
+        self._thread.start()
+
+    def _get_client(self):
+        """
+        Create the Ollama client lazily, on the client's event loop.
+
+        Returns:
+            ollama.AsyncClient instance
+        """
+        if self._client is None:
+            import httpx
+            import ollama
+
+            self._client = ollama.AsyncClient(
+                host=self.host,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _chat(self, prompt: str, schema: Dict) -> str:
+        """
+        Send one prompt to the model, honouring the timeout and concurrency limit.
+
+        Args:
+            prompt: Prompt text
+            schema: JSON schema constraining the answer
+
+        Returns:
+            Message content of the response
+
+        Raises:
+            ExtractionError: On timeout or connection failure
+        """
+        client = self._get_client()
+        messages = [{"role": "user", "content": prompt}]
+
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    client.chat(
+                        model=self.model,
+                        messages=messages,
+                        format=schema,
+                        keep_alive=self.keep_alive
+                    ),
+                    timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                raise ExtractionError(
+                    f"Model did not answer within {self.timeout:g} s"
+                ) from None
+            except Exception as e:
+                raise ExtractionError(str(e)) from e
+
+        self._report(
+            ModelTimings.from_response("chat", response, time.perf_counter() - start)
+        )
+        return response["message"]["content"]
+
+    async def apreload(self) -> ModelTimings:
+        """
+        Load the model into memory without generating anything.
+
+        Returns:
+            Timings of the load request
+
+        Raises:
+            ExtractionError: On timeout or connection failure
+        """
+        client = self._get_client()
+        start = time.perf_counter()
+        try:
+            # A chat request without messages only loads the model
+            response = await asyncio.wait_for(
+                client.chat(model=self.model, messages=[], keep_alive=self.keep_alive),
+                timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise ExtractionError(
+                f"Model was not loaded within {self.timeout:g} s"
+            ) from None
+        except Exception as e:
+            raise ExtractionError(str(e)) from e
+
+        timings = ModelTimings.from_response(
+            "preload", response, time.perf_counter() - start
+        )
+        self._report(timings)
+        return timings
+
+    async def aextract(self, user_input: str, analytes: Sequence[str]) -> Dict:
+        """
+        Extract analyte, value and units from one phrase.
+
+        The answer is streamed and generation is stopped as soon as all
+        extraction fields have been parsed.
+
+        Args:
+            user_input: User phrase in natural language
+            analytes: Analyte names the model may choose from
+
+        Returns:
+            Parsed extraction
+
+        Raises:
+            ExtractionError: On timeout, connection failure or invalid output
+        """
+        client = self._get_client()
+        messages = [{"role": "user", "content": build_prompt(user_input)}]
+        schema = build_schema(analytes)
+
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._stream_extraction(client, messages, schema),
+                    timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                raise ExtractionError(
+                    f"Model did not answer within {self.timeout:g} s"
+                ) from None
+            except ExtractionError:
+                raise
+            except Exception as e:
+                raise ExtractionError(str(e)) from e
+
+    async def _stream_extraction(
+        self,
+        client,
+        messages: List[Dict],
+        schema: Dict
+    ) -> Dict:
+        """
+        Stream a chat answer, stopping once the extraction is complete.
+
+        Args:
+            client: ollama.AsyncClient instance
+            messages: Chat messages
+            schema: JSON schema constraining the answer
+
+        Returns:
+            Parsed extraction
+
+        Raises:
+            ExtractionError: If the answer is not a JSON object
+        """
+        parser = IncrementalJSONParser()
+        start = time.perf_counter()
+        first_token = None
+        last = None
+        stream = await client.chat(
+            model=self.model,
+            messages=messages,
+            format=schema,
+            stream=True,
+            keep_alive=self.keep_alive
+        )
+        try:
+            async for part in stream:
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                last = part
+                parser.feed(part["message"]["content"])
+                if parser.closed or parser.has(EXTRACTION_FIELDS):
+                    break
+        finally:
+            # Closing the response makes the server stop generating
+            await stream.aclose()
+
+        total = time.perf_counter() - start
+        if last is not None and last.get("done"):
+            self._report(ModelTimings.from_response("stream", last, total, first_token))
+        else:
+            # Stopped early: the server's metadata is only in the final piece
+            self._report(ModelTimings("stream", total, first_token))
+
+        if parser.closed or parser.has(EXTRACTION_FIELDS):
+            return dict(parser.fields)
+        return parse_response(parser.text)
+
+    async def aextract_batch(
+        self,
+        lines: Sequence[str],
+        analytes: Sequence[str]
+    ) -> List[Optional[Dict]]:
+        """
+        Extract several phrases with a single model round trip.
+
+        Args:
+            lines: User phrases
+            analytes: Analyte names the model may choose from
+
+        Returns:
+            One extraction (or None if the model skipped it) per phrase
+
+        Raises:
+            ExtractionError: On timeout, connection failure or invalid output
+        """
+        if not lines:
+            return []
+        content = await self._chat(
+            build_batch_prompt(lines), build_batch_schema(analytes, len(lines))
+        )
+        return parse_batch_response(content, len(lines))
+
+    async def aextract_many(
+        self,
+        inputs: Sequence[str],
+        analytes: Sequence[str]
+    ) -> List[Union[Dict, ExtractionError]]:
+        """
+        Extract several phrases concurrently.
+
+        Args:
+            inputs: User phrases
+            analytes: Analyte names the model may choose from
+
+        Returns:
+            One result per phrase, in order: the parsed extraction, or the
+            ExtractionError raised for that phrase
+        """
+        return await asyncio.gather(
+            *(self.aextract(text, analytes) for text in inputs),
+            return_exceptions=True
+        )
+
+    def extract(self, user_input: str, analytes: Sequence[str]) -> Dict:
+        """
+        Synchronous wrapper around aextract.
+
+        Args:
+            user_input: User phrase in natural language
+            analytes: Analyte names the model may choose from
+
+        Returns:
+            Parsed extraction
+
+        Raises:
+            ExtractionError: On timeout, connection failure or invalid output
+        """
+        return self._run(self.aextract(user_input, analytes))
+
+    def extract_many(
+        self,
+        inputs: Sequence[str],
+        analytes: Sequence[str]
+    ) -> List[Union[Dict, ExtractionError]]:
+        """
+        Synchronous wrapper around aextract_many.
+
+        Args:
+            inputs: User phrases
+            analytes: Analyte names the model may choose from
+
+        Returns:
+            One result (extraction or ExtractionError) per phrase, in order
+        """
+        return self._run(self.aextract_many(inputs, analytes))
+
+    def extract_batch(
+        self,
+        lines: Sequence[str],
+        analytes: Sequence[str]
+    ) -> List[Optional[Dict]]:
+        """
+        Synchronous wrapper around aextract_batch.
+
+        Args:
+            lines: User phrases
+            analytes: Analyte names the model may choose from
+
+        Returns:
+            One extraction (or None) per phrase, in order
+
+        Raises:
+            ExtractionError: On timeout, connection failure or invalid output
+        """
+        return self._run(self.aextract_batch(lines, analytes))
+
+    def preload(self) -> ModelTimings:
+        """
+        Synchronous wrapper around apreload.
+
+        Returns:
+            Timings of the load request
+
+        Raises:
+            ExtractionError: On timeout or connection failure
+        """
+        return self._run(self.apreload())
+
+    def _report(self, timings: ModelTimings) -> None:
+        if self.on_timings is not None:
+            self.on_timings(timings)
+
+    def _run(self, coroutine):
+        """
+        Run a coroutine on the client's loop and wait for its result.
+
+        If the calling thread is interrupted, the coroutine is cancelled.
+
+        Args:
+            coroutine: Coroutine to run
+
+        Returns:
+            The coroutine's result
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        """Close the HTTP connections and stop the event loop."""
+        if self._client is not None:
+            # ollama.AsyncClient does not expose aclose(); close its httpx client
+            http_client = getattr(self._client, "_client", None)
+            if http_client is not None:
+                asyncio.run_coroutine_threadsafe(
+                    http_client.aclose(), self._loop
+                ).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,210 @@
+"""
+Metrics Module
+
+This module times the hot paths of the application (conversions, model
+extractions, reference data loading, history exports). Each operation
+keeps a count, an error count, the total time and a window of recent
+latencies from which p50/p95/p99 are computed. Metrics can be exported as
+JSON or in the Prometheus text format. When disabled, timers are a shared
+no-op context manager, so instrumented code pays a single attribute check.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, Optional
+
+# Latency samples kept per operation for percentiles
+DEFAULT_WINDOW = 1024
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_DISABLED = nullcontext()
+
+
+class _Operation:
+    """Counters and recent latencies of one operation."""
+
+    __slots__ = ("count", "errors", "total_seconds", "max_seconds", "samples")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=window)
+
+
+class _Timer:
+    """Context manager recording the duration of one call."""
+
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.metrics.observe(self.name, elapsed, error=exc_type is not None)
+        return False
+
+
+def percentile(sorted_samples, quantile: float) -> Optional[float]:
+    """
+    Get a percentile with the nearest-rank method.
+
+    Args:
+        sorted_samples: Samples in ascending order
+        quantile: Quantile between 0 and 1
+
+    Returns:
+        The percentile, or None without samples
+    """
+    if not sorted_samples:
+        return None
+    rank = max(1, math.ceil(quantile * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+class Metrics:
+    """Registry of per-operation latency metrics."""
+
+    def __init__(self, enabled: bool = True, window: int = DEFAULT_WINDOW):
+        """
+        Create an empty registry.
+
+        Args:
+            enabled: Whether timers record anything
+            window: Latency samples kept per operation
+        """
+        self.enabled = enabled
+        self.window = window
+        self._operations: Dict[str, _Operation] = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name: str):
+        """
+        Time a block of code.
+
+        Args:
+            name: Operation name
+
+        Returns:
+            Context manager recording the block's duration (and whether it
+            raised), or a no-op if metrics are disabled
+        """
+        if not self.enabled:
+            return _DISABLED
+        return _Timer(self, name)
+
+    def observe(self, name: str, seconds: float, error: bool = False) -> None:
+        """
+        Record one call of an operation.
+
+        Args:
+            name: Operation name
+            seconds: Duration of the call
+            error: Whether the call failed
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            operation = self._operations.get(name)
+            if operation is None:
+                operation = self._operations[name] = _Operation(self.window)
+            operation.count += 1
+            operation.errors += error
+            operation.total_seconds += seconds
+            operation.max_seconds = max(operation.max_seconds, seconds)
+            operation.samples.append(seconds)
+
+    def reset(self) -> None:
+        """Forget every recorded call."""
+        with self._lock:
+            self._operations.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Summarize every operation.
+
+        Returns:
+            Dictionary mapping operation name → count, errors,
+            total_seconds, max_seconds, p50, p95 and p99 (seconds, over the
+            recent window)
+        """
+        with self._lock:
+            operations = {
+                name: (op.count, op.errors, op.total_seconds, op.max_seconds, sorted(op.samples))
+                for name, op in self._operations.items()
+            }
+
+        summary = {}
+        for name, (count, errors, total, maximum, samples) in sorted(operations.items()):
+            summary[name] = {
+                "count": count,
+                "errors": errors,
+                "total_seconds": total,
+                "max_seconds": maximum,
+            }
+            for quantile in QUANTILES:
+                summary[name][f"p{round(quantile * 100)}"] = percentile(samples, quantile)
+        return summary
+
+    def to_json(self) -> str:
+        """
+        Export the metrics as JSON.
+
+        Returns:
+            JSON document with one object per operation
+        """
+        return json.dumps({"operations": self.snapshot()}, indent=2)
+
+    def to_prometheus(self, prefix: str = "labconv") -> str:
+        """
+        Export the metrics in the Prometheus text format.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            One summary (quantiles, _sum, _count) and one error counter,
+            labelled by operation
+        """
+        name = f"{prefix}_operation_seconds"
+        errors = f"{prefix}_operation_errors_total"
+        lines = [
+            f"# HELP {name} Latency of instrumented operations.",
+            f"# TYPE {name} summary",
+        ]
+        snapshot = self.snapshot()
+        for operation, stats in snapshot.items():
+            for quantile in QUANTILES:
+                value = stats[f"p{round(quantile * 100)}"]
+                lines.append(f'{name}{{operation="{operation}",quantile="{quantile}"}} {value}')
+            lines.append(f'{name}_sum{{operation="{operation}"}} {stats["total_seconds"]}')
+            lines.append(f'{name}_count{{operation="{operation}"}} {stats["count"]}')
+        lines.append(f"# HELP {errors} Failed calls of instrumented operations.")
+        lines.append(f"# TYPE {errors} counter")
+        for operation, stats in snapshot.items():
+            lines.append(f'{errors}{{operation="{operation}"}} {stats["errors"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path) -> None:
+        """
+        Write the metrics to a file (JSON for .json, Prometheus text otherwise).
+
+        Args:
+            path: Output file
+        """
+        path = Path(path)
+        text = self.to_json() if path.suffix.lower() == ".json" else self.to_prometheus()
+        path.write_text(text, encoding="utf-8")
@@ -0,0 +1,130 @@
+"""
+Model Manager Module
+
+This module manages the lifecycle of the local extraction model: it
+preloads the model in a background thread when the application starts,
+so that the first AI-mode query does not pay the load time, and keeps the
+timings reported by recent requests to track cold-start latency.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from src.llm_client import ExtractionClient, ExtractionError, ModelTimings
+
+# Model states
+COLD = "cold"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+# Load durations above this are counted as cold starts (seconds)
+COLD_START_SECONDS = 0.5
+
+
+class ModelManager:
+    """Preloads the extraction model and collects request timings."""
+
+    def __init__(self, client: ExtractionClient, history: int = 100):
+        """
+        Attach the manager to a client.
+
+        Args:
+            client: ExtractionClient whose model is managed; its keep_alive
+                setting applies to the preload request too
+            history: Number of recent request timings kept
+        """
+        self.client = client
+        self.state = COLD
+        self.error: Optional[str] = None
+        self._timings = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        client.on_timings = self.record
+
+    def start(self) -> None:
+        """Preload the model in a background thread (once)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.state = LOADING
+            self._thread = threading.Thread(
+                target=self._preload, name="ollama-preload", daemon=True
+            )
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the preload to finish.
+
+        Args:
+            timeout: Maximum wait in seconds, or None to wait indefinitely
+
+        Returns:
+            True if the model is loaded
+        """
+        self._loaded.wait(timeout)
+        return self.state == READY
+
+    def record(self, timings: ModelTimings) -> None:
+        """
+        Keep the timings of a request.
+
+        Args:
+            timings: Timings reported by the client
+        """
+        with self._lock:
+            self._timings.append(timings)
+
+    @property
+    def timings(self) -> List[ModelTimings]:
+        """
+        Get the recent request timings, oldest first.
+
+        Returns:
+            List of ModelTimings
+        """
+        with self._lock:
+            return list(self._timings)
+
+    @property
+    def stats(self) -> Dict:
+        """
+        Summarize the model state and the recent timings.
+
+        Returns:
+            Dictionary with state, requests (excluding the preload),
+            cold_starts, last_load_seconds, max_load_seconds,
+            last_first_token_seconds and mean_first_token_seconds (None when
+            nothing was measured)
+        """
+        timings = self.timings
+        loads = [t.load_seconds for t in timings if t.load_seconds is not None]
+        first_tokens = [
+            t.first_token_seconds for t in timings if t.first_token_seconds is not None
+        ]
+        return {
+            "state": self.state,
+            "requests": sum(t.request != "preload" for t in timings),
+            "cold_starts": sum(load >= COLD_START_SECONDS for load in loads),
+            "last_load_seconds": loads[-1] if loads else None,
+            "max_load_seconds": max(loads) if loads else None,
+            "last_first_token_seconds": first_tokens[-1] if first_tokens else None,
+            "mean_first_token_seconds": (
+                sum(first_tokens) / len(first_tokens) if first_tokens else None
+            ),
+        }
+
+    def _preload(self) -> None:
+        """Load the model, recording the outcome in the state."""
+        try:
+            self.client.preload()
+        except ExtractionError as e:
+            self.error = str(e)
+            self.state = FAILED
+        else:
+            self.state = READY
+        finally:
+            self._loaded.set()
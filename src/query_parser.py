@@ -0,0 +1,304 @@
+"""
+Query Parser Module
+
+This module provides a deterministic, rule-based extractor for
+well-formed natural-language conversion requests such as
+"Creatinine 19243 µmol/L vers g/L". It resolves those without calling the
+LLM and declines anything it cannot parse with confidence, so that the
+caller can fall back to the model.
+"""
+
+import re
+import threading
+import unicodedata
+from functools import cached_property
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.data_loader import normalize_analyte_name
+from src.units import parse_unit
+
+# A number, with "." or "," as decimal separator
+_NUMBER = re.compile(r"(?<![\w.,])\d+(?:[.,]\d+)?(?![.,]?\d)")
+
+# Concentration units; molar units may omit the "/L"
+_UNIT = re.compile(
+    r"(?<![a-z])(?:(?P<molar>[uμm]mol)(?:\s*/\s*l)?|mg\s*/\s*dl|g\s*/\s*l)(?![a-z])"
+)
+
+_WORD = re.compile(r"[a-z]+")
+
+# A sign before, or an exponent after, a number that _NUMBER does not read
+_SIGN = re.compile(r"[-+\u2212]$")
+_EXPONENT = re.compile(r"e[-+\u2212]?\d")
+
+
+def _fold(text: str) -> str:
+    """
+    Case-fold a phrase and strip accents, keeping the micro sign as μ.
+
+    Args:
+        text: Raw phrase
+
+    Returns:
+        Folded phrase
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def mentions_result(text: str) -> bool:
+    """
+    Check whether a phrase contains a number and a concentration unit.
+
+    Args:
+        text: Raw phrase
+
+    Returns:
+        True if the phrase reads like a result (e.g., "crea 88 µmol")
+    """
+    folded = _fold(text)
+    without_units = _UNIT.sub(lambda m: " " * len(m.group()), folded)
+    return without_units != folded and _NUMBER.search(without_units) is not None
+
+
+class QueryParser:
+    """Rule-based extractor for analyte, value and units."""
+
+    def __init__(self, analytes: Iterable[str], aliases: Optional[Dict[str, str]] = None):
+        """
+        Build the analyte vocabulary.
+
+        Args:
+            analytes: Canonical analyte names
+            aliases: Optional mapping of alias → analyte name
+        """
+        self._vocabulary: Dict[str, str] = {}
+        for analyte in analytes:
+            self._vocabulary[normalize_analyte_name(analyte)] = analyte
+        for alias, analyte in (aliases or {}).items():
+            self._vocabulary.setdefault(normalize_analyte_name(alias), analyte)
+
+        self._max_words = max(
+            (key.count("_") + 1 for key in self._vocabulary), default=1
+        )
+        self.parsed = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_loader(cls, loader) -> "QueryParser":
+        """
+        Build a parser from a ScientificDataLoader.
+
+        Args:
+            loader: ScientificDataLoader instance
+
+        Returns:
+            QueryParser instance
+        """
+        return cls(loader.get_all_analytes(), loader.get_aliases())
+
+    @classmethod
+    def from_vocabulary(cls, vocabulary: Dict[str, str]) -> "QueryParser":
+        """
+        Build a parser from the vocabulary of another parser (e.g., cached
+        with the compiled catalogue), without normalizing names again.
+
+        Args:
+            vocabulary: Normalized name → analyte (see compiled_vocabulary)
+
+        Returns:
+            QueryParser instance
+        """
+        parser = cls(())
+        parser._vocabulary = dict(vocabulary)
+        parser._max_words = max(
+            (key.count("_") + 1 for key in parser._vocabulary), default=1
+        )
+        return parser
+
+    @classmethod
+    def deferred(cls, decode: Callable[[], Dict[str, str]]) -> "QueryParser":
+        """
+        Build a parser whose vocabulary is decoded on first parse (e.g.,
+        from the catalogue cache), so creating it costs nothing. Pickling
+        the parser decodes it.
+
+        Args:
+            decode: Returns the vocabulary (see from_vocabulary)
+
+        Returns:
+            QueryParser instance
+        """
+        parser = cls.__new__(cls)
+        parser._decode = decode
+        parser.parsed = 0
+        parser.fallbacks = 0
+        parser._lock = threading.Lock()
+        return parser
+
+    # The constructors set these two directly; deferred parsers decode them
+    # on first access, then read them from the instance like the others
+    @cached_property
+    def _vocabulary(self) -> Dict[str, str]:
+        """Normalized name or alias → analyte name."""
+        return self._decode()
+
+    @cached_property
+    def _max_words(self) -> int:
+        """Number of words of the longest name or alias."""
+        return max((key.count("_") + 1 for key in self._vocabulary), default=1)
+
+    def __getstate__(self) -> Dict:
+        """
+        Get the state to pickle, decoding the vocabulary of a deferred
+        parser first.
+
+        Returns:
+            Instance attributes, without the decoding function and the lock
+        """
+        state = dict(vars(self))
+        state.pop("_decode", None)
+        state.pop("_lock")
+        state.update(_vocabulary=self._vocabulary, _max_words=self._max_words)
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        """
+        Restore a pickled parser.
+
+        Args:
+            state: Instance attributes (see __getstate__)
+        """
+        vars(self).update(state)
+        self._lock = threading.Lock()
+
+    def compiled_vocabulary(self) -> Dict[str, str]:
+        """
+        Get the analyte vocabulary (see from_vocabulary).
+
+        Returns:
+            Dictionary mapping normalized name or alias → analyte name
+        """
+        return dict(self._vocabulary)
+
+    def parse(self, text: str) -> Optional[Dict]:
+        """
+        Extract a conversion request from a phrase.
+
+        A parse is returned only when the phrase names exactly one analyte,
+        contains exactly one number and exactly two units, with the number
+        before the first unit (the first unit is the source unit).
+
+        Args:
+            text: User phrase (e.g., "Creatinine 19243 µmol/L vers g/L")
+
+        Returns:
+            Dictionary with analyte, value, unit_from and unit_to (same shape
+            as the LLM extraction), or None if the phrase is not confidently
+            parseable
+        """
+        result = self._parse(text)
+        with self._lock:
+            if result is None:
+                self.fallbacks += 1
+            else:
+                self.parsed += 1
+        return result
+
+    def _parse(self, text: str) -> Optional[Dict]:
+        """
+        Apply the extraction rules without updating the counters.
+
+        Args:
+            text: User phrase
+
+        Returns:
+            Extraction dictionary, or None if not confidently parseable
+        """
+        folded = _fold(text)
+
+        units = list(_UNIT.finditer(folded))
+        if len(units) != 2:
+            return None
+        # Units are blanked out so that their letters are not read as words
+        # and their position is kept for the number check
+        without_units = _UNIT.sub(lambda m: " " * len(m.group()), folded)
+
+        numbers = list(_NUMBER.finditer(without_units))
+        if len(numbers) != 1 or numbers[0].start() > units[0].start():
+            return None
+        # "-5" or "1e3" would be read as 5 or 1; leave them to the model
+        number = numbers[0]
+        if _SIGN.search(without_units, 0, number.start()) or _EXPONENT.match(
+            without_units, number.end()
+        ):
+            return None
+
+        analytes = self._find_analytes(without_units)
+        if len(analytes) != 1:
+            return None
+
+        unit_codes = [self._unit_code(m) for m in units]
+        if None in unit_codes:
+            return None
+
+        return {
+            "analyte": analytes[0],
+            "value": float(number.group().replace(",", ".")),
+            "unit_from": unit_codes[0].label,
+            "unit_to": unit_codes[1].label,
+        }
+
+    def _find_analytes(self, folded: str) -> List[str]:
+        """
+        Find the distinct analytes named in a folded phrase.
+
+        Args:
+            folded: Folded phrase
+
+        Returns:
+            List of distinct analyte names, in order of appearance
+        """
+        words = _WORD.findall(folded)
+        found: List[str] = []
+        for i in range(len(words)):
+            for n in range(self._max_words, 0, -1):
+                analyte = self._vocabulary.get("_".join(words[i:i + n]))
+                if analyte is not None:
+                    if analyte not in found:
+                        found.append(analyte)
+                    break
+        return found
+
+    @staticmethod
+    def _unit_code(match: re.Match):
+        """
+        Parse a unit match, reading bare molar units as per litre.
+
+        Args:
+            match: Match of the unit pattern
+
+        Returns:
+            Unit code, or None if not recognized
+        """
+        spelling = match.group()
+        if match.group("molar") is not None and "/" not in spelling:
+            spelling += "/l"
+        return parse_unit(spelling)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the fast-path counters.
+
+        Returns:
+            Dictionary with parsed, fallbacks and fast_path_ratio (fraction
+            of queries handled without the model)
+        """
+        total = self.parsed + self.fallbacks
+        return {
+            "parsed": self.parsed,
+            "fallbacks": self.fallbacks,
+            "fast_path_ratio": self.parsed / total if total else 0.0,
+        }
@@ -0,0 +1,522 @@
+"""
+Service Module
+
+This module is the single entry point of the Streamlit UI. It wires the
+reference data, the converter, the rule-based parser, the extraction
+cache, the history and the model manager together, creating each
+component on first use. ollama is only imported by the first model
+request and pandas is not needed at all, so the UI script starts quickly.
+
+The reference data (loader, converter and parser) is held as one
+snapshot. When the data file changes, a new snapshot is built and
+validated on the watcher thread and swapped in with a single assignment,
+so a conversion always uses one consistent table.
+
+The service's public operations are timed by a Metrics registry when
+metrics are enabled.
+"""
+
+import importlib.util
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src.batch_extraction import convert_extractions, extract_queries, split_queries
+from src.catalogue_cache import load_catalogue
+from src.converter import Converter
+from src.data_loader import ScientificDataLoader
+from src.data_watcher import DataWatcher
+from src.extraction_cache import DEFAULT_CACHE_PATH, ExtractionCache
+from src.history_export import HistoryExporter, available_formats
+from src.history_store import DEFAULT_HISTORY_PATH, HistoryStore
+from src.llm_client import (
+    DEFAULT_MODEL,
+    DEFAULT_TIMEOUT,
+    ExtractionClient,
+    ExtractionError,
+)
+from src.metrics import Metrics
+from src.model_manager import FAILED, LOADING, READY, ModelManager
+from src.query_parser import QueryParser
+from src.shared_table import SharedTable
+from src.units import Unit, parse_unit
+
+# Names the UI uses alongside LabService
+__all__ = [
+    "FAILED",
+    "LOADING",
+    "READY",
+    "ExtractionError",
+    "LabService",
+    "Unit",
+    "available_formats",
+    "parse_unit",
+    "split_queries",
+]
+
+DEFAULT_DATA_PATH = "data/scientific_data.csv"
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """Consistent snapshot of the reference data components."""
+
+    loader: ScientificDataLoader
+    converter: Converter
+    parser: QueryParser
+    version: int
+
+    @classmethod
+    def load(cls, data_path: str, version: int = 0, use_cache: bool = True) -> "ReferenceData":
+        """
+        Load and validate the reference data.
+
+        Args:
+            data_path: Scientific data file (.csv, .parquet or .arrow)
+            version: Number identifying the snapshot
+            use_cache: Whether to start from the compiled catalogue cached
+                next to the data file (see load_catalogue), rebuilding it
+                if the file changed
+
+        Returns:
+            Fully built snapshot
+
+        Raises:
+            FileNotFoundError: If the data file doesn't exist
+            ValueError: If the file is invalid or lists no analyte
+        """
+        if use_cache:
+            loader, converter, parser, _ = load_catalogue(data_path)
+        else:
+            loader = ScientificDataLoader(data_path)
+            loader.load_index()
+            converter = Converter.from_loader(loader)
+            parser = QueryParser.from_loader(loader)
+        if not len(converter):
+            raise ValueError(f"No analyte in {data_path}")
+        return cls(
+            loader=loader,
+            converter=converter,
+            parser=parser,
+            version=version
+        )
+
+
+class LabService:
+    """Facade over the conversion, extraction and export components."""
+
+    def __init__(
+        self,
+        data_path: str = DEFAULT_DATA_PATH,
+        model: str = DEFAULT_MODEL,
+        timeout: float = DEFAULT_TIMEOUT,
+        keep_alive=None,
+        cache_path: str = DEFAULT_CACHE_PATH,
+        cache_max_entries: int = 1000,
+        cache_ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        history_path: str = DEFAULT_HISTORY_PATH,
+        metrics_enabled: bool = False,
+        catalogue_cache: bool = True
+    ):
+        """
+        Configure the service; nothing is loaded until first use.
+
+        Args:
+            data_path: Scientific data file (.csv, .parquet or .arrow)
+            model: Ollama model name
+            timeout: Per-request model timeout in seconds
+            keep_alive: How long Ollama keeps the model loaded (see
+                ExtractionClient)
+            cache_path: SQLite file of the extraction cache
+            cache_max_entries: Maximum number of cached extractions
+            cache_ttl_seconds: Lifetime of cached extractions, or None
+            history_path: SQLite file of the conversion history
+            metrics_enabled: Whether operations are timed (see metrics)
+            catalogue_cache: Whether the compiled catalogue is cached next
+                to the data file for faster starts (see ReferenceData.load)
+        """
+        self.data_path = data_path
+        self.model = model
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.cache_path = cache_path
+        self.cache_max_entries = cache_max_entries
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.history_path = history_path
+        self.catalogue_cache = catalogue_cache
+        self.data_error: Optional[str] = None
+        self.metrics = Metrics(enabled=metrics_enabled)
+        self._components: Dict[str, object] = {}
+        self._lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[DataWatcher] = None
+
+    @staticmethod
+    def ollama_available() -> bool:
+        """
+        Check whether the ollama package is installed, without importing it.
+
+        Returns:
+            True if AI mode can be offered
+        """
+        return importlib.util.find_spec("ollama") is not None
+
+    @property
+    def reference(self) -> ReferenceData:
+        """Current reference data snapshot (loaded on first use)."""
+        return self._component("reference", lambda: self._load_reference(0))
+
+    @property
+    def loader(self) -> ScientificDataLoader:
+        """Scientific data loader of the current snapshot."""
+        return self.reference.loader
+
+    @property
+    def converter(self) -> Converter:
+        """Converter with the precompiled factor table of the current snapshot."""
+        return self.reference.converter
+
+    @property
+    def parser(self) -> QueryParser:
+        """Rule-based parser for well-formed queries of the current snapshot."""
+        return self.reference.parser
+
+    @property
+    def cache(self) -> ExtractionCache:
+        """Persistent cache of model extractions."""
+        return self._component("cache", lambda: ExtractionCache(
+            self.cache_path,
+            max_entries=self.cache_max_entries,
+            ttl_seconds=self.cache_ttl_seconds
+        ))
+
+    @property
+    def history(self) -> HistoryStore:
+        """Persistent conversion history, shared by all sessions."""
+        return self._component("history", lambda: HistoryStore(self.history_path))
+
+    @property
+    def history_exporter(self) -> HistoryExporter:
+        """History exports, regenerated only when the history changes."""
+        return self._component("history_exporter", lambda: HistoryExporter(self.history))
+
+    @property
+    def model_manager(self) -> ModelManager:
+        """Model manager; the model starts loading in the background."""
+        def create():
+            manager = ModelManager(ExtractionClient(
+                model=self.model, timeout=self.timeout, keep_alive=self.keep_alive
+            ))
+            manager.start()
+            return manager
+
+        return self._component("model_manager", create)
+
+    def reload_data(self) -> bool:
+        """
+        Reload the reference data, keeping the current snapshot if the new
+        file is invalid.
+
+        Returns:
+            True if the new data was swapped in
+        """
+        # Requests keep using the current snapshot while the new one is built
+        with self._reload_lock:
+            current = self._components.get("reference")
+            version = current.version + 1 if current is not None else 0
+            try:
+                reference = self._load_reference(version)
+            except (FileNotFoundError, ValueError) as e:
+                self.data_error = str(e)
+                return False
+
+            with self._lock:
+                self._components["reference"] = reference
+                self.data_error = None
+            return True
+
+    def publish_reference(self) -> SharedTable:
+        """
+        Publish the current reference data in shared memory for workers.
+
+        Returns:
+            SharedTable owning the segment; pass its name to
+            attach_reference() in each worker and unlink() it at shutdown
+        """
+        reference = self.reference
+        return SharedTable.publish(
+            reference.loader, reference.converter, reference.version, parser=reference.parser
+        )
+
+    def attach_reference(self, name: str) -> None:
+        """
+        Use reference data published by another process instead of
+        loading the data file.
+
+        Args:
+            name: Shared memory segment name (see publish_reference)
+
+        Raises:
+            FileNotFoundError: If no segment has this name
+            ValueError: If the segment does not hold a reference table
+        """
+        table = SharedTable.attach(name)
+        reference = ReferenceData(
+            loader=table.loader,
+            converter=table.converter,
+            parser=table.parser,
+            version=table.version
+        )
+        with self._lock:
+            previous = self._components.get("shared_table")
+            self._components["shared_table"] = table
+            self._components["reference"] = reference
+        del reference
+        if previous is not None:
+            try:
+                previous.close()
+            except BufferError:
+                pass  # Still used by a caller: unmapped by a later close()
+
+    def detach_reference(self) -> None:
+        """
+        Stop using reference data attached with attach_reference(); the
+        data file is loaded again on next use.
+
+        Raises:
+            BufferError: If a caller still holds the shared converter or a
+                view of its factor table (the segment is then unmapped by
+                a later close, once that view is released)
+        """
+        with self._lock:
+            table = self._components.pop("shared_table", None)
+            if table is None:
+                return
+            reference = self._components.get("reference")
+            if reference is not None and reference.converter is table.converter:
+                del self._components["reference"]
+            del reference
+        table.close()
+
+    def watch_data(self) -> bool:
+        """
+        Reload the reference data whenever its file changes (once).
+
+        Returns:
+            True if the file is watched (False without watchdog)
+        """
+        with self._lock:
+            if self._watcher is None:
+                if not DataWatcher.available():
+                    return False
+                self._watcher = DataWatcher(self.data_path, self.reload_data)
+                self._watcher.start()
+            return True
+
+    def analytes(self) -> List[str]:
+        """
+        Get the analyte names, in table order.
+
+        Returns:
+            List of analyte names
+        """
+        return self.loader.get_all_analytes()
+
+    def analyte_info(self, analyte: str) -> Optional[Dict]:
+        """
+        Get the reference data of an analyte.
+
+        Args:
+            analyte: Name or alias of the analyte
+
+        Returns:
+            Dictionary with analyte, molar_mass, source and common_units,
+            or None if not found
+        """
+        return self.loader.get_analyte_info(analyte)
+
+    def common_units(self, analyte: str) -> List[Unit]:
+        """
+        Get the usual units of an analyte.
+
+        Args:
+            analyte: Name or alias of the analyte
+
+        Returns:
+            List of unit codes (empty if the analyte is unknown)
+        """
+        return self.loader.get_common_unit_codes(analyte) or []
+
+    def convert(self, value: float, analyte: str, from_unit, to_unit) -> Optional[float]:
+        """
+        Convert a value for an analyte.
+
+        Args:
+            value: Numerical value to convert
+            analyte: Name or alias of the analyte
+            from_unit: Source unit (string or unit code)
+            to_unit: Target unit (string or unit code)
+
+        Returns:
+            Converted value, or None if conversion not possible
+        """
+        with self.metrics.timer("convert"):
+            return self.converter.convert(value, analyte, from_unit, to_unit)
+
+    def extract(self, user_input: str) -> Optional[Dict]:
+        """
+        Extract analyte, value and units from a phrase.
+
+        Well-formed phrases are parsed without the model; the others are
+        served from the extraction cache or sent to the model.
+
+        Args:
+            user_input: User phrase in natural language
+
+        Returns:
+            Raw extraction (analyte, value, unit_from, unit_to)
+
+        Raises:
+            ExtractionError: If the model fails
+        """
+        with self.metrics.timer("extract"):
+            parsed = self.parser.parse(user_input)
+            if parsed is not None:
+                return parsed
+
+            analytes = self.analytes()
+            return self.cache.get_or_compute(
+                user_input,
+                self.model,
+                analytes,
+                lambda: self._timed(
+                    "extract_model", self.model_manager.client.extract, user_input, analytes
+                )
+            )
+
+    def extract_block(
+        self,
+        queries: Sequence[str],
+        on_error: Optional[Callable[[ExtractionError], None]] = None
+    ) -> List[Optional[Dict]]:
+        """
+        Extract a list of queries with at most one model request.
+
+        Args:
+            queries: Individual queries (see split_queries)
+            on_error: Called if the model fails; the queries it should have
+                extracted are then returned as None
+
+        Returns:
+            One raw extraction (or None) per query, in order
+        """
+        analytes = self.analytes()
+
+        def extract_batch(pending):
+            try:
+                cached = self.cache.get_or_compute(
+                    "\n".join(pending),
+                    f"{self.model}:batch",
+                    analytes,
+                    lambda: {"items": self._timed(
+                        "extract_model_batch",
+                        self.model_manager.client.extract_batch,
+                        pending,
+                        analytes
+                    )}
+                )
+            except ExtractionError as e:
+                if on_error is not None:
+                    on_error(e)
+                return [None] * len(pending)
+            return cached["items"]
+
+        with self.metrics.timer("extract_block"):
+            return extract_queries(queries, self.parser, extract_batch)
+
+    def convert_extractions(
+        self,
+        extractions: Sequence[Optional[Dict]],
+        default_unit_to: Optional[Unit] = None
+    ) -> List[Optional[Dict]]:
+        """
+        Validate extractions and convert the valid ones in one pass.
+
+        Args:
+            extractions: Raw extractions
+            default_unit_to: Target unit used when a query does not name one
+
+        Returns:
+            Validated extractions with their "result", or None each
+        """
+        with self.metrics.timer("convert_batch"):
+            return convert_extractions(extractions, self.converter, default_unit_to)
+
+    def export_history(self, table_format: str, analyte: Optional[str] = None) -> bytes:
+        """
+        Serialize the history for download.
+
+        Args:
+            table_format: "csv", "xlsx", "parquet" or "jsonl" (see
+                available_formats)
+            analyte: Only export entries for this analyte
+
+        Returns:
+            Serialized file contents
+        """
+        with self.metrics.timer("export_history"):
+            return self.history_exporter.export(table_format, analyte)
+
+    def _load_reference(self, version: int) -> ReferenceData:
+        """
+        Load a reference data snapshot, timing it.
+
+        Args:
+            version: Number identifying the snapshot
+
+        Returns:
+            Fully built snapshot
+
+        Raises:
+            FileNotFoundError: If the data file doesn't exist
+            ValueError: If the file is invalid
+        """
+        with self.metrics.timer("load_reference"):
+            return ReferenceData.load(self.data_path, version, self.catalogue_cache)
+
+    def _timed(self, name: str, func: Callable, *args):
+        """
+        Call a function, timing it.
+
+        Args:
+            name: Operation name
+            func: Function to call
+            *args: Positional arguments
+
+        Returns:
+            The function's result
+        """
+        with self.metrics.timer(name):
+            return func(*args)
+
+    def _component(self, name: str, factory: Callable[[], object]):
+        """
+        Get a component, creating it once on first use.
+
+        Args:
+            name: Component name
+            factory: Function creating the component
+
+        Returns:
+            The component
+        """
+        component = self._components.get(name)
+        if component is not None:
+            return component
+
+        with self._lock:
+            component = self._components.get(name)
+            if component is None:
+                component = factory()
+                self._components[name] = component
+            return component
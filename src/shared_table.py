@@ -0,0 +1,204 @@
+"""
+Shared Table Module
+
+This module publishes the compiled reference table in shared memory, so
+that several worker processes serve conversions from one copy. The parent
+process loads, validates and compiles the table once; workers attach to
+the segment by name. The conversion-factor table is used in place as a
+read-only NumPy view of the segment (no copy, no recomputation), and the
+analyte catalogue, lookup indexes and parser vocabulary are decoded from a
+JSON header without parsing or validating anything again.
+
+The segment uses the layout of the compiled catalogue cache (see
+catalogue_cache), with the reference data version in the header. The
+factor table holds an export of the segment's buffer, so the segment
+cannot be unmapped while any view of the table is alive: close() then
+fails, and the segment is unmapped by a later close() once the last view
+is gone.
+"""
+
+import sys
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Set
+
+from src.catalogue_cache import decode_table, encode_table, read_header, table_size, write_table
+from src.converter import Converter
+from src.data_loader import ScientificDataLoader
+from src.query_parser import QueryParser
+
+# Segments created by this process (still tracked, see attach)
+_published = set()
+
+# Tables whose segment is still mapped in this process; holding them keeps
+# SharedMemory from unmapping a segment on garbage collection
+_mapped: Set["SharedTable"] = set()
+
+
+class SharedTable:
+    """Reference table held in a named shared memory segment."""
+
+    def __init__(
+        self,
+        memory: SharedMemory,
+        loader: ScientificDataLoader,
+        converter: Converter,
+        parser: QueryParser,
+        version: int,
+        owner: bool
+    ):
+        """
+        Wrap a segment; use publish() or attach() instead.
+
+        Args:
+            memory: Shared memory segment
+            loader: Loader rebuilt from the published rows
+            converter: Converter over the shared factor table
+            parser: Parser rebuilt from the published vocabulary
+            version: Reference data version
+            owner: Whether this process created the segment
+        """
+        self.memory = memory
+        self.loader = loader
+        self.converter = converter
+        self.parser = parser
+        self.version = version
+        self.owner = owner
+        self.closed = False
+        _mapped.add(self)
+
+    @property
+    def name(self) -> str:
+        """Name workers pass to attach()."""
+        return self.memory.name
+
+    @classmethod
+    def publish(
+        cls,
+        loader: ScientificDataLoader,
+        converter: Converter,
+        version: int = 0,
+        name: Optional[str] = None,
+        parser: Optional[QueryParser] = None
+    ) -> "SharedTable":
+        """
+        Copy a compiled reference table into a new shared memory segment.
+
+        Args:
+            loader: Loader holding the analyte catalogue
+            converter: Converter built from the same loader
+            version: Reference data version
+            name: Segment name (generated if omitted)
+            parser: Parser built from the same loader (built if omitted)
+
+        Returns:
+            SharedTable owning the segment (call unlink() when done)
+        """
+        head, factors, sections = encode_table(loader, converter, parser, version=version)
+        memory = SharedMemory(name=name, create=True, size=table_size(head, factors, sections))
+        write_table(memory.buf, head, factors, sections)
+        _published.add(memory.name)
+
+        return cls._from_memory(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedTable":
+        """
+        Attach to a segment published by another process.
+
+        Args:
+            name: Segment name (see name)
+
+        Returns:
+            SharedTable whose converter reads the shared factor table
+
+        Raises:
+            FileNotFoundError: If no segment has this name
+            ValueError: If the segment does not hold a reference table
+        """
+        if sys.version_info >= (3, 13):
+            memory = SharedMemory(name=name, track=False)
+        else:
+            memory = SharedMemory(name=name)
+            if memory.name not in _published:
+                # Workers must not destroy the parent's segment when they exit
+                resource_tracker.unregister(memory._name, "shared_memory")
+        return cls._from_memory(memory, owner=False)
+
+    @classmethod
+    def _from_memory(cls, memory: SharedMemory, owner: bool) -> "SharedTable":
+        """
+        Decode a segment into a loader, a zero-copy converter and a parser.
+
+        Raises:
+            ValueError: If the segment does not hold a reference table
+        """
+        header = read_header(memory.buf)
+        if header is None:
+            memory.close()
+            raise ValueError(f"Shared memory {memory.name} does not hold a reference table")
+
+        loader, converter, parser = decode_table(memory.buf, header)
+        return cls(memory, loader, converter, parser, header["version"], owner)
+
+    def __enter__(self) -> "SharedTable":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.owner:
+            self.unlink()
+        else:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Detach from the segment.
+
+        The loader and parser decode whatever they still read from the
+        segment first, so that components handed out keep working.
+
+        Raises:
+            BufferError: If a view of the factor table is still alive (a
+                service snapshot, a request in flight, converter.factors,
+                ...); the segment is then unmapped by the next close() of
+                any table once that view is released
+        """
+        if not self.closed:
+            # Decode the catalogue sections the components read lazily
+            self.loader.get_all_analytes()
+            self.converter.index
+            self.parser.compiled_vocabulary()
+            self.converter = None
+            self.parser = None
+            self.loader = None
+            self.closed = True
+        _release_closed()
+        if self in _mapped:
+            raise BufferError(f"Shared table {self.name} is still in use")
+
+    def unlink(self) -> None:
+        """
+        Detach and destroy the segment (publishing process only).
+
+        The segment name is removed even if it is still mapped; the memory
+        is freed once every process has unmapped it.
+
+        Raises:
+            BufferError: If the table is still in use (see close)
+        """
+        try:
+            self.close()
+        finally:
+            if self.owner:
+                self.memory.unlink()
+                _published.discard(self.memory.name)
+
+
+def _release_closed() -> None:
+    """Unmap the segments of closed tables that are no longer viewed."""
+    for table in [table for table in _mapped if table.closed]:
+        try:
+            table.memory.close()
+        except BufferError:
+            continue
+        _mapped.discard(table)
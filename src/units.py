@@ -0,0 +1,88 @@
+"""
+Biochemical Units Module
+
+This module defines the canonical unit codes used across the converter and
+the data loader, and a memoized parser that maps raw unit spellings to them.
+"""
+
+import unicodedata
+from enum import IntEnum
+from functools import lru_cache
+from typing import Optional
+
+
+class Unit(IntEnum):
+    """Canonical concentration units, encoded as small integers."""
+
+    UMOL_PER_L = 0
+    MMOL_PER_L = 1
+    G_PER_L = 2
+    MG_PER_DL = 3
+
+    @property
+    def label(self) -> str:
+        """
+        Get the display spelling of the unit.
+
+        Returns:
+            Unit label (e.g., "µmol/L")
+        """
+        return _LABELS[self]
+
+
+_LABELS = {
+    Unit.UMOL_PER_L: "µmol/L",
+    Unit.MMOL_PER_L: "mmol/L",
+    Unit.G_PER_L: "g/L",
+    Unit.MG_PER_DL: "mg/dL",
+}
+
+# Normalized spelling → unit (micro signs are folded to "u" beforehand)
+_SPELLINGS = {
+    "umol/l": Unit.UMOL_PER_L,
+    "mmol/l": Unit.MMOL_PER_L,
+    "g/l": Unit.G_PER_L,
+    "mg/dl": Unit.MG_PER_DL,
+}
+
+
+def parse_unit(unit) -> Optional[Unit]:
+    """
+    Map a raw unit spelling to its canonical unit code.
+
+    Matching ignores case and whitespace, and accepts the micro sign (µ),
+    the Greek mu (μ) and a plain "u" interchangeably. Each distinct spelling
+    is normalized only once.
+
+    Args:
+        unit: Unit string (e.g., "µmol/L", "umol/l", "mmol / L") or a Unit
+
+    Returns:
+        Unit code, or None if the unit is not recognized
+
+    Examples:
+        >>> parse_unit("mmol / L")
+        <Unit.MMOL_PER_L: 1>
+    """
+    if isinstance(unit, Unit):
+        return unit
+    if not isinstance(unit, str):
+        return None
+    return _parse_unit_string(unit)
+
+
+@lru_cache(maxsize=256)
+def _parse_unit_string(unit: str) -> Optional[Unit]:
+    """
+    Normalize and look up a unit string (memoized).
+
+    Args:
+        unit: Raw unit string
+
+    Returns:
+        Unit code, or None if the unit is not recognized
+    """
+    # NFKC turns the micro sign into the Greek mu
+    normalized = unicodedata.normalize("NFKC", unit).casefold()
+    normalized = "".join(normalized.split()).replace("μ", "u")
+    return _SPELLINGS.get(normalized)
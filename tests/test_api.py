@@ -0,0 +1,184 @@
+"""
+Unit tests for the api module.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from src import api
+from src.api import ConversionAPI
+from src.service import LabService
+
+
+@pytest.fixture
+def app(tmp_path):
+    return ConversionAPI(LabService(
+        cache_path=str(tmp_path / "cache.sqlite3"),
+        history_path=str(tmp_path / "history.sqlite3"),
+        metrics_enabled=True,
+        catalogue_cache=False
+    ), watch_data=False)
+
+
+def request(app, method, path, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, path, **kwargs)
+    
+    return asyncio.run(send())
+
+
+class TestConversionAPI:
+    """Tests for the ConversionAPI application."""
+    
+    def test_health(self, app):
+        """Test the health endpoint."""
+        response = request(app, "GET", "/health")
+        
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
+        assert response.json()["analytes"] >= 7
+    
+    def test_analytes(self, app):
+        """Test the reference data listing."""
+        analytes = request(app, "GET", "/analytes").json()
+        
+        glucose = next(a for a in analytes if a["analyte"] == "glucose")
+        assert glucose["molar_mass"] == 180.16
+    
+    def test_convert(self, app):
+        """Test a single conversion through an alias."""
+        response = request(app, "POST", "/convert", json={
+            "value": 100, "analyte": "créatinine", "unit_from": "µmol/L", "unit_to": "mg/dL"
+        })
+        
+        assert response.status_code == 200
+        assert response.json()["analyte"] == "creatinine"
+        assert response.json()["result"] == pytest.approx(1.1312)
+    
+    @pytest.mark.parametrize("body, status", [
+        ({"value": 100, "analyte": "inconnu", "unit_from": "mg/dL", "unit_to": "g/L"}, 422),
+        ({"value": -1, "analyte": "glucose", "unit_from": "mg/dL", "unit_to": "g/L"}, 422),
+        ({"value": 100, "analyte": "glucose"}, 400),
+        ([1, 2], 400),
+    ])
+    def test_convert_errors(self, app, body, status):
+        """Test error statuses for invalid conversions."""
+        response = request(app, "POST", "/convert", json=body)
+        
+        assert response.status_code == status
+        assert "error" in response.json()
+    
+    @pytest.mark.parametrize("value", ["NaN", "Infinity", "-Infinity", "1e308"])
+    def test_convert_non_finite(self, app, value):
+        """Test that values without a finite result are rejected, not echoed as NaN."""
+        body = f'{{"value": {value}, "analyte": "glucose", "unit_from": "g/L", "unit_to": "µmol/L"}}'
+        
+        response = request(app, "POST", "/convert", content=body.encode("utf-8"))
+        
+        assert response.status_code == 422
+        assert "error" in response.json()
+    
+    def test_invalid_json(self, app):
+        """Test that a malformed body is a client error."""
+        response = request(app, "POST", "/convert", content=b"{not json")
+        
+        assert response.status_code == 400
+    
+    def test_batch_json(self, app):
+        """Test a batch answered as one JSON document."""
+        response = request(app, "POST", "/convert/batch", content=json.dumps({"items": [
+            {"value": 90, "analyte": "glucose", "unit_from": "mg/dL", "unit_to": "mmol/L"},
+            {"value": 90, "analyte": "inconnu", "unit_from": "mg/dL", "unit_to": "mmol/L"},
+            {"value": "90", "analyte": "glucose", "unit_from": "mg/dL", "unit_to": "mmol/L"},
+            {"value": float("nan"), "analyte": "glucose", "unit_from": "mg/dL", "unit_to": "mmol/L"},
+        ]}).encode("utf-8"))
+        
+        results = response.json()["results"]
+        assert results[0] == pytest.approx(4.9956, abs=1e-4)
+        assert results[1:] == [None, None, None]
+    
+    def test_batch_ndjson_streamed(self, app, monkeypatch):
+        """Test NDJSON in and out, sent in several chunks."""
+        monkeypatch.setattr(api, "STREAM_CHUNK_ROWS", 2)
+        lines = "\n".join(json.dumps({
+            "value": float(i), "analyte": "uree", "unit_from": "mmol/L", "unit_to": "g/L"
+        }) for i in range(5))
+        
+        response = request(
+            app, "POST", "/convert/batch", content=lines.encode("utf-8"),
+            headers={"content-type": api.NDJSON, "accept": api.NDJSON}
+        )
+        
+        assert response.headers["content-type"] == api.NDJSON
+        results = [json.loads(line)["result"] for line in response.text.splitlines()]
+        assert results == pytest.approx([i * 0.06006 for i in range(5)])
+    
+    def test_batch_invalid(self, app):
+        """Test that a batch body without items is rejected."""
+        assert request(app, "POST", "/convert/batch", json={"rows": []}).status_code == 400
+    
+    def test_routes(self, app):
+        """Test unknown paths and methods."""
+        assert request(app, "GET", "/nope").status_code == 404
+        assert request(app, "GET", "/convert").status_code == 405
+    
+    def test_body_limit(self, app, monkeypatch):
+        """Test that oversized bodies are refused."""
+        monkeypatch.setattr(api, "MAX_BODY_BYTES", 10)
+        
+        response = request(app, "POST", "/convert", content=b"x" * 100)
+        
+        assert response.status_code == 413
+    
+    def test_metrics(self, app):
+        """Test that API calls appear in the Prometheus metrics."""
+        request(app, "POST", "/convert", json={
+            "value": 1, "analyte": "glucose", "unit_from": "g/L", "unit_to": "mmol/L"
+        })
+        
+        text = request(app, "GET", "/metrics").text
+        
+        assert 'labconv_operation_seconds_count{operation="api_convert"} 1' in text
+    
+    def test_lifespan_loads_reference(self, app):
+        """Test that the reference data is loaded at worker startup."""
+        messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+        sent = []
+        
+        async def receive():
+            return next(messages)
+        
+        async def send(message):
+            sent.append(message["type"])
+        
+        asyncio.run(app({"type": "lifespan"}, receive, send))
+        
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+        assert "reference" in app.service._components
+    
+    def test_lifespan_attaches_shared_table(self, app, monkeypatch):
+        """Test that workers attach to a table published by the parent."""
+        table = LabService(catalogue_cache=False).publish_reference()
+        monkeypatch.setenv(api.SHARED_TABLE_ENV, table.name)
+        messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+        
+        async def receive():
+            return next(messages)
+        
+        async def send(message):
+            pass
+        
+        try:
+            asyncio.run(app({"type": "lifespan"}, receive, send))
+            
+            assert "shared_table" in app.service._components
+            assert request(app, "POST", "/convert", json={
+                "value": 90, "analyte": "glucose", "unit_from": "mg/dL", "unit_to": "mmol/L"
+            }).json()["result"] == pytest.approx(4.9956, abs=1e-4)
+        finally:
+            app.service._components.clear()
+            table.unlink()
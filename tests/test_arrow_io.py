@@ -0,0 +1,68 @@
+"""
+Unit tests for the arrow_io module.
+"""
+
+import pandas as pd
+import pytest
+from src.arrow_io import infer_format, read_rows, read_table, write_table
+from src.data_loader import ScientificDataLoader
+
+
+@pytest.fixture
+def table():
+    return pd.DataFrame({
+        "analyte": ["glucose", "creatinine"],
+        "molar_mass": [180.16, 113.12],
+    })
+
+
+class TestArrowIO:
+    """Tests for table reading and writing."""
+    
+    def test_infer_format(self):
+        """Test format inference from extensions."""
+        assert infer_format("data.parquet") == "parquet"
+        assert infer_format("data.ARROW") == "arrow"
+        assert infer_format("data.feather") == "arrow"
+        assert infer_format("data.csv") == "csv"
+        assert infer_format("data.txt") == "csv"
+    
+    @pytest.mark.parametrize("suffix", [".csv", ".parquet", ".arrow"])
+    def test_round_trip(self, table, tmp_path, suffix):
+        """Test that tables survive a write/read round trip."""
+        path = tmp_path / f"table{suffix}"
+        write_table(table, path)
+        
+        pd.testing.assert_frame_equal(read_table(path), table)
+    
+    @pytest.mark.parametrize("suffix", [".csv", ".parquet", ".arrow"])
+    def test_read_rows(self, table, tmp_path, suffix):
+        """Test reading rows without pandas."""
+        path = tmp_path / f"table{suffix}"
+        write_table(table, path)
+        
+        rows = read_rows(path)
+        
+        assert [row["analyte"] for row in rows] == ["glucose", "creatinine"]
+        assert float(rows[1]["molar_mass"]) == 113.12
+    
+    def test_unsupported_format(self, table, tmp_path):
+        """Test that unknown formats raise ValueError."""
+        with pytest.raises(ValueError):
+            write_table(table, tmp_path / "table.xml", "xml")
+
+
+class TestLoaderFormats:
+    """Tests for loading the reference table from Arrow formats."""
+    
+    @pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+    def test_load_exported_table(self, tmp_path, suffix):
+        """Test that an exported reference table loads identically."""
+        path = tmp_path / f"scientific_data{suffix}"
+        ScientificDataLoader("data/scientific_data.csv").export_data(str(path))
+        
+        loader = ScientificDataLoader(str(path))
+        
+        assert loader.get_molar_mass("creatinine") == 113.12
+        assert loader.get_common_units("glucose") == ["mmol/L", "mg/dL", "g/L"]
+        assert loader.get_molar_mass("urée") == 60.06
@@ -0,0 +1,175 @@
+"""
+Unit tests for the batch conversion module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.batch import _shard_ranges, convert_chunk, convert_file, main
+from src.converter import Converter, convert_units
+
+
+@pytest.fixture
+def converter():
+    return Converter(
+        ["creatinine", "glucose", "cholesterol"],
+        [113.12, 180.16, 386.65],
+        aliases={"créatinine": "creatinine"}
+    )
+
+
+@pytest.fixture
+def input_csv(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text(
+        "sample_id,analyte,value,unit_from,unit_to\n"
+        "S1,cholesterol,200,mg/dL,mmol/L\n"
+        "S2,Créatinine,19243,µmol/L,g/L\n"
+        "S3,glucose,90,mg / dL,mmol/L\n"
+        "S4,unknown,10,mg/dL,mmol/L\n"
+        "S5,glucose,abc,mg/dL,mmol/L\n"
+        "S6,glucose,5,,mmol/L\n",
+        encoding="utf-8"
+    )
+    return path
+
+
+class TestConvertChunk:
+    """Tests for the convert_chunk function."""
+    
+    def test_matches_scalar_path(self, converter, input_csv):
+        """Test that chunk results match convert_units exactly."""
+        chunk = pd.read_csv(input_csv, dtype=str)
+        result = convert_chunk(chunk, converter)
+        
+        assert result["value_output"][0] == convert_units(200, "mg/dL", "mmol/L", 386.65)
+        assert result["value_output"][1] == convert_units(19243, "µmol/L", "g/L", 113.12)
+        assert result["value_output"][2] == convert_units(90, "mg/dL", "mmol/L", 180.16)
+    
+    def test_invalid_rows_are_nan(self, converter, input_csv):
+        """Test that unknown analytes, bad values and missing units give NaN."""
+        chunk = pd.read_csv(input_csv, dtype=str)
+        result = convert_chunk(chunk, converter)
+        
+        assert result["value_output"][3:].isna().all()
+    
+    def test_custom_columns(self, converter):
+        """Test custom input column names."""
+        chunk = pd.DataFrame({
+            "test": ["glucose"], "result": ["90"], "from": ["mg/dL"], "to": ["mmol/L"]
+        })
+        result = convert_chunk(
+            chunk, converter,
+            {"analyte": "test", "value": "result", "unit_from": "from", "unit_to": "to"}
+        )
+        assert abs(result["value_output"][0] - 5.0) < 0.1
+
+
+class TestConvertFile:
+    """Tests for the convert_file function."""
+    
+    def test_csv_output(self, converter, input_csv, tmp_path):
+        """Test streaming conversion to CSV with small chunks."""
+        output = tmp_path / "out.csv"
+        result = convert_file(str(input_csv), str(output), converter=converter, chunksize=2)
+        
+        assert result.rows == 6
+        assert result.failed == 3
+        written = pd.read_csv(output)
+        assert list(written["sample_id"]) == ["S1", "S2", "S3", "S4", "S5", "S6"]
+        assert abs(written["value_output"][1] - 2.1767) < 0.0001
+    
+    def test_parquet_output(self, converter, input_csv, tmp_path):
+        """Test streaming conversion to Parquet."""
+        output = tmp_path / "out.parquet"
+        convert_file(str(input_csv), str(output), converter=converter, chunksize=4)
+        
+        written = pd.read_parquet(output)
+        assert len(written) == 6
+        assert abs(written["value_output"][0] - 5.17) < 0.01
+        assert np.isnan(written["value_output"][3])
+    
+    def test_arrow_output(self, converter, input_csv, tmp_path):
+        """Test streaming conversion to an Arrow IPC file."""
+        output = tmp_path / "out.arrow"
+        convert_file(str(input_csv), str(output), converter=converter, chunksize=4)
+        
+        written = pd.read_feather(output)
+        assert len(written) == 6
+        assert abs(written["value_output"][0] - 5.17) < 0.01
+    
+    def test_missing_column(self, converter, tmp_path):
+        """Test that a missing column raises ValueError."""
+        path = tmp_path / "bad.csv"
+        path.write_text("analyte,value\nglucose,90\n", encoding="utf-8")
+        
+        with pytest.raises(ValueError):
+            convert_file(str(path), str(tmp_path / "out.csv"), converter=converter)
+    
+    def test_missing_input(self, converter, tmp_path):
+        """Test that a missing input file raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            convert_file(str(tmp_path / "nope.csv"), str(tmp_path / "out.csv"), converter=converter)
+
+
+
+class TestParallelConvertFile:
+    """Tests for multi-process batch conversion."""
+    
+    @pytest.fixture
+    def large_csv(self, tmp_path):
+        path = tmp_path / "large.csv"
+        analytes = ["glucose", "creatinine", "cholesterol", "unknown"]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("sample_id,analyte,value,unit_from,unit_to\n")
+            for i in range(2000):
+                f.write(f"S{i},{analytes[i % 4]},{i},mg/dL,mmol/L\n")
+        return path
+    
+    def test_shard_ranges_cover_file(self, large_csv):
+        """Test that shards are contiguous and end on line boundaries."""
+        header, ranges = _shard_ranges(large_csv, 7)
+        content = large_csv.read_bytes()
+        
+        assert header == content[:len(header)]
+        assert ranges[0][0] == len(header)
+        assert ranges[-1][1] == len(content)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start
+            assert content[end - 1:end] == b"\n"
+    
+    @pytest.mark.parametrize("suffix", [".csv", ".parquet", ".arrow"])
+    def test_keeps_input_order(self, converter, large_csv, tmp_path, suffix):
+        """Test that parallel output matches the single-process output."""
+        serial = tmp_path / f"serial{suffix}"
+        parallel = tmp_path / f"parallel{suffix}"
+        read = {".csv": pd.read_csv, ".parquet": pd.read_parquet, ".arrow": pd.read_feather}[suffix]
+        
+        convert_file(str(large_csv), str(serial), converter=converter, chunksize=300)
+        result = convert_file(
+            str(large_csv), str(parallel), converter=converter,
+            chunksize=300, workers=2
+        )
+        
+        assert result.rows == 2000
+        assert result.failed == 500
+        pd.testing.assert_frame_equal(read(serial), read(parallel))
+
+class TestMain:
+    """Tests for the command-line entry point."""
+    
+    def test_reports_throughput(self, input_csv, tmp_path, capsys):
+        """Test that the CLI converts the file and reports rows/sec."""
+        output = tmp_path / "out.csv"
+        exit_code = main([str(input_csv), str(output), "--chunksize", "3"])
+        
+        assert exit_code == 0
+        assert "rows/sec" in capsys.readouterr().err
+        assert len(pd.read_csv(output)) == 6
+    
+    def test_error_exit_code(self, tmp_path, capsys):
+        """Test that errors give a non-zero exit code."""
+        exit_code = main([str(tmp_path / "nope.csv"), str(tmp_path / "out.csv")])
+        
+        assert exit_code == 1
+        assert "Error" in capsys.readouterr().err
@@ -0,0 +1,152 @@
+"""
+Unit tests for the batch_extraction module.
+"""
+
+import math
+
+import pytest
+from src.batch_extraction import (
+    convert_extractions,
+    extract_queries,
+    split_queries,
+    validate_extraction,
+)
+from src.converter import Converter
+from src.query_parser import QueryParser
+from src.units import Unit
+
+
+@pytest.fixture
+def converter():
+    return Converter(
+        ["creatinine", "glucose", "uree"],
+        [113.12, 180.16, 60.06],
+        aliases={"crea": "creatinine", "urée": "uree"}
+    )
+
+
+@pytest.fixture
+def parser():
+    return QueryParser(["creatinine", "glucose", "uree"], {"crea": "creatinine"})
+
+
+class TestSplitQueries:
+    """Tests for the split_queries function."""
+    
+    def test_commas_and_lines(self):
+        """Test splitting on commas, semicolons and line breaks."""
+        text = "gluc 5.4 mmol, crea 88 µmol, urée 7\nchol 2 g/L; trig 1,5 mmol\nacide urique 300"
+        
+        assert split_queries(text) == [
+            "gluc 5.4 mmol", "crea 88 µmol", "urée 7", "chol 2 g/L", "trig 1,5 mmol", "acide urique 300"
+        ]
+    
+    def test_decimal_comma_kept(self):
+        """Test that decimal commas do not split a query."""
+        assert split_queries("glucose 5,4 mmol/L, urée 7,1 mmol/L") == [
+            "glucose 5,4 mmol/L", "urée 7,1 mmol/L"
+        ]
+    
+    @pytest.mark.parametrize("text", [
+        "Pour l'urée, quelle est la masse molaire ?",
+        "Glucose 90 mg/dL, en mmol/L s'il te plaît",
+        "Convertis 200 de cholestérol, en mmol; merci",
+    ])
+    def test_single_question_with_comma_kept(self, text):
+        """Test that a question is only split if several parts read like results."""
+        assert split_queries(text) == [text]
+    
+    def test_blank_parts_dropped(self):
+        """Test that empty lines and trailing separators are ignored."""
+        assert split_queries("\n glucose 5 \n\n,") == ["glucose 5"]
+
+
+class TestExtractQueries:
+    """Tests for the extract_queries function."""
+    
+    def test_single_model_call_for_unparsed(self, parser):
+        """Test that only unparsed queries reach the model, in one call."""
+        calls = []
+        
+        def extract_batch(pending):
+            calls.append(list(pending))
+            return [{"analyte": "uree"} for _ in pending]
+        
+        queries = ["glucose 90 mg/dL en mmol/L", "urée 7", "crea 88"]
+        results = extract_queries(queries, parser, extract_batch)
+        
+        assert calls == [["urée 7", "crea 88"]]
+        assert results[0]["analyte"] == "glucose"
+        assert results[1] == {"analyte": "uree"}
+    
+    def test_no_model_call_when_all_parsed(self, parser):
+        """Test that the model is not called when every query parses."""
+        def extract_batch(pending):
+            raise AssertionError("model should not be called")
+        
+        results = extract_queries(["glucose 90 mg/dL en mmol/L"], parser, extract_batch)
+        
+        assert results[0]["value"] == 90.0
+
+
+class TestValidateExtraction:
+    """Tests for the validate_extraction function."""
+    
+    def test_valid_alias(self, converter):
+        """Test that aliases and unit spellings are resolved."""
+        item = validate_extraction(
+            {"analyte": "crea", "value": "88,4", "unit_from": "µmol", "unit_to": "mg/dl"},
+            converter
+        )
+        
+        assert item["analyte"] == "creatinine"
+        assert item["index"] == 0
+        assert item["value"] == 88.4
+        assert item["unit_from"] is Unit.UMOL_PER_L
+        assert item["unit_to"] is Unit.MG_PER_DL
+    
+    def test_default_unit_to(self, converter):
+        """Test that a missing target unit falls back to the default."""
+        extraction = {"analyte": "uree", "value": 7, "unit_from": "mmol/L", "unit_to": None}
+        
+        assert validate_extraction(extraction, converter) is None
+        assert validate_extraction(extraction, converter, Unit.G_PER_L)["unit_to"] is Unit.G_PER_L
+    
+    @pytest.mark.parametrize("extraction", [
+        None,
+        "glucose",
+        {"analyte": "sodium", "value": 140, "unit_from": "mmol/L", "unit_to": "g/L"},
+        {"analyte": None, "value": 140, "unit_from": "mmol/L", "unit_to": "g/L"},
+        {"analyte": "glucose", "value": None, "unit_from": "mmol/L", "unit_to": "g/L"},
+        {"analyte": "glucose", "value": -1, "unit_from": "mmol/L", "unit_to": "g/L"},
+        {"analyte": "glucose", "value": True, "unit_from": "mmol/L", "unit_to": "g/L"},
+        {"analyte": "glucose", "value": "abc", "unit_from": "mmol/L", "unit_to": "g/L"},
+        {"analyte": "glucose", "value": 5, "unit_from": "mEq/L", "unit_to": "g/L"},
+    ])
+    def test_invalid(self, converter, extraction):
+        """Test that extractions outside the vocabulary are rejected."""
+        assert validate_extraction(extraction, converter) is None
+
+
+class TestConvertExtractions:
+    """Tests for the convert_extractions function."""
+    
+    def test_matches_scalar_conversion(self, converter):
+        """Test that the batch results equal one-by-one conversions."""
+        extractions = [
+            {"analyte": "glucose", "value": 5.4, "unit_from": "mmol/L", "unit_to": "mg/dL"},
+            None,
+            {"analyte": "crea", "value": 88, "unit_from": "µmol/L", "unit_to": None},
+            {"analyte": "uree", "value": 7, "unit_from": "mmol/L", "unit_to": "mmol/L"},
+        ]
+        items = convert_extractions(extractions, converter, Unit.MG_PER_DL)
+        
+        assert items[1] is None
+        assert items[0]["result"] == converter.convert(5.4, "glucose", "mmol/L", "mg/dL")
+        assert items[2]["result"] == converter.convert(88, "creatinine", "µmol/L", "mg/dL")
+        assert items[3]["result"] == 7.0
+        assert not any(item is not None and math.isnan(item["result"]) for item in items)
+    
+    def test_nothing_valid(self, converter):
+        """Test a block where nothing can be converted."""
+        assert convert_extractions([None, {"analyte": "sodium"}], converter) == [None, None]
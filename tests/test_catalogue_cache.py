@@ -0,0 +1,170 @@
+"""
+Unit tests for the catalogue_cache module.
+"""
+
+import json
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pytest
+from src.catalogue_cache import MAGIC, _PREFIX, cache_path_for, load_catalogue, read_header
+from src.units import Unit
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    path = tmp_path / "scientific_data.csv"
+    shutil.copy("data/scientific_data.csv", path)
+    return path
+
+
+class TestLoadCatalogue:
+    """Tests for the load_catalogue function."""
+    
+    def test_first_load_writes_cache(self, data_path):
+        """Test that the first load compiles the file and writes the cache."""
+        loader, converter, _, cached = load_catalogue(data_path)
+        
+        assert not cached
+        assert cache_path_for(data_path).exists()
+        assert loader.get_molar_mass("glucose") == 180.16
+    
+    def test_second_load_uses_cache(self, data_path):
+        """Test that a later load matches a fresh compilation."""
+        fresh_loader, fresh_converter, fresh_parser, _ = load_catalogue(data_path)
+        loader, converter, parser, cached = load_catalogue(data_path)
+        
+        assert cached
+        assert loader.get_all_analytes() == fresh_loader.get_all_analytes()
+        assert loader.get_analyte_info("Créatinine") == fresh_loader.get_analyte_info("Créatinine")
+        assert loader.get_common_unit_codes("glucose") == [
+            Unit.MMOL_PER_L, Unit.MG_PER_DL, Unit.G_PER_L
+        ]
+        np.testing.assert_array_equal(converter.factors, fresh_converter.factors)
+        assert converter.convert(100, "créatinine", "µmol/L", "mg/dL") == pytest.approx(1.131, rel=1e-3)
+        assert parser.compiled_vocabulary() == fresh_parser.compiled_vocabulary()
+        assert parser.parse("Acide urique 300 µmol/L vers mg/dL")["analyte"] == "acide_urique"
+    
+    def test_factors_memory_mapped_read_only(self, data_path):
+        """Test that a cached factor table is a read-only view of the file."""
+        load_catalogue(data_path)
+        _, converter, _, _ = load_catalogue(data_path)
+        
+        assert not converter.factors.flags.writeable
+        assert not converter.factors.flags.owndata
+    
+    def test_rebuilt_when_source_changes(self, data_path):
+        """Test that editing the data file rebuilds the cache."""
+        load_catalogue(data_path)
+        with open(data_path, "a", encoding="utf-8") as f:
+            f.write("\ntestine,100.0,g/mol,Test,mmol/L;mg/dL,\n")
+        
+        loader, converter, _, cached = load_catalogue(data_path)
+        
+        assert not cached
+        assert loader.get_molar_mass("testine") == 100.0
+        assert converter.convert(1, "testine", "mmol/L", "mg/dL") == pytest.approx(10.0)
+        assert load_catalogue(data_path)[3]
+    
+    def test_touched_file_with_same_content_hits(self, data_path):
+        """Test that a new modification time alone does not rebuild the cache."""
+        load_catalogue(data_path)
+        stat = data_path.stat()
+        os.utime(data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        
+        assert load_catalogue(data_path)[3]
+    
+    def test_corrupt_cache_rebuilt(self, data_path):
+        """Test that an unreadable cache file is replaced."""
+        cache_path_for(data_path).write_bytes(b"not a catalogue")
+        
+        loader, _, _, cached = load_catalogue(data_path)
+        
+        assert not cached
+        assert loader.get_molar_mass("glucose") == 180.16
+        assert load_catalogue(data_path)[3]
+    
+    @pytest.mark.parametrize("shape", [["x"], [1000000, 5, 5], [2, 3]])
+    def test_bad_shape_rebuilt(self, data_path, shape):
+        """Test that a cache with the right magic but a bad header is replaced."""
+        load_catalogue(data_path)
+        cache_path = cache_path_for(data_path)
+        with open(cache_path, "rb") as f:
+            header = read_header(f.read())
+        header["shape"] = shape
+        encoded = json.dumps(header).encode("utf-8")
+        cache_path.write_bytes(_PREFIX.pack(MAGIC, len(encoded)) + encoded)
+        
+        loader, converter, _, cached = load_catalogue(data_path)
+        
+        assert not cached
+        assert converter.convert(100, "créatinine", "µmol/L", "mg/dL") == pytest.approx(1.131, rel=1e-3)
+        assert load_catalogue(data_path)[3]
+    
+    def test_truncated_cache_rebuilt(self, data_path):
+        """Test that a cache cut short is replaced."""
+        load_catalogue(data_path)
+        cache_path = cache_path_for(data_path)
+        with open(cache_path, "r+b") as f:
+            f.truncate(cache_path.stat().st_size - 10)
+        
+        loader, _, _, cached = load_catalogue(data_path)
+        
+        assert not cached
+        assert loader.get_molar_mass("glucose") == 180.16
+        assert load_catalogue(data_path)[3]
+    
+    def test_cache_hit_decodes_lazily(self, data_path):
+        """Test that a cache hit decodes nothing until the first lookup."""
+        load_catalogue(data_path)
+        loader, converter, parser, cached = load_catalogue(data_path)
+        
+        assert cached
+        assert not loader._indexed
+        assert "_index" not in vars(converter)
+        assert "_vocabulary" not in vars(parser)
+        assert len(converter) == 7
+        
+        assert converter.convert(90, "glucose", "mg/dL", "mmol/L") == pytest.approx(4.9956, abs=1e-4)
+        assert "_index" in vars(converter)
+        assert not loader._indexed
+        assert loader.get_molar_mass("urée") == 60.06
+        assert loader._indexed
+        assert parser.parse("urée 7 mmol/L en g/L")["analyte"] == "uree"
+    
+    def test_cache_hit_pickles(self, data_path):
+        """Test that cached components can be sent to spawned worker processes."""
+        load_catalogue(data_path)
+        loader, converter, parser, _ = load_catalogue(data_path)
+        
+        loader, converter, parser = pickle.loads(pickle.dumps((loader, converter, parser)))
+        
+        assert loader.get_molar_mass("urée") == 60.06
+        assert converter.convert(90, "glucose", "mg/dL", "mmol/L") == pytest.approx(4.9956, abs=1e-4)
+        assert not converter.factors.flags.writeable
+        assert parser.parse("urée 7 mmol/L en g/L")["analyte"] == "uree"
+    
+    def test_custom_cache_path(self, data_path, tmp_path):
+        """Test caching to another file."""
+        cache_path = tmp_path / "cache" / "catalogue.bin"
+        cache_path.parent.mkdir()
+        
+        load_catalogue(data_path, cache_path)
+        
+        assert cache_path.exists()
+        assert not cache_path_for(data_path).exists()
+        assert load_catalogue(data_path, cache_path)[3]
+    
+    def test_unwritable_cache_ignored(self, data_path, tmp_path):
+        """Test that loading works when the cache cannot be written."""
+        loader, _, _, cached = load_catalogue(data_path, tmp_path / "missing" / "catalogue.bin")
+        
+        assert not cached
+        assert loader.get_molar_mass("glucose") == 180.16
+    
+    def test_missing_file(self, tmp_path):
+        """Test that a missing data file raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            load_catalogue(tmp_path / "missing.csv")
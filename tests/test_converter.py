@@ -2,12 +2,17 @@
 Unit tests for the converter module.
 """
 
+import numpy as np
+import pandas as pd
 import pytest
 from src.converter import (
     convert_units,
+    convert_units_batch,
+    Converter,
     validate_units,
     get_conversion_formula
 )
+from src.units import Unit
 
 
 class TestConvertUnits:
@@ -102,6 +107,10 @@ class TestValidateUnits:
         """Test that spaces are ignored."""
         assert validate_units("mmol / L") is True
     
+    def test_greek_mu(self):
+        """Test that the Greek mu is accepted like the micro sign."""
+        assert validate_units("μmol/L") is True
+    
     def test_invalid_units(self):
         """Test that invalid units return False."""
         invalid = ["invalid", "mol/L", "kg/m3", ""]
@@ -182,3 +191,220 @@ class TestMedicalReferences:
         result = convert_units(90, "µmol/L", "mg/dL", 113.12)
         assert result is not None
         assert 0.9 < result < 1.1
+
+
+class TestConvertUnitsBatch:
+    """Tests for the vectorized convert_units_batch function."""
+    
+    UNITS = ["µmol/L", "umol/L", "mmol/L", "mg/dL", "g/L", "mmol / L", "invalid"]
+    
+    def test_bit_identical_to_scalar(self):
+        """Test that every unit pair matches the scalar path exactly."""
+        values = [0.0, 0.001, 1.0, 90.0, 123.45, 19243.0]
+        for from_unit in self.UNITS:
+            for to_unit in self.UNITS:
+                batch = convert_units_batch(values, from_unit, to_unit, 113.12)
+                for value, result in zip(values, batch):
+                    expected = convert_units(value, from_unit, to_unit, 113.12)
+                    if expected is None:
+                        assert np.isnan(result)
+                    else:
+                        assert result == expected
+    
+    def test_per_row_units_and_molar_masses(self):
+        """Test per-row units and molar masses."""
+        values = np.array([200.0, 19243.0, 90.0])
+        from_units = np.array(["mg/dL", "µmol/L", "mg/dL"])
+        to_units = np.array(["mmol/L", "g/L", "mmol/L"])
+        molar_masses = np.array([386.65, 113.12, 180.16])
+        
+        result = convert_units_batch(values, from_units, to_units, molar_masses)
+        
+        for i in range(3):
+            assert result[i] == convert_units(
+                values[i], from_units[i], to_units[i], molar_masses[i]
+            )
+    
+    def test_invalid_rows_are_nan(self):
+        """Test that rows the scalar path rejects become NaN."""
+        result = convert_units_batch(
+            [-100, 100, 100, 100],
+            ["mg/dL", "mg/dL", "invalid_unit", "mg/dL"],
+            ["mmol/L", "mmol/L", "mmol/L", "invalid_unit"],
+            [386.65, 0, 386.65, 386.65]
+        )
+        assert np.isnan(result).all()
+    
+    def test_pandas_series_input(self):
+        """Test that pandas Series are accepted."""
+        values = pd.Series([200.0, 100.0])
+        result = convert_units_batch(values, "mg/dL", "mmol/L", 386.65)
+        
+        assert isinstance(result, np.ndarray)
+        assert result.shape == (2,)
+        assert abs(result[0] - 5.17) < 0.01
+    
+    def test_integer_unit_codes(self):
+        """Test that pre-encoded unit codes give the same result as strings."""
+        by_name = convert_units_batch([1000.0], "µmol/L", "mmol/L", 113.12)
+        by_code = convert_units_batch(
+            [1000.0],
+            np.array([Unit.UMOL_PER_L]),
+            np.array([Unit.MMOL_PER_L]),
+            113.12
+        )
+        assert by_name[0] == by_code[0]
+    
+    def test_out_of_range_codes_are_nan(self):
+        """Test that unknown integer codes are treated as invalid units."""
+        result = convert_units_batch([1.0], np.array([99]), Unit.G_PER_L, 113.12)
+        assert np.isnan(result[0])
+
+
+class TestConverter:
+    """Tests for the precompiled Converter table."""
+    
+    @pytest.fixture
+    def converter(self):
+        return Converter(
+            ["creatinine", "glucose", "cholesterol"],
+            [113.12, 180.16, 386.65]
+        )
+    
+    def test_matches_convert_units(self, converter):
+        """Test that the table gives the same result as convert_units."""
+        result = converter.convert(200, "cholesterol", "mg/dL", "mmol/L")
+        assert result == convert_units(200, "mg/dL", "mmol/L", 386.65)
+    
+    def test_creatinine_umol_l_to_g_l(self, converter):
+        """Test a reference conversion through the table."""
+        result = converter.convert(19243, "creatinine", "µmol/L", "g/L")
+        assert result is not None
+        assert abs(result - 2.1767) < 0.0001
+    
+    def test_unit_codes(self, converter):
+        """Test that Unit codes and strings give the same result."""
+        by_code = converter.convert(90, "glucose", Unit.MG_PER_DL, Unit.MMOL_PER_L)
+        assert by_code == converter.convert(90, "glucose", "mg/dL", "mmol/L")
+    
+    def test_same_unit_is_exact(self, converter):
+        """Test that same-unit conversions are exact."""
+        assert converter.convert(123.45, "glucose", "mg/dL", "mg/dL") == 123.45
+    
+    def test_unknown_analyte_or_unit(self, converter):
+        """Test that unknown analytes and units return None."""
+        assert converter.convert(100, "unknown", "mg/dL", "mmol/L") is None
+        assert converter.convert(100, "glucose", "invalid", "mmol/L") is None
+        assert converter.factor("glucose", "mg/dL", "invalid") is None
+    
+    def test_negative_value(self, converter):
+        """Test that negative values return None."""
+        assert converter.convert(-1, "glucose", "mg/dL", "mmol/L") is None
+    
+    def test_molar_mass(self, converter):
+        """Test molar mass lookup."""
+        assert converter.molar_mass("glucose") == 180.16
+        assert converter.molar_mass("unknown") is None
+    
+    def test_analyte_name(self, converter):
+        """Test the canonical name lookup by table index."""
+        assert converter.analyte_name(converter.analyte_index("Glucose")) == "glucose"
+        assert [converter.analyte_name(i) for i in range(len(converter))] == converter.analytes
+    
+    def test_invalid_molar_mass(self):
+        """Test that non-positive molar masses are rejected."""
+        with pytest.raises(ValueError):
+            Converter(["bad"], [0.0])
+    
+    def test_convert_batch(self, converter):
+        """Test batch conversion against the scalar table path."""
+        values = np.array([200.0, 90.0, 19243.0, 5.0, -1.0])
+        analytes = np.array(["cholesterol", "glucose", "creatinine", "unknown", "glucose"])
+        from_units = np.array(["mg/dL", "mg/dL", "µmol/L", "mg/dL", "mg/dL"])
+        
+        result = converter.convert_batch(values, analytes, from_units, "g/L")
+        
+        for i in range(3):
+            assert result[i] == converter.convert(
+                values[i], analytes[i], from_units[i], "g/L"
+            )
+        assert np.isnan(result[3])
+        assert np.isnan(result[4])
+    
+    def test_deferred(self, converter):
+        """Test a converter whose catalogue is decoded on first use."""
+        calls = []
+        
+        def decode():
+            calls.append(1)
+            return converter.analytes, [113.12, 180.16, 386.65], converter.index
+        
+        deferred = Converter.deferred(converter.factors, decode)
+        
+        assert len(deferred) == 3
+        assert calls == []
+        assert deferred.convert(200, "cholesterol", "mg/dL", "mmol/L") == converter.convert(
+            200, "cholesterol", "mg/dL", "mmol/L"
+        )
+        assert deferred.molar_mass("glucose") == 180.16
+        assert calls == [1]
+    
+    def test_deferred_rejects_mismatch(self, converter):
+        """Test that a table and a catalogue that do not match are rejected."""
+        with pytest.raises(ValueError):
+            Converter.deferred(np.zeros((2, 3)), lambda: ([], [], {}))
+        
+        deferred = Converter.deferred(converter.factors, lambda: (["glucose"], [180.16], {}))
+        with pytest.raises(ValueError):
+            deferred.convert(1, "glucose", "mmol/L", "mg/dL")
+    
+    def test_from_loader(self):
+        """Test building the table from the scientific data file."""
+        from src.data_loader import ScientificDataLoader
+        
+        converter = Converter.from_loader(
+            ScientificDataLoader("data/scientific_data.csv")
+        )
+        assert "creatinine" in converter.analytes
+        assert converter.molar_mass("creatinine") == 113.12
+
+
+# Factors of the original implementation, which converted through mol/L
+# with string comparisons: unit → (to mol/L, from mol/L)
+_ORIGINAL_STEPS = {
+    "µmol/l": (lambda v, m: v * 1e-6, lambda v, m: v * 1e6),
+    "umol/l": (lambda v, m: v * 1e-6, lambda v, m: v * 1e6),
+    "mmol/l": (lambda v, m: v * 1e-3, lambda v, m: v * 1e3),
+    "g/l": (lambda v, m: v / m, lambda v, m: v * m),
+    "mg/dl": (lambda v, m: v / 100 / m, lambda v, m: v * m * 100),
+}
+
+
+def original_convert_units(value, from_unit, to_unit, molar_mass):
+    """Two-step conversion of the original convert_units, as a reference."""
+    if value < 0 or molar_mass <= 0:
+        return None
+    from_step = _ORIGINAL_STEPS.get(from_unit.lower().replace(" ", ""))
+    to_step = _ORIGINAL_STEPS.get(to_unit.lower().replace(" ", ""))
+    if from_step is None or to_step is None:
+        return None
+    return to_step[1](from_step[0](value, molar_mass), molar_mass)
+
+
+class TestScalarPath:
+    """Checks the scalar fast path against the original implementation."""
+    
+    def test_results_unchanged(self):
+        """Test that the fast path gives the same results as the original one."""
+        converter = Converter(["cholesterol"], [386.65])
+        units = ["µmol/L", "umol/L", "mmol/L", "g/L", "mg/dL", "MG / DL", "bad"]
+        
+        for from_unit in units:
+            for to_unit in units:
+                expected = original_convert_units(123.4, from_unit, to_unit, 386.65)
+                actual = convert_units(123.4, from_unit, to_unit, 386.65)
+                if expected is None:
+                    assert actual is None
+                else:
+                    assert actual == pytest.approx(expected, rel=1e-12)
+                assert converter.convert(123.4, "cholesterol", from_unit, to_unit) == actual
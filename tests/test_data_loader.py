@@ -5,7 +5,8 @@ Unit tests for the data_loader module.
 import pytest
 import pandas as pd
 from pathlib import Path
-from src.data_loader import ScientificDataLoader
+from src.data_loader import ScientificDataLoader, normalize_analyte_name
+from src.units import Unit
 
 
 class TestScientificDataLoader:
@@ -129,6 +130,14 @@ class TestScientificDataLoader:
         _ = loader.data
         assert loader._data is not None
     
+    def test_lookups_do_not_load_dataframe(self):
+        """Test that lookups only build the index."""
+        loader = ScientificDataLoader("data/scientific_data.csv")
+        
+        assert loader.get_molar_mass("urée") == 60.06
+        assert loader._data is None
+        assert loader.data["analyte"].tolist() == loader.get_all_analytes()
+    
     def test_multiple_analytes(self):
         """Test that multiple analytes are loaded correctly."""
         loader = ScientificDataLoader("data/scientific_data.csv")
@@ -168,6 +177,67 @@ class TestScientificDataLoader:
             assert isinstance(unit, str)
             assert len(unit) > 0
 
+    
+    def test_common_unit_codes(self):
+        """Test that common units are exposed as unit codes."""
+        loader = ScientificDataLoader("data/scientific_data.csv")
+        codes = loader.get_common_unit_codes("creatinine")
+        
+        assert codes == [Unit.UMOL_PER_L, Unit.MG_PER_DL, Unit.G_PER_L]
+        assert loader.get_common_unit_codes("unknown") is None
+
+
+class TestAnalyteIndex:
+    """Tests for the constant-time analyte index."""
+    
+    def test_lookup_is_case_and_accent_insensitive(self):
+        """Test lookups with case and accent variations."""
+        loader = ScientificDataLoader("data/scientific_data.csv")
+        
+        assert loader.get_molar_mass("Creatinine") == 113.12
+        assert loader.get_molar_mass("Acide urique") == 168.11
+    
+    def test_lookup_by_alias(self):
+        """Test lookups through the aliases column."""
+        loader = ScientificDataLoader("data/scientific_data.csv")
+        
+        info = loader.get_analyte_info("urée")
+        assert info is not None
+        assert info["analyte"] == "uree"
+        assert loader.get_molar_mass("gluc") == 180.16
+    
+    def test_common_units_are_cached(self):
+        """Test that common_units are split once and cannot be changed by callers."""
+        loader = ScientificDataLoader("data/scientific_data.csv")
+        
+        loader.get_common_units("glucose").append("g/L")
+        loader.get_analyte_info("glucose")["common_units"].clear()
+        loader.get_common_unit_codes("glucose").clear()
+        
+        assert loader.get_common_units("glucose") == ["mmol/L", "mg/dL", "g/L"]
+        assert loader.get_common_unit_codes("glucose") == [
+            Unit.MMOL_PER_L, Unit.MG_PER_DL, Unit.G_PER_L
+        ]
+        assert isinstance(loader._lookup("glucose").common_units, tuple)
+    
+    def test_index_without_aliases_column(self, tmp_path):
+        """Test that the aliases column is optional."""
+        csv_path = tmp_path / "data.csv"
+        csv_path.write_text(
+            "analyte,molar_mass,unit,source,common_units\n"
+            "glucose,180.16,g/mol,PubChem NIH,mmol/L;mg/dL\n",
+            encoding="utf-8"
+        )
+        loader = ScientificDataLoader(str(csv_path))
+        
+        assert loader.get_molar_mass("GLUCOSE") == 180.16
+        assert loader.get_molar_mass("gluc") is None
+    
+    def test_normalize_analyte_name(self):
+        """Test analyte name normalization."""
+        assert normalize_analyte_name("Acide urique") == "acide_urique"
+        assert normalize_analyte_name("Urée") == "uree"
+        assert normalize_analyte_name(" Cholestérol ") == "cholesterol"
 
 class TestDataValidation:
     """Tests for data validation functionality."""
@@ -194,3 +264,45 @@ class TestDataValidation:
         data = loader.load_data()
         
         assert len(data["analyte"].unique()) == len(data)
+    
+    @pytest.mark.parametrize("row, message", [
+        ("glucose,-1,g/mol,PubChem NIH,mmol/L", "molar_mass must be positive"),
+        ("glucose,abc,g/mol,PubChem NIH,mmol/L", "molar_mass is not a number"),
+        ("glucose,180.16,kg/mol,PubChem NIH,mmol/L", "must be g/mol"),
+        ("glucose,180.16,g/mol,,mmol/L", "source is empty"),
+        ("glucose,180.16,g/mol,PubChem NIH,mmol/L;furlongs", "unknown unit 'furlongs'"),
+        ("glucose,180.16,g/mol,PubChem NIH,mmol/L\nglucose,180.16,g/mol,x,mmol/L", "duplicate analyte"),
+        ("Glucose,180.16,g/mol,PubChem NIH,mmol/L\nglucose,180.16,g/mol,x,mmol/L",
+         "duplicate analyte 'glucose' \\(same as 'Glucose'\\)"),
+    ])
+    def test_invalid_rows_rejected(self, tmp_path, row, message):
+        """Test that types, ranges and units are checked when loading."""
+        csv_path = tmp_path / "data.csv"
+        csv_path.write_text(
+            "analyte,molar_mass,unit,source,common_units\n" + row + "\n",
+            encoding="utf-8"
+        )
+        loader = ScientificDataLoader(str(csv_path))
+        
+        with pytest.raises(ValueError, match=message):
+            loader.load_index()
+    
+    def test_records_are_immutable(self):
+        """Test that compiled records cannot be modified."""
+        loader = ScientificDataLoader("data/scientific_data.csv")
+        record = loader._lookup("glucose")
+        
+        with pytest.raises(AttributeError):
+            record.molar_mass = 1.0
+        assert not hasattr(record, "__dict__")
+    
+    def test_compiled_round_trip(self):
+        """Test rebuilding a loader from its compiled catalogue."""
+        loader = ScientificDataLoader("data/scientific_data.csv")
+        
+        copy = ScientificDataLoader.from_compiled(loader.compiled_rows(), loader.compiled_index())
+        
+        assert copy.get_all_analytes() == loader.get_all_analytes()
+        assert copy.get_aliases() == loader.get_aliases()
+        assert copy.get_molar_mass("urée") == 60.06
+        assert copy.get_common_unit_codes("creatinine") == [Unit.UMOL_PER_L, Unit.MG_PER_DL, Unit.G_PER_L]
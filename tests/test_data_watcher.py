@@ -0,0 +1,87 @@
+"""
+Unit tests for the data_watcher module.
+"""
+
+import threading
+import time
+
+import pytest
+from src.data_watcher import DataWatcher
+
+
+def wait_for(event, timeout=5.0):
+    return event.wait(timeout)
+
+
+class TestDataWatcher:
+    """Tests for the DataWatcher class."""
+    
+    def test_debounced(self):
+        """Test that a burst of notifications gives a single callback."""
+        calls = []
+        done = threading.Event()
+        
+        def on_change():
+            calls.append(time.monotonic())
+            done.set()
+        
+        watcher = DataWatcher("data.csv", on_change, debounce_seconds=0.05)
+        for _ in range(5):
+            watcher.notify()
+        
+        assert wait_for(done)
+        time.sleep(0.1)
+        assert len(calls) == 1
+    
+    def test_file_change_detected(self, tmp_path):
+        """Test that writing the watched file triggers the callback."""
+        path = tmp_path / "data.csv"
+        path.write_text("a\n")
+        changed = threading.Event()
+        watcher = DataWatcher(str(path), changed.set, debounce_seconds=0.05)
+        watcher.start()
+        
+        try:
+            assert watcher.running
+            path.write_text("b\n")
+            assert wait_for(changed)
+        finally:
+            watcher.stop()
+        
+        assert not watcher.running
+    
+    def test_replaced_by_rename(self, tmp_path):
+        """Test atomic replacement (write to a temporary file, then rename)."""
+        path = tmp_path / "data.csv"
+        path.write_text("a\n")
+        changed = threading.Event()
+        watcher = DataWatcher(str(path), changed.set, debounce_seconds=0.05)
+        watcher.start()
+        
+        try:
+            tmp = tmp_path / "data.csv.tmp"
+            tmp.write_text("b\n")
+            tmp.replace(path)
+            assert wait_for(changed)
+        finally:
+            watcher.stop()
+    
+    def test_other_files_ignored(self, tmp_path):
+        """Test that changes to neighbouring files are ignored."""
+        path = tmp_path / "data.csv"
+        path.write_text("a\n")
+        changed = threading.Event()
+        watcher = DataWatcher(str(path), changed.set, debounce_seconds=0.05)
+        watcher.start()
+        
+        try:
+            (tmp_path / "other.csv").write_text("b\n")
+            assert not changed.wait(0.3)
+        finally:
+            watcher.stop()
+    
+    def test_available(self):
+        """Test the watchdog availability check."""
+        pytest.importorskip("watchdog")
+        
+        assert DataWatcher.available()
@@ -0,0 +1,117 @@
+"""
+Unit tests for the extraction_cache module.
+"""
+
+import pytest
+from src.extraction_cache import ExtractionCache, make_key, normalize_input
+
+ANALYTES = ["creatinine", "glucose"]
+
+
+class FakeClock:
+    """Manually advanced time source."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ExtractionCache(
+        str(tmp_path / "cache.sqlite3"), max_entries=3, ttl_seconds=60, clock=clock
+    )
+    yield cache
+    cache.close()
+
+
+class TestKeys:
+    """Tests for key construction."""
+    
+    def test_normalize_input(self):
+        """Test that case and whitespace are ignored."""
+        assert normalize_input("  Glucose   90 MG/DL ") == "glucose 90 mg/dl"
+    
+    def test_key_depends_on_model_and_analytes(self):
+        """Test that model and analyte list are part of the key."""
+        key = make_key("glucose 90", "llama3.2", ANALYTES)
+        
+        assert key == make_key("Glucose  90", "llama3.2", ANALYTES)
+        assert key != make_key("glucose 90", "mistral", ANALYTES)
+        assert key != make_key("glucose 90", "llama3.2", ANALYTES + ["uree"])
+
+
+class TestExtractionCache:
+    """Tests for the ExtractionCache class."""
+    
+    def test_get_or_compute_calls_model_once(self, cache):
+        """Test that identical requests are served from the cache."""
+        calls = []
+        
+        def compute():
+            calls.append(1)
+            return {"analyte": "glucose", "value": 90.0}
+        
+        first = cache.get_or_compute("glucose 90", "llama3.2", ANALYTES, compute)
+        second = cache.get_or_compute("GLUCOSE 90", "llama3.2", ANALYTES, compute)
+        
+        assert first == second == {"analyte": "glucose", "value": 90.0}
+        assert len(calls) == 1
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+    
+    def test_failures_are_not_cached(self, cache):
+        """Test that None results are recomputed."""
+        assert cache.get_or_compute("x", "m", ANALYTES, lambda: None) is None
+        assert len(cache) == 0
+    
+    def test_ttl_expiry(self, cache, clock):
+        """Test that entries expire after the TTL."""
+        cache.put("k", {"value": 1})
+        clock.now += 61
+        
+        assert cache.get("k") is None
+        assert len(cache) == 0
+    
+    def test_lru_eviction(self, cache, clock):
+        """Test that the least recently used entry is evicted."""
+        for key in ["a", "b", "c"]:
+            clock.now += 1
+            cache.put(key, {"key": key})
+        clock.now += 1
+        cache.get("a")
+        clock.now += 1
+        cache.put("d", {"key": "d"})
+        
+        assert len(cache) == 3
+        assert cache.get("b") is None
+        assert cache.get("a") == {"key": "a"}
+    
+    def test_persistence(self, tmp_path):
+        """Test that entries survive reopening the database."""
+        path = str(tmp_path / "cache.sqlite3")
+        cache = ExtractionCache(path)
+        cache.put("k", {"unit_from": "µmol/L"})
+        cache.close()
+        
+        reopened = ExtractionCache(path)
+        assert reopened.get("k") == {"unit_from": "µmol/L"}
+        reopened.close()
+    
+    def test_purge_and_clear(self, cache, clock):
+        """Test explicit purge of expired entries and clearing."""
+        cache.put("old", {})
+        clock.now += 61
+        cache.put("new", {})
+        
+        assert cache.purge_expired() == 1
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats["hits"] == 0
@@ -0,0 +1,128 @@
+"""
+Unit tests for the history_export module.
+"""
+
+import csv
+import io
+import json
+from unittest import mock
+
+import pyarrow.parquet as pq
+import pytest
+from src import history_export
+from src.history_export import EXPORT_FORMATS, HistoryExporter, available_formats, serialize
+from src.history_store import HISTORY_COLUMNS, HistoryStore
+
+
+def make_entry(i, analyte="glucose"):
+    return {
+        "timestamp": f"2026-01-01 10:00:{i:02d}",
+        "analyte": analyte,
+        "value_input": float(i),
+        "unit_from": "mg/dL",
+        "value_output": i / 18.016,
+        "unit_to": "mmol/L",
+        "molar_mass": 180.16,
+        "source": "PubChem NIH",
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    store.append([make_entry(1), make_entry(2, "urée")])
+    yield store
+    store.close()
+
+
+class TestSerialize:
+    """Tests for the serialize function."""
+    
+    def test_csv(self):
+        """Test CSV output (BOM for Excel, header first)."""
+        data = serialize([make_entry(1, "urée")], "csv")
+        
+        assert data.startswith(b"\xef\xbb\xbf")
+        rows = list(csv.reader(io.StringIO(data.decode("utf-8-sig"))))
+        assert rows[0] == list(HISTORY_COLUMNS)
+        assert rows[1][1] == "urée"
+    
+    def test_jsonl(self):
+        """Test one JSON object per line."""
+        lines = serialize([make_entry(1), make_entry(2)], "jsonl").decode("utf-8").splitlines()
+        
+        assert [json.loads(line)["value_input"] for line in lines] == [1.0, 2.0]
+    
+    def test_parquet(self):
+        """Test that Parquet keeps column types."""
+        table = pq.read_table(io.BytesIO(serialize([make_entry(1)], "parquet")))
+        
+        assert table.column_names == list(HISTORY_COLUMNS)
+        assert table.column("value_input").to_pylist() == [1.0]
+    
+    def test_xlsx(self):
+        """Test Excel output when openpyxl is installed."""
+        openpyxl = pytest.importorskip("openpyxl")
+        
+        workbook = openpyxl.load_workbook(io.BytesIO(serialize([make_entry(1)], "xlsx")))
+        rows = list(workbook.active.values)
+        
+        assert rows[0] == HISTORY_COLUMNS
+        assert rows[1][2] == 1.0
+    
+    def test_unsupported(self):
+        """Test that unknown formats are rejected."""
+        with pytest.raises(ValueError):
+            serialize([], "xml")
+    
+    def test_available_formats(self):
+        """Test that Excel is only offered with openpyxl."""
+        with mock.patch("importlib.util.find_spec", return_value=None):
+            assert available_formats() == ["csv", "parquet", "jsonl"]
+        
+        assert set(available_formats()) <= set(EXPORT_FORMATS)
+
+
+class TestHistoryExporter:
+    """Tests for the HistoryExporter class."""
+    
+    def test_reused_until_history_changes(self, store):
+        """Test that files are only regenerated after new entries."""
+        exporter = HistoryExporter(store)
+        
+        with mock.patch.object(history_export, "serialize", wraps=serialize) as spy:
+            first = exporter.export("csv")
+            assert exporter.export("csv") is first
+            assert spy.call_count == 1
+            
+            store.append([make_entry(3)])
+            assert exporter.export("csv") != first
+            assert spy.call_count == 2
+    
+    def test_filtered(self, store):
+        """Test that each analyte filter gets its own file."""
+        exporter = HistoryExporter(store)
+        
+        lines = exporter.export("jsonl", "urée").decode("utf-8").splitlines()
+        
+        assert [json.loads(line)["analyte"] for line in lines] == ["urée"]
+        assert len(exporter.export("jsonl").splitlines()) == 2
+    
+    def test_bounded(self, store):
+        """Test that only the most recent files are kept."""
+        exporter = HistoryExporter(store, max_files=2)
+        
+        for table_format in ("csv", "jsonl", "parquet"):
+            exporter.export(table_format)
+        
+        assert list(exporter._files) == [("jsonl", None), ("parquet", None)]
+    
+    def test_unsupported(self, store):
+        """Test that unknown formats are rejected before querying."""
+        with pytest.raises(ValueError):
+            HistoryExporter(store).export("xml")
+    
+    def test_file_name(self):
+        """Test file names and MIME types."""
+        assert HistoryExporter.file_name("jsonl") == "historique.jsonl"
+        assert HistoryExporter.mime_type("csv") == "text/csv"
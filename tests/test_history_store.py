@@ -0,0 +1,197 @@
+"""
+Unit tests for the history_store module.
+"""
+
+import threading
+
+import pytest
+from src.history_store import HISTORY_COLUMNS, HistoryStore, RecentHistory
+
+
+def make_entry(i, analyte="glucose"):
+    return {
+        "timestamp": f"2026-01-01 10:{i // 60:02d}:{i % 60:02d}",
+        "analyte": analyte,
+        "value_input": float(i),
+        "unit_from": "mg/dL",
+        "value_output": i / 18.016,
+        "unit_to": "mmol/L",
+        "molar_mass": 180.16,
+        "source": "PubChem NIH",
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    yield store
+    store.close()
+
+
+class TestHistoryStore:
+    """Tests for the HistoryStore class."""
+    
+    def test_wal_mode(self, store):
+        """Test that the database uses write-ahead logging."""
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    
+    def test_indexes(self, store):
+        """Test that timestamp and analyte queries are indexed."""
+        plan = store._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM conversions WHERE analyte = ? "
+            "ORDER BY timestamp DESC", ("glucose",)
+        ).fetchall()
+        
+        assert "conversions_analyte" in " ".join(row[-1] for row in plan)
+    
+    def test_append_and_page(self, store):
+        """Test that pages are returned most recent first."""
+        assert store.append(make_entry(i) for i in range(25)) == 25
+        
+        first = store.page(0, 10)
+        last = store.page(2, 10)
+        
+        assert [e["value_input"] for e in first] == [float(i) for i in range(24, 14, -1)]
+        assert [e["value_input"] for e in last] == [4.0, 3.0, 2.0, 1.0, 0.0]
+        assert store.page(3, 10) == []
+        assert set(HISTORY_COLUMNS) < set(first[0])
+    
+    def test_no_retention_limit(self, store):
+        """Test that entries are never evicted."""
+        store.append(make_entry(i) for i in range(500))
+        
+        assert store.count() == 500
+    
+    def test_filter_by_analyte(self, store):
+        """Test paging and counting for one analyte."""
+        store.append([make_entry(1), make_entry(2, "uree"), make_entry(3)])
+        
+        assert store.count("glucose") == 2
+        assert [e["value_input"] for e in store.page(analyte="uree")] == [2.0]
+        assert store.analytes() == ["glucose", "uree"]
+    
+    def test_entries_oldest_first(self, store):
+        """Test the full export order."""
+        store.append([make_entry(2), make_entry(1)])
+        
+        entries = store.entries()
+        
+        assert [e["value_input"] for e in entries] == [1.0, 2.0]
+        assert list(entries[0]) == list(HISTORY_COLUMNS)
+    
+    def test_persistent(self, tmp_path):
+        """Test that entries survive reopening the database."""
+        path = str(tmp_path / "history.sqlite3")
+        store = HistoryStore(path)
+        store.append([make_entry(1)])
+        store.close()
+        
+        reopened = HistoryStore(path)
+        try:
+            assert reopened.count() == 1
+        finally:
+            reopened.close()
+    
+    def test_append_empty(self, store):
+        """Test that an empty batch is a no-op."""
+        assert store.append([]) == 0
+        assert store.count() == 0
+    
+    def test_concurrent_appends(self, store):
+        """Test appends from several threads (Streamlit sessions)."""
+        def worker(offset):
+            for i in range(20):
+                store.append([make_entry(offset + i)])
+        
+        threads = [threading.Thread(target=worker, args=(n * 100,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert store.count() == 80
+    
+    def test_recent_pages_served_from_memory(self, store):
+        """Test that unfiltered recent pages match the database."""
+        store.append(make_entry(i) for i in range(150))
+        
+        for page in (0, 9, 10, 14):
+            from_memory = store.page(page, 10)
+            from_db = [
+                dict(row) for row in store._conn.execute(
+                    "SELECT * FROM conversions ORDER BY timestamp DESC, id DESC "
+                    "LIMIT 10 OFFSET ?", (page * 10,)
+                )
+            ]
+            assert from_memory == from_db
+    
+    def test_recent_loaded_on_open(self, tmp_path):
+        """Test that the ring buffer is refilled when reopening."""
+        path = str(tmp_path / "history.sqlite3")
+        store = HistoryStore(path)
+        store.append(make_entry(i) for i in range(30))
+        store.close()
+        
+        reopened = HistoryStore(path, recent_capacity=20)
+        try:
+            assert len(reopened.recent) == 20
+            assert [e["value_input"] for e in reopened.page(0, 5)] == [29.0, 28.0, 27.0, 26.0, 25.0]
+            assert reopened.count() == 30
+        finally:
+            reopened.close()
+    
+    def test_analyte_counts_served_from_memory(self, tmp_path):
+        """Test that the analyte filter and counts match the database without querying it."""
+        path = str(tmp_path / "history.sqlite3")
+        store = HistoryStore(path)
+        store.append([make_entry(1, "uree"), make_entry(2), make_entry(3, "uree")])
+        store.close()
+        
+        reopened = HistoryStore(path)
+        reopened.append([make_entry(4, "creatinine")])
+        reopened.close()
+        
+        assert reopened.analytes() == ["creatinine", "glucose", "uree"]
+        assert reopened.count("uree") == 2
+        assert reopened.count("creatinine") == 1
+        assert reopened.count("inconnu") == 0
+        assert reopened.count() == 4
+    
+    def test_backdated_entries(self, store):
+        """Test that out-of-order timestamps keep pages sorted."""
+        store.append([make_entry(5), make_entry(7)])
+        store.append([make_entry(6)])
+        
+        assert [e["value_input"] for e in store.page(0, 10)] == [7.0, 6.0, 5.0]
+
+
+class TestRecentHistory:
+    """Tests for the RecentHistory ring buffer."""
+    
+    def test_newest_first(self):
+        """Test iteration order and offsets."""
+        recent = RecentHistory(5)
+        for i in range(3):
+            recent.append({"id": i})
+        
+        assert [e["id"] for e in recent] == [2, 1, 0]
+        assert [e["id"] for e in recent.newest(1, 1)] == [1]
+    
+    def test_wraps_around(self):
+        """Test that the oldest entries are overwritten."""
+        recent = RecentHistory(3)
+        for i in range(7):
+            recent.append({"id": i})
+        
+        assert len(recent) == 3
+        assert [e["id"] for e in recent] == [6, 5, 4]
+        assert list(recent.newest(3)) == []
+    
+    def test_slots(self):
+        """Test that the buffer has no per-instance dictionary."""
+        assert not hasattr(RecentHistory(1), "__dict__")
+    
+    def test_invalid_capacity(self):
+        """Test that the capacity must be positive."""
+        with pytest.raises(ValueError):
+            RecentHistory(0)
@@ -0,0 +1,371 @@
+"""
+Unit tests for the llm_client module, against a local stand-in for the
+Ollama HTTP API.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from src.llm_client import (
+    ExtractionClient,
+    ExtractionError,
+    IncrementalJSONParser,
+    build_batch_prompt,
+    build_batch_schema,
+    build_prompt,
+    build_schema,
+    parse_batch_response,
+    parse_response,
+)
+
+ANALYTES = ["creatinine", "glucose"]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Answers /api/chat like Ollama, driven by keywords in the prompt."""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"] if body["messages"] else ""
+        server = self.server
+        
+        with server.lock:
+            server.requests.append(body)
+            server.ports.add(self.client_address[1])
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        
+        try:
+            if "lent" in prompt:
+                time.sleep(1.0)
+            time.sleep(0.2)
+            if not body["messages"]:
+                # Load request
+                self._send_chunk(body["model"], "", done=True)
+                return
+            if "cassé" in prompt:
+                content = "désolé, je ne sais pas"
+            elif "results" in body["format"]["properties"]:
+                # One object per numbered line, answered in reverse order
+                lines = [line for line in prompt.splitlines() if line[:1].isdigit()]
+                content = json.dumps({"results": [
+                    {
+                        "line": i,
+                        "analyte": "glucose" if "glucose" in line else "creatinine",
+                        "value": 1.0, "unit_from": "mg/dL", "unit_to": None
+                    }
+                    for i, line in reversed(list(enumerate(lines, start=1)))
+                ]})
+            else:
+                analyte = "glucose" if "glucose" in prompt else "creatinine"
+                content = "```json\n" + json.dumps({
+                    "analyte": analyte, "value": 1.0, "unit_from": "mg/dL", "unit_to": "mmol/L"
+                }) + "\n```"
+            if body.get("stream"):
+                if "bavard" in prompt:
+                    content += " Voici une explication détaillée." * 40
+                self._stream(body["model"], content)
+            else:
+                self._send_chunk(body["model"], content, done=True)
+        except (BrokenPipeError, ConnectionResetError):
+            with server.lock:
+                server.aborted += 1
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+    
+    def _message(self, model, content, done):
+        message = {
+            "model": model,
+            "created_at": "2026-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": content},
+            "done": done,
+        }
+        if done:
+            message.update(
+                load_duration=2_500_000_000, prompt_eval_count=12,
+                prompt_eval_duration=30_000_000, eval_count=40, eval_duration=400_000_000
+            )
+        return json.dumps(message).encode("utf-8")
+    
+    def _send_chunk(self, model, content, done):
+        payload = self._message(model, content, done)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def _stream(self, model, content):
+        """Send the answer as NDJSON, a few characters at a time."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pieces = [content[i:i + 8] for i in range(0, len(content), 8)]
+        for piece in pieces:
+            self._write_chunk(self._message(model, piece, False) + b"\n")
+            self.server.chunks_sent += 1
+            time.sleep(0.01)
+        self._write_chunk(self._message(model, "", True) + b"\n")
+        self._write_chunk(b"")
+    
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.ports = set()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.chunks_sent = 0
+    server.aborted = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server):
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    client = ExtractionClient(host=host, timeout=0.8, max_concurrency=4)
+    yield client
+    client.close()
+
+
+class TestPrompt:
+    """Tests for prompt building and response parsing."""
+    
+    def test_prompt_is_compact(self):
+        """Test that the prompt quotes the phrase without the vocabulary."""
+        prompt = build_prompt("Glucose 90 mg/dL")
+        
+        assert '"Glucose 90 mg/dL"' in prompt
+        assert "creatinine" not in prompt
+        assert len(prompt) < 200
+    
+    def test_schema_lists_vocabulary(self):
+        """Test that analytes and units are constrained by the schema."""
+        schema = build_schema(ANALYTES)
+        properties = schema["properties"]
+        
+        assert list(properties) == ["analyte", "value", "unit_from", "unit_to"]
+        assert properties["analyte"]["enum"] == ["creatinine", "glucose", None]
+        assert properties["unit_from"]["enum"] == ["µmol/L", "mmol/L", "g/L", "mg/dL", None]
+        assert schema["required"] == list(properties)
+    
+    def test_batch_schema(self):
+        """Test that the batch schema asks for one numbered item per phrase."""
+        results = build_batch_schema(ANALYTES, 3)["properties"]["results"]
+        
+        assert results["minItems"] == results["maxItems"] == 3
+        assert list(results["items"]["properties"])[0] == "line"
+    
+    def test_parse_fenced_json(self):
+        """Test that Markdown fences are stripped."""
+        assert parse_response('```json\n{"value": 2}\n```') == {"value": 2}
+    
+    def test_parse_invalid_json(self):
+        """Test that invalid output raises ExtractionError."""
+        with pytest.raises(ExtractionError):
+            parse_response("pas de JSON")
+        with pytest.raises(ExtractionError):
+            parse_response("[1, 2]")
+    
+    def test_batch_prompt_numbers_lines(self):
+        """Test that every phrase is numbered in the batch prompt."""
+        prompt = build_batch_prompt(["gluc 5.4 mmol", "crea 88 µmol"])
+        
+        assert prompt.endswith("\n1. gluc 5.4 mmol\n2. crea 88 µmol")
+    
+    def test_parse_batch_by_line_number(self):
+        """Test that array items are matched to phrases by line number."""
+        content = '[{"line": 2, "value": 2}, {"line": 1, "value": 1}]'
+        
+        assert parse_batch_response(content, 2) == [{"line": 1, "value": 1}, {"line": 2, "value": 2}]
+    
+    def test_parse_batch_missing_items(self):
+        """Test that phrases without an answer get None."""
+        content = '```json\n{"results": [{"value": 1}, "bruit"]}\n```'
+        
+        assert parse_batch_response(content, 3) == [{"value": 1}, None, None]
+    
+    def test_parse_batch_invalid(self):
+        """Test that a non-array answer raises ExtractionError."""
+        with pytest.raises(ExtractionError):
+            parse_batch_response("42", 2)
+
+
+class TestIncrementalJSONParser:
+    """Tests for the IncrementalJSONParser class."""
+    
+    def feed_all(self, text, size):
+        parser = IncrementalJSONParser()
+        seen = []
+        for i in range(0, len(text), size):
+            seen.append(dict(parser.feed(text[i:i + size])))
+        return parser, seen
+    
+    @pytest.mark.parametrize("size", [1, 3, 7, 100])
+    def test_same_result_as_json_loads(self, size):
+        """Test that any chunking yields the full object."""
+        text = '```json\n{"analyte": "ur\\u00e9e", "value": 12.75,\n "unit_from": "mg/dL", "unit_to": null}\n```'
+        parser, _ = self.feed_all(text, size)
+        
+        assert parser.closed
+        assert parser.fields == {
+            "analyte": "urée", "value": 12.75, "unit_from": "mg/dL", "unit_to": None
+        }
+    
+    def test_numbers_not_truncated(self):
+        """Test that a number is only reported once it is terminated."""
+        parser = IncrementalJSONParser()
+        
+        assert parser.feed('{"value": 12') == {}
+        assert parser.feed('3.') == {}
+        assert parser.feed('5 , "unit') == {"value": 123.5}
+    
+    def test_members_available_early(self):
+        """Test that members are available before the object is closed."""
+        parser = IncrementalJSONParser()
+        parser.feed('{"analyte": "glucose", "value": 5.4, "unit_from": "mmol/L", "unit_to": "mg/dL"')
+        
+        assert not parser.closed
+        assert parser.has(["analyte", "value", "unit_from", "unit_to"])
+    
+    def test_no_object(self):
+        """Test that text without an object yields no members."""
+        parser = IncrementalJSONParser()
+        
+        assert parser.feed("désolé, je ne sais pas") == {}
+        assert not parser.closed
+
+
+class TestExtractionClient:
+    """Tests for the ExtractionClient class."""
+    
+    def test_extract(self, client, server):
+        """Test a single extraction round trip."""
+        result = client.extract("glucose 90 mg/dL", ANALYTES)
+        
+        assert result == {
+            "analyte": "glucose", "value": 1.0, "unit_from": "mg/dL", "unit_to": "mmol/L"
+        }
+        assert server.requests[0]["model"] == "llama3.2"
+        assert server.requests[0]["stream"] is True
+        assert server.requests[0]["format"] == build_schema(ANALYTES)
+    
+    def test_stream_stops_early(self, client, server):
+        """Test that generation is cut off once all fields are parsed."""
+        start = time.perf_counter()
+        result = client.extract("glucose bavard", ANALYTES)
+        elapsed = time.perf_counter() - start
+        
+        assert result["unit_to"] == "mmol/L"
+        # The full answer takes ~180 chunks (over 2 s) to stream
+        assert elapsed < 0.7
+        deadline = time.time() + 2.0
+        while not server.aborted and time.time() < deadline:
+            time.sleep(0.05)
+        assert server.aborted == 1
+        assert server.chunks_sent < 60
+    
+    def test_connection_reuse(self, client, server):
+        """Test that sequential calls reuse one pooled connection."""
+        for _ in range(3):
+            client.extract_batch(["glucose 90 mg/dL"], ANALYTES)
+        
+        assert len(server.ports) == 1
+    
+    def test_extract_many_runs_concurrently(self, client, server):
+        """Test that several phrases are sent in parallel, in order."""
+        inputs = ["glucose 5", "creatinine 88", "glucose 6", "creatinine 90"]
+        
+        start = time.perf_counter()
+        results = client.extract_many(inputs, ANALYTES)
+        elapsed = time.perf_counter() - start
+        
+        assert [r["analyte"] for r in results] == [
+            "glucose", "creatinine", "glucose", "creatinine"
+        ]
+        assert server.max_in_flight > 1
+        assert elapsed < 0.2 * len(inputs)
+    
+    def test_extract_batch_single_request(self, client, server):
+        """Test that a whole block is extracted with one model call."""
+        lines = ["glucose 5", "creatinine 88", "glucose 6"]
+        results = client.extract_batch(lines, ANALYTES)
+        
+        assert [r["analyte"] for r in results] == ["glucose", "creatinine", "glucose"]
+        assert len(server.requests) == 1
+    
+    def test_preload(self, server):
+        """Test that preloading sends a load request with keep_alive."""
+        host = f"http://127.0.0.1:{server.server_address[1]}"
+        client = ExtractionClient(host=host, keep_alive="30m")
+        try:
+            timings = client.preload()
+        finally:
+            client.close()
+        
+        assert server.requests[0]["messages"] == []
+        assert server.requests[0]["keep_alive"] == "30m"
+        assert timings.request == "preload"
+        assert timings.load_seconds == 2.5
+    
+    def test_timings_reported(self, client):
+        """Test that every request reports its timings."""
+        reported = []
+        client.on_timings = reported.append
+        
+        client.extract_batch(["glucose 5"], ANALYTES)
+        client.extract("glucose bavard", ANALYTES)
+        
+        chat, stream = reported
+        assert chat.request == "chat"
+        assert chat.eval_tokens == 40
+        assert chat.prompt_eval_seconds == 0.03
+        assert stream.request == "stream"
+        assert 0 < stream.first_token_seconds <= stream.total_seconds
+        # Stopped before the final piece, which carries the server metadata
+        assert stream.load_seconds is None
+    
+    def test_timeout(self, client):
+        """Test that slow answers raise ExtractionError after the timeout."""
+        start = time.perf_counter()
+        with pytest.raises(ExtractionError):
+            client.extract("glucose lent", ANALYTES)
+        
+        assert time.perf_counter() - start < 1.1
+    
+    def test_partial_failures(self, client):
+        """Test that one failing phrase does not fail the whole batch."""
+        results = client.extract_many(["glucose 5", "glucose cassé"], ANALYTES)
+        
+        assert results[0]["analyte"] == "glucose"
+        assert isinstance(results[1], ExtractionError)
+    
+    def test_connection_error(self):
+        """Test that an unreachable server raises ExtractionError."""
+        client = ExtractionClient(host="http://127.0.0.1:9", timeout=1.0)
+        try:
+            with pytest.raises(ExtractionError):
+                client.extract("glucose 5", ANALYTES)
+        finally:
+            client.close()
@@ -0,0 +1,110 @@
+"""
+Unit tests for the metrics module.
+"""
+
+import json
+
+import pytest
+from src.metrics import Metrics, percentile
+
+
+class TestPercentile:
+    """Tests for the percentile function."""
+    
+    def test_nearest_rank(self):
+        """Test nearest-rank percentiles."""
+        samples = [float(i) for i in range(1, 101)]
+        
+        assert percentile(samples, 0.5) == 50.0
+        assert percentile(samples, 0.95) == 95.0
+        assert percentile(samples, 0.99) == 99.0
+        assert percentile([3.0], 0.99) == 3.0
+    
+    def test_empty(self):
+        """Test that no samples give no percentile."""
+        assert percentile([], 0.5) is None
+
+
+class TestMetrics:
+    """Tests for the Metrics class."""
+    
+    def test_timer_records_calls(self):
+        """Test that a timer counts calls and failures."""
+        metrics = Metrics()
+        
+        with metrics.timer("convert"):
+            pass
+        with pytest.raises(KeyError):
+            with metrics.timer("convert"):
+                raise KeyError("x")
+        
+        stats = metrics.snapshot()["convert"]
+        assert stats["count"] == 2
+        assert stats["errors"] == 1
+        assert stats["p50"] <= stats["p99"] <= stats["max_seconds"]
+    
+    def test_disabled(self):
+        """Test that a disabled registry records nothing."""
+        metrics = Metrics(enabled=False)
+        
+        with metrics.timer("convert"):
+            pass
+        metrics.observe("convert", 1.0)
+        
+        assert metrics.snapshot() == {}
+        assert metrics.timer("a") is metrics.timer("b")
+    
+    def test_window(self):
+        """Test that percentiles cover the recent window only."""
+        metrics = Metrics(window=10)
+        for _ in range(100):
+            metrics.observe("export_history", 5.0)
+        for _ in range(10):
+            metrics.observe("export_history", 1.0)
+        
+        stats = metrics.snapshot()["export_history"]
+        assert stats["count"] == 110
+        assert stats["p99"] == 1.0
+        assert stats["max_seconds"] == 5.0
+    
+    def test_to_json(self):
+        """Test the JSON export."""
+        metrics = Metrics()
+        metrics.observe("extract", 0.25)
+        
+        data = json.loads(metrics.to_json())
+        
+        assert data["operations"]["extract"]["p95"] == 0.25
+    
+    def test_to_prometheus(self):
+        """Test the Prometheus text export."""
+        metrics = Metrics()
+        metrics.observe("convert", 0.5)
+        metrics.observe("convert", 1.5, error=True)
+        
+        text = metrics.to_prometheus()
+        
+        assert "# TYPE labconv_operation_seconds summary" in text
+        assert 'labconv_operation_seconds{operation="convert",quantile="0.5"} 0.5' in text
+        assert 'labconv_operation_seconds_sum{operation="convert"} 2.0' in text
+        assert 'labconv_operation_seconds_count{operation="convert"} 2' in text
+        assert 'labconv_operation_errors_total{operation="convert"} 1' in text
+    
+    def test_write(self, tmp_path):
+        """Test that the file format follows the extension."""
+        metrics = Metrics()
+        metrics.observe("convert", 0.5)
+        
+        metrics.write(tmp_path / "metrics.json")
+        metrics.write(tmp_path / "metrics.prom")
+        
+        assert "operations" in json.loads((tmp_path / "metrics.json").read_text())
+        assert (tmp_path / "metrics.prom").read_text().startswith("# HELP")
+    
+    def test_reset(self):
+        """Test that reset forgets every operation."""
+        metrics = Metrics()
+        metrics.observe("convert", 0.5)
+        metrics.reset()
+        
+        assert metrics.snapshot() == {}
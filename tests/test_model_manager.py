@@ -0,0 +1,95 @@
+"""
+Unit tests for the model_manager module.
+"""
+
+import threading
+
+from src.llm_client import ExtractionError, ModelTimings
+from src.model_manager import COLD, FAILED, READY, ModelManager
+
+
+class FakeClient:
+    """Stands in for ExtractionClient.preload."""
+    
+    def __init__(self, load_seconds=3.0, fail=False):
+        self.on_timings = None
+        self.load_seconds = load_seconds
+        self.fail = fail
+        self.release = threading.Event()
+        self.preloads = 0
+    
+    def preload(self):
+        self.release.wait(5)
+        self.preloads += 1
+        if self.fail:
+            raise ExtractionError("connexion refusée")
+        timings = ModelTimings("preload", self.load_seconds + 0.1, load_seconds=self.load_seconds)
+        self.on_timings(timings)
+        return timings
+
+
+class TestModelManager:
+    """Tests for the ModelManager class."""
+    
+    def test_preload_in_background(self):
+        """Test that start returns immediately and the model loads after."""
+        client = FakeClient()
+        manager = ModelManager(client)
+        
+        assert manager.state == COLD
+        manager.start()
+        manager.start()
+        assert not manager.wait(0.05)
+        
+        client.release.set()
+        assert manager.wait(5)
+        assert manager.state == READY
+        assert client.preloads == 1
+    
+    def test_preload_failure(self):
+        """Test that a failed preload is reported, not raised."""
+        client = FakeClient(fail=True)
+        client.release.set()
+        manager = ModelManager(client)
+        manager.start()
+        
+        assert not manager.wait(5)
+        assert manager.state == FAILED
+        assert "refusée" in manager.error
+    
+    def test_stats(self):
+        """Test the cold-start and latency summary."""
+        client = FakeClient(load_seconds=3.0)
+        client.release.set()
+        manager = ModelManager(client)
+        manager.start()
+        manager.wait(5)
+        client.on_timings(ModelTimings("stream", 0.5, first_token_seconds=0.2))
+        client.on_timings(ModelTimings("chat", 1.0, load_seconds=0.01))
+        client.on_timings(ModelTimings("stream", 0.7, first_token_seconds=0.4))
+        
+        stats = manager.stats
+        
+        assert stats["state"] == READY
+        assert stats["requests"] == 3
+        assert stats["cold_starts"] == 1
+        assert stats["last_load_seconds"] == 0.01
+        assert stats["max_load_seconds"] == 3.0
+        assert stats["last_first_token_seconds"] == 0.4
+        assert abs(stats["mean_first_token_seconds"] - 0.3) < 1e-9
+    
+    def test_history_bounded(self):
+        """Test that only the most recent timings are kept."""
+        manager = ModelManager(FakeClient(), history=2)
+        for seconds in (1.0, 2.0, 3.0):
+            manager.record(ModelTimings("chat", seconds))
+        
+        assert [t.total_seconds for t in manager.timings] == [2.0, 3.0]
+    
+    def test_empty_stats(self):
+        """Test the summary before any request."""
+        stats = ModelManager(FakeClient()).stats
+        
+        assert stats["requests"] == 0
+        assert stats["max_load_seconds"] is None
+        assert stats["mean_first_token_seconds"] is None
@@ -0,0 +1,99 @@
+"""
+Unit tests for the query_parser module.
+"""
+
+import pytest
+from src.data_loader import ScientificDataLoader
+from src.query_parser import QueryParser, mentions_result
+
+
+@pytest.fixture
+def parser():
+    return QueryParser.from_loader(ScientificDataLoader("data/scientific_data.csv"))
+
+
+class TestQueryParser:
+    """Tests for the QueryParser class."""
+    
+    def test_well_formed_query(self, parser):
+        """Test the canonical example phrase."""
+        assert parser.parse("Creatinine 19243 µmol/L vers g/L") == {
+            "analyte": "creatinine",
+            "value": 19243.0,
+            "unit_from": "µmol/L",
+            "unit_to": "g/L",
+        }
+    
+    def test_sentence_with_accents_and_aliases(self, parser):
+        """Test accented aliases and surrounding words."""
+        result = parser.parse("Je veux convertir 7 mmol / L d'urée en g/L")
+        
+        assert result["analyte"] == "uree"
+        assert result["unit_from"] == "mmol/L"
+        assert result["unit_to"] == "g/L"
+    
+    def test_multi_word_analyte_and_decimal_comma(self, parser):
+        """Test multi-word analyte names and a decimal comma."""
+        result = parser.parse("acide urique 5,4 mg/dL -> μmol/L")
+        
+        assert result["analyte"] == "acide_urique"
+        assert result["value"] == 5.4
+        assert result["unit_to"] == "µmol/L"
+    
+    def test_bare_molar_unit(self, parser):
+        """Test that "µmol" without "/L" is read as µmol/L."""
+        result = parser.parse("crea 88 µmol en mg/dL")
+        
+        assert result["analyte"] == "creatinine"
+        assert result["unit_from"] == "µmol/L"
+    
+    @pytest.mark.parametrize("text", [
+        "Convertis 200 de cholestérol en mmol",
+        "Quelle est la masse molaire de l'urée ?",
+        "glucose 5.4 mmol/L et chol 200 mg/dL",
+        "glucose 90 100 mg/dL en mmol/L",
+        "vitamine 90 mg/dL en mmol/L",
+        "g/L 12 creatinine µmol/L",
+        "Glucose -5 mmol/L vers mg/dL",
+        "Glucose +5 mmol/L vers mg/dL",
+        "Glucose 1e3 mmol/L vers mg/dL",
+        "Glucose 2,5e-3 mmol/L vers mg/dL",
+    ])
+    def test_ambiguous_queries_fall_back(self, parser, text):
+        """Test that phrases without a confident parse return None."""
+        assert parser.parse(text) is None
+    
+    def test_stats(self, parser):
+        """Test the fast-path ratio counters."""
+        parser.parse("Creatinine 19243 µmol/L vers g/L")
+        parser.parse("Quelle est la masse molaire de l'urée ?")
+        
+        assert parser.stats == {"parsed": 1, "fallbacks": 1, "fast_path_ratio": 0.5}
+    
+    def test_from_vocabulary(self, parser):
+        """Test that a parser rebuilt from a vocabulary parses the same phrases."""
+        rebuilt = QueryParser.from_vocabulary(parser.compiled_vocabulary())
+        
+        assert rebuilt.compiled_vocabulary() == parser.compiled_vocabulary()
+        assert rebuilt.parse("acide urique 5,4 mg/dL -> μmol/L") == parser.parse(
+            "acide urique 5,4 mg/dL -> μmol/L"
+        )
+    
+    def test_deferred(self, parser):
+        """Test a parser whose vocabulary is decoded on first parse."""
+        deferred = QueryParser.deferred(parser.compiled_vocabulary)
+        
+        assert "_vocabulary" not in vars(deferred)
+        assert deferred.parse("urée 7 mmol/L en g/L") == parser.parse("urée 7 mmol/L en g/L")
+        assert deferred.stats["parsed"] == 1
+    
+    @pytest.mark.parametrize("text, expected", [
+        ("crea 88 µmol", True),
+        ("Glucose 5,4 MMOL / L", True),
+        ("urée 7", False),
+        ("en mmol/L", False),
+        ("Pour l'urée, quelle est la masse molaire ?", False),
+    ])
+    def test_mentions_result(self, text, expected):
+        """Test the number-and-unit check used to split pasted blocks."""
+        assert mentions_result(text) is expected
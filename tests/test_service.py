@@ -0,0 +1,242 @@
+"""
+Unit tests for the service module.
+"""
+
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+from src.llm_client import ExtractionError
+from src.service import LabService
+from src.units import Unit
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    path = tmp_path / "scientific_data.csv"
+    shutil.copy("data/scientific_data.csv", path)
+    return path
+
+
+@pytest.fixture
+def service(tmp_path):
+    return LabService(
+        cache_path=str(tmp_path / "cache.sqlite3"),
+        history_path=str(tmp_path / "history.sqlite3"),
+        catalogue_cache=False
+    )
+
+
+class FakeClient:
+    """Stands in for the model client."""
+    
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+    
+    def extract(self, user_input, analytes):
+        self.calls.append(user_input)
+        if self.fail:
+            raise ExtractionError("modèle indisponible")
+        return {"analyte": "glucose", "value": 90, "unit_from": "mg/dL", "unit_to": "mmol/L"}
+    
+    def extract_batch(self, lines, analytes):
+        self.calls.append(list(lines))
+        if self.fail:
+            raise ExtractionError("modèle indisponible")
+        return [{"analyte": "uree", "value": 7, "unit_from": "mmol/L", "unit_to": "g/L"}] * len(lines)
+
+
+class FakeManager:
+    def __init__(self, client):
+        self.client = client
+
+
+class TestLabService:
+    """Tests for the LabService class."""
+    
+    def test_lookups(self, service):
+        """Test analyte data and conversion through the service."""
+        assert "creatinine" in service.analytes()
+        assert service.analyte_info("créatinine")["molar_mass"] == 113.12
+        assert Unit.MG_PER_DL in service.common_units("creatinine")
+        assert service.common_units("inconnu") == []
+        assert service.convert(100, "creatinine", "µmol/L", "mg/dL") == pytest.approx(1.1312)
+    
+    def test_components_created_once(self, service):
+        """Test that components are built lazily and reused."""
+        assert service._components == {}
+        
+        converter = service.converter
+        
+        assert service.converter is converter
+        assert service.parser is service.reference.parser
+        assert set(service._components) == {"reference"}
+    
+    def test_extract_uses_parser_then_cache(self, service):
+        """Test that the model is only asked once per unparsed phrase."""
+        client = FakeClient()
+        service._components["model_manager"] = FakeManager(client)
+        
+        assert service.extract("Creatinine 19243 µmol/L vers g/L")["analyte"] == "creatinine"
+        assert service.extract("un peu de sucre")["analyte"] == "glucose"
+        assert service.extract("un peu de sucre")["analyte"] == "glucose"
+        assert client.calls == ["un peu de sucre"]
+    
+    def test_extract_error_propagates(self, service):
+        """Test that model errors reach the caller and are not cached."""
+        service._components["model_manager"] = FakeManager(FakeClient(fail=True))
+        
+        with pytest.raises(ExtractionError):
+            service.extract("un peu de sucre")
+        assert len(service.cache) == 0
+    
+    def test_extract_block_error(self, service):
+        """Test that a failing model leaves parsed lines intact."""
+        service._components["model_manager"] = FakeManager(FakeClient(fail=True))
+        errors = []
+        
+        results = service.extract_block(
+            ["glucose 90 mg/dL en mmol/L", "urée 7"], on_error=errors.append
+        )
+        
+        assert results[0]["analyte"] == "glucose"
+        assert results[1] is None
+        assert len(errors) == 1
+    
+    def test_extract_block_and_convert(self, service):
+        """Test a block extracted and converted in one pass."""
+        service._components["model_manager"] = FakeManager(FakeClient())
+        
+        items = service.convert_extractions(
+            service.extract_block(["glucose 90 mg/dL en mmol/L", "urée 7"])
+        )
+        
+        assert items[0]["result"] == pytest.approx(4.9956, abs=1e-4)
+        assert items[1]["result"] == pytest.approx(0.42042)
+    
+    def test_export_history(self, service):
+        """Test that the history is serialized for download."""
+        service.history.append([{
+            "timestamp": "2026-01-01 10:00:00", "analyte": "glucose", "value_input": 90.0,
+            "unit_from": "mg/dL", "value_output": 4.9956, "unit_to": "mmol/L",
+            "molar_mass": 180.16, "source": "PubChem NIH",
+        }])
+        
+        assert service.export_history("csv").decode("utf-8-sig").startswith("timestamp,analyte,")
+        assert service.export_history("parquet")[:4] == b"PAR1"
+        assert service.export_history("csv", "urée").count(b"\n") == 1
+    
+    def test_history_shared(self, service, tmp_path):
+        """Test that the history is persisted outside the service."""
+        service.history.append([{
+            "timestamp": "2026-01-01 10:00:00", "analyte": "glucose", "value_input": 90.0,
+            "unit_from": "mg/dL", "value_output": 4.9956, "unit_to": "mmol/L",
+            "molar_mass": 180.16, "source": "PubChem NIH",
+        }])
+        
+        other = LabService(history_path=str(tmp_path / "history.sqlite3"), catalogue_cache=False)
+        
+        assert other.history.page()[0]["value_output"] == 4.9956
+    
+    def test_heavy_modules_not_imported(self):
+        """Test that lookups and conversions import neither pandas nor ollama."""
+        code = (
+            "import sys; from src.service import LabService; "
+            "s = LabService(catalogue_cache=False); "
+            "s.analytes(); s.convert(100, 'creatinine', 'µmol/L', 'mg/dL'); "
+            "s.parser.parse('Glucose 90 mg/dL vers mmol/L'); "
+            "print(sorted(m for m in ('pandas', 'ollama') if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        
+        assert result.stdout.strip() == "[]"
+    
+    def test_metrics(self, tmp_path):
+        """Test that operations are timed only when metrics are enabled."""
+        service = LabService(
+            cache_path=str(tmp_path / "cache.sqlite3"),
+            history_path=str(tmp_path / "history.sqlite3"),
+            metrics_enabled=True,
+            catalogue_cache=False
+        )
+        service._components["model_manager"] = FakeManager(FakeClient())
+        
+        service.convert(100, "creatinine", "µmol/L", "mg/dL")
+        service.extract("combien fait 90 de sucre")
+        service.export_history("csv")
+        
+        operations = service.metrics.snapshot()
+        assert {"convert", "extract", "extract_model", "export_history", "load_reference"} <= set(operations)
+        assert operations["extract_model"]["count"] == 1
+    
+    def test_metrics_disabled_by_default(self, service):
+        """Test that nothing is recorded by default."""
+        service.convert(100, "creatinine", "µmol/L", "mg/dL")
+        
+        assert service.metrics.snapshot() == {}
+    
+    def test_reload_data(self, data_path, tmp_path):
+        """Test that a changed molar mass is swapped in as a new snapshot."""
+        service = LabService(str(data_path), cache_path=str(tmp_path / "cache.sqlite3"))
+        before = service.reference
+        
+        data_path.write_text(
+            data_path.read_text(encoding="utf-8").replace("113.12", "113.5"), encoding="utf-8"
+        )
+        
+        assert service.reload_data()
+        assert service.reference.version == before.version + 1
+        assert service.analyte_info("creatinine")["molar_mass"] == 113.5
+        assert before.converter.molar_mass("creatinine") == 113.12
+    
+    def test_invalid_reload_keeps_data(self, data_path, tmp_path):
+        """Test that an invalid file does not replace the current data."""
+        service = LabService(str(data_path), cache_path=str(tmp_path / "cache.sqlite3"))
+        before = service.reference
+        
+        data_path.write_text("analyte,molar_mass\n", encoding="utf-8")
+        
+        assert not service.reload_data()
+        assert service.reference is before
+        assert "Missing required columns" in service.data_error
+    
+    def test_catalogue_cache(self, data_path, tmp_path):
+        """Test that the compiled catalogue is cached next to the data file."""
+        compiled = tmp_path / "scientific_data.csv.compiled"
+        
+        uncached = LabService(str(data_path), catalogue_cache=False)
+        assert uncached.convert(100, "creatinine", "µmol/L", "mg/dL") is not None
+        assert not compiled.exists()
+        
+        LabService(str(data_path)).analytes()
+        assert compiled.exists()
+        
+        service = LabService(str(data_path))
+        assert not service.converter.factors.flags.writeable
+        assert service.convert(100, "creatinine", "µmol/L", "mg/dL") == uncached.convert(
+            100, "creatinine", "µmol/L", "mg/dL"
+        )
+
+    def test_watch_data(self, data_path, tmp_path):
+        """Test that editing the file reloads the data in the background."""
+        service = LabService(str(data_path), cache_path=str(tmp_path / "cache.sqlite3"))
+        service.analytes()
+        assert service.watch_data()
+        service._watcher.debounce_seconds = 0.05
+        
+        try:
+            data_path.write_text(
+                data_path.read_text(encoding="utf-8").replace("113.12", "113.5"), encoding="utf-8"
+            )
+            deadline = time.monotonic() + 5
+            while service.reference.version == 0 and time.monotonic() < deadline:
+                time.sleep(0.02)
+            
+            assert service.analyte_info("creatinine")["molar_mass"] == 113.5
+        finally:
+            service._watcher.stop()
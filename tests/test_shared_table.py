@@ -0,0 +1,170 @@
+"""
+Unit tests for the shared_table module.
+"""
+
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+from src.converter import Converter
+from src.data_loader import ScientificDataLoader
+from src.service import LabService
+from src.shared_table import SharedTable
+
+
+def worker_convert(name, queue):
+    table = SharedTable.attach(name)
+    queue.put((
+        table.converter.convert(100, "créatinine", "µmol/L", "mg/dL"),
+        table.loader.get_molar_mass("gluc"),
+        table.converter.factors.flags.writeable,
+    ))
+
+
+@pytest.fixture
+def published():
+    loader = ScientificDataLoader("data/scientific_data.csv")
+    table = SharedTable.publish(loader, Converter.from_loader(loader), version=3)
+    yield table
+    table.unlink()
+
+
+class TestSharedTable:
+    """Tests for the SharedTable class."""
+    
+    def test_attach_same_process(self, published):
+        """Test that an attached table matches the published one."""
+        attached = SharedTable.attach(published.name)
+        
+        assert attached.version == 3
+        assert attached.loader.get_all_analytes() == published.loader.get_all_analytes()
+        assert attached.loader.get_common_units("glucose") == ["mmol/L", "mg/dL", "g/L"]
+        np.testing.assert_array_equal(attached.converter.factors, published.converter.factors)
+        assert attached.parser.parse("urée 7 mmol/L en g/L")["analyte"] == "uree"
+        attached.close()
+    
+    def test_zero_copy_read_only(self, published):
+        """Test that the factor table is a read-only view of the segment."""
+        attached = SharedTable.attach(published.name)
+        factors = attached.converter.factors
+        
+        assert not factors.flags.writeable
+        assert not factors.flags.owndata
+        assert np.shares_memory(factors, np.frombuffer(attached.memory.buf, dtype=np.uint8))
+        del factors
+        attached.close()
+    
+    def test_worker_process(self, published):
+        """Test a worker process attaching by name."""
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=worker_convert, args=(published.name, queue))
+        process.start()
+        result, molar_mass, writeable = queue.get(timeout=30)
+        process.join(timeout=30)
+        
+        assert result == pytest.approx(1.1312)
+        assert molar_mass == 180.16
+        assert not writeable
+        # The segment survives the worker's exit
+        SharedTable.attach(published.name).close()
+    
+    def test_attach_unknown(self):
+        """Test that a missing segment is reported."""
+        with pytest.raises(FileNotFoundError):
+            SharedTable.attach("labconv_missing_segment")
+    
+    def test_attach_foreign_segment(self):
+        """Test that a segment without a reference table is rejected."""
+        memory = SharedMemory(create=True, size=64)
+        try:
+            with pytest.raises(ValueError):
+                SharedTable.attach(memory.name)
+        finally:
+            memory.close()
+            memory.unlink()
+    
+    def test_service_attach(self, tmp_path):
+        """Test that a service serves conversions from a published table."""
+        parent = LabService(catalogue_cache=False)
+        table = parent.publish_reference()
+        try:
+            worker = LabService(cache_path=str(tmp_path / "cache.sqlite3"), catalogue_cache=False)
+            worker.attach_reference(table.name)
+            
+            assert worker.convert(100, "creatinine", "µmol/L", "mg/dL") == pytest.approx(1.1312)
+            assert worker.parser.parse("Glucose 90 mg/dL vers mmol/L") is not None
+            assert worker.converter.factors.base is not None
+        finally:
+            table.unlink()
+    
+    def test_close_refused_while_in_use(self, published, tmp_path):
+        """Test that a table used by a service is not unmapped under it."""
+        worker = LabService(cache_path=str(tmp_path / "cache.sqlite3"), catalogue_cache=False)
+        worker.attach_reference(published.name)
+        table = worker._components["shared_table"]
+        
+        with pytest.raises(BufferError):
+            table.close()
+        
+        assert worker.convert(100, "creatinine", "µmol/L", "mg/dL") == pytest.approx(1.1312)
+    
+    def test_close_once_views_released(self, published):
+        """Test that a viewed factor table keeps the segment mapped until released."""
+        attached = SharedTable.attach(published.name)
+        factors = attached.converter.factors
+        
+        with pytest.raises(BufferError):
+            attached.close()
+        assert attached.closed
+        assert factors[0, 0, 1] == 1e-3
+        
+        del factors
+        attached.close()
+        
+        assert attached.memory.buf is None
+    
+    def test_detached_components_keep_working(self, published, tmp_path):
+        """Test that a loader and parser held by a caller outlive the segment."""
+        worker = LabService(cache_path=str(tmp_path / "cache.sqlite3"), catalogue_cache=False)
+        worker.attach_reference(published.name)
+        loader, parser = worker.loader, worker.parser
+        
+        worker.detach_reference()
+        
+        assert "glucose" in loader.get_all_analytes()
+        assert parser.parse("urée 7 mmol/L en g/L")["analyte"] == "uree"
+    
+    def test_context_manager(self, published):
+        """Test that leaving the block closes an attached table."""
+        with SharedTable.attach(published.name) as attached:
+            assert attached.converter.convert(1, "glucose", "mmol/L", "mmol/L") == 1
+        
+        assert attached.closed
+        assert attached.memory.buf is None
+    
+    def test_detach_then_convert(self, published, tmp_path):
+        """Test that a detached service converts from the data file again."""
+        worker = LabService(cache_path=str(tmp_path / "cache.sqlite3"), catalogue_cache=False)
+        worker.attach_reference(published.name)
+        table = worker._components["shared_table"]
+        
+        worker.detach_reference()
+        
+        assert table.converter is None
+        assert "shared_table" not in worker._components
+        assert worker.convert(100, "creatinine", "µmol/L", "mg/dL") == pytest.approx(1.1312)
+        assert worker.converter.factors.flags.owndata
+    
+    def test_attach_again_closes_previous(self, published, tmp_path):
+        """Test that attaching another table detaches the previous one."""
+        worker = LabService(cache_path=str(tmp_path / "cache.sqlite3"), catalogue_cache=False)
+        worker.attach_reference(published.name)
+        previous = worker._components["shared_table"]
+        
+        worker.attach_reference(published.name)
+        
+        assert previous.converter is None
+        assert worker.convert(100, "creatinine", "µmol/L", "mg/dL") == pytest.approx(1.1312)
+        worker.detach_reference()
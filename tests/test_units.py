@@ -0,0 +1,43 @@
+"""
+Unit tests for the units module.
+"""
+
+from src.units import Unit, parse_unit
+
+
+class TestParseUnit:
+    """Tests for the parse_unit function."""
+    
+    def test_micro_spellings(self):
+        """Test that all micro spellings map to the same code."""
+        spellings = ["µmol/L", "umol/l", "μmol/L", "UMOL/L", " µmol / L "]
+        for spelling in spellings:
+            assert parse_unit(spelling) is Unit.UMOL_PER_L
+    
+    def test_other_units(self):
+        """Test the remaining canonical units."""
+        assert parse_unit("mmol / L") is Unit.MMOL_PER_L
+        assert parse_unit("MG/DL") is Unit.MG_PER_DL
+        assert parse_unit("g/L") is Unit.G_PER_L
+    
+    def test_unit_passthrough(self):
+        """Test that Unit values are returned unchanged."""
+        assert parse_unit(Unit.G_PER_L) is Unit.G_PER_L
+    
+    def test_invalid_units(self):
+        """Test that invalid units return None."""
+        for unit in ["invalid", "mol/L", "kg/m3", "", None, 3.5]:
+            assert parse_unit(unit) is None
+
+
+class TestUnit:
+    """Tests for the Unit enumeration."""
+    
+    def test_labels_round_trip(self):
+        """Test that every label parses back to its unit."""
+        for unit in Unit:
+            assert parse_unit(unit.label) is unit
+    
+    def test_codes_are_small_integers(self):
+        """Test that codes are contiguous small integers."""
+        assert sorted(int(unit) for unit in Unit) == list(range(len(Unit)))